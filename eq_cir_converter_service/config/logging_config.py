@@ -28,5 +28,7 @@ def setup_logging() -> None:
             structlog.dev.set_exc_info,
             renderer_processor,
         ],
+        # Drop log calls below the log level before any processor runs, so their values are never rendered
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         logger_factory=structlog.stdlib.LoggerFactory(),
     )
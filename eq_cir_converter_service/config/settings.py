@@ -0,0 +1,80 @@
+"""Configure the conversion settings for the application from environment variables."""
+
+import os
+
+
+def get_int_env(name: str, default: int) -> int:
+    """Returns the integer value of an environment variable, or the default if it is not set."""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+# The number of conversions that can run at the same time, off the event loop
+CONVERSION_MAX_WORKERS = get_int_env("CONVERSION_MAX_WORKERS", 4)
+
+# The number of conversions that can wait for a worker before new requests are rejected
+CONVERSION_QUEUE_LIMIT = get_int_env("CONVERSION_QUEUE_LIMIT", 32)
+
+# The number of worker processes for converting large schemas, or 0 to convert every schema on the worker threads
+CONVERSION_PROCESS_POOL_SIZE = get_int_env("CONVERSION_PROCESS_POOL_SIZE", 0)
+
+# The request body size, in bytes, from which a schema is converted in a worker process rather than in-process
+CONVERSION_PROCESS_THRESHOLD_BYTES = get_int_env("CONVERSION_PROCESS_THRESHOLD_BYTES", 1024 * 1024)
+
+# The number of sections from which a schema converted in the process pool is split by section across the worker
+# processes, or 0 to convert each schema in a single worker process
+CONVERSION_PARALLEL_MIN_SECTIONS = get_int_env("CONVERSION_PARALLEL_MIN_SECTIONS", 0)
+
+# The total compressed size, in bytes, of the converted schemas kept in memory, or 0 to disable the cache.
+# Disabled by default, as hashing and compressing a schema adds to the conversion of every schema not seen before.
+CONVERSION_CACHE_MAX_BYTES = get_int_env("CONVERSION_CACHE_MAX_BYTES", 0)
+
+# The total size, in bytes, of the converted sections kept in memory to reconvert schemas incrementally, 0 to disable.
+# Disabled by default, as converting a schema for the first time section by section is slower than converting it whole.
+CONVERSION_SECTION_CACHE_MAX_BYTES = get_int_env("CONVERSION_SECTION_CACHE_MAX_BYTES", 0)
+
+# The number of distinct strings whose cleaned HTML is kept in memory for later conversions, or 0 to disable the memo
+CONVERSION_STRING_MEMO_SIZE = get_int_env("CONVERSION_STRING_MEMO_SIZE", 16384)
+
+# The number of schema shapes whose JSONPath match locations are kept in memory, or 0 to disable the cache.
+# Disabled by default, as walking and hashing the shape adds to the conversion of every schema of a new shape.
+CONVERSION_MATCH_LOCATION_CACHE_SIZE = get_int_env("CONVERSION_MATCH_LOCATION_CACHE_SIZE", 0)
+
+# The number of conversion plans, one for each pair of current and target versions, kept in memory
+CONVERSION_PLAN_CACHE_SIZE = get_int_env("CONVERSION_PLAN_CACHE_SIZE", 256)
+
+# The number of schemas in a batch request that are converted at the same time
+CONVERSION_BATCH_CONCURRENCY = get_int_env("CONVERSION_BATCH_CONCURRENCY", CONVERSION_MAX_WORKERS)
+
+# The number of schemas that can be sent in one batch request
+CONVERSION_BATCH_MAX_ITEMS = get_int_env("CONVERSION_BATCH_MAX_ITEMS", 1000)
+
+# The number of conversion jobs that can run at the same time
+CONVERSION_JOB_RUNNERS = get_int_env("CONVERSION_JOB_RUNNERS", 2)
+
+# The number of conversion jobs that can wait for a runner before new jobs are rejected
+CONVERSION_JOB_QUEUE_LIMIT = get_int_env("CONVERSION_JOB_QUEUE_LIMIT", 16)
+
+# How long, in seconds, a finished conversion job and its result are kept
+CONVERSION_JOB_RESULT_TTL_SECONDS = get_int_env("CONVERSION_JOB_RESULT_TTL_SECONDS", 600)
+
+# The total size, in bytes, of the results of finished conversion jobs kept, the oldest removed first once over it
+CONVERSION_JOB_RESULT_MAX_BYTES = get_int_env("CONVERSION_JOB_RESULT_MAX_BYTES", 256 * 1024 * 1024)
+
+# Whether to record the time spent on each JSONPath expression, reported by GET /status/path-stats, 1 to enable
+CONVERSION_PATH_STATS = get_int_env("CONVERSION_PATH_STATS", 0)
+
+# The largest size, in bytes, that a gzip or deflate request body can be decompressed to before the request is rejected
+REQUEST_MAX_DECOMPRESSED_BYTES = get_int_env("REQUEST_MAX_DECOMPRESSED_BYTES", 64 * 1024 * 1024)
+
+# The response body size, in bytes, from which responses are compressed for clients that accept gzip or deflate
+RESPONSE_COMPRESSION_MIN_BYTES = get_int_env("RESPONSE_COMPRESSION_MIN_BYTES", 1024)
+
+# The zlib level responses are compressed with, from 1 (fastest) to 9 (smallest), or 0 to not compress responses
+RESPONSE_COMPRESSION_LEVEL = get_int_env("RESPONSE_COMPRESSION_LEVEL", 6)
+
+# The size, in bytes, from which a part of a request or response body is decompressed or compressed off the event loop
+CONTENT_ENCODING_THREAD_MIN_BYTES = get_int_env("CONTENT_ENCODING_THREAD_MIN_BYTES", 16 * 1024)
+
+# Whether to add a Server-Timing header, with the duration of each phase of the request, to every response, 1 to enable
+SERVER_TIMING_ENABLED = get_int_env("SERVER_TIMING_ENABLED", 0)
@@ -0,0 +1,150 @@
+"""Compiled JSONPath expressions, parsed once and shared by every conversion."""
+
+import copy
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import cast
+
+from jsonpath_ng import JSONPath
+from jsonpath_ng.ext import parse
+from structlog import get_logger
+
+from eq_cir_converter_service.config import settings
+from eq_cir_converter_service.converters.match_locations import MatchLocationCache
+from eq_cir_converter_service.converters.path_matcher import PathMatcher, Process, UnsupportedPathError
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.types.custom_types import Schema
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class CompiledPaths:
+    """A list of JSONPath strings together with their parsed expressions.
+
+    Attributes:
+    - paths: The JSONPath strings, in the order they are applied.
+    - expressions: The parsed jsonpath-ng expression for each path.
+    - compile_seconds: The time taken to parse all the expressions and build the matcher.
+    - matcher: The single-pass matcher for the expressions, or None if any of them uses
+      syntax the matcher does not support, in which case each expression is evaluated separately.
+    - path_compile_seconds: The time taken to parse each expression.
+    - match_locations: The cache of the matches of the matcher for each schema shape, or None
+      without a matcher.
+    """
+
+    paths: tuple[str, ...]
+    expressions: tuple[JSONPath, ...]
+    compile_seconds: float
+    matcher: PathMatcher | None = None
+    path_compile_seconds: tuple[float, ...] = ()
+    match_locations: MatchLocationCache | None = None
+
+
+@lru_cache(maxsize=32)
+def compile_paths(paths: tuple[str, ...]) -> CompiledPaths:
+    """Parses the JSONPath strings, caching the result by the path list.
+
+    Parsing a JSONPath expression runs the jsonpath-ng grammar, which is far more expensive
+    than evaluating it, so the parsed expressions are built once per distinct path list
+    and reused for every request.
+
+    Parameters:
+    - paths: The JSONPath strings to parse.
+
+    Returns:
+    - The compiled paths.
+    """
+    start = time.perf_counter()
+    parsed = []
+    for path in paths:
+        path_start = time.perf_counter()
+        parsed.append((parse(path), time.perf_counter() - path_start))
+    expressions = tuple(expression for expression, _ in parsed)
+    try:
+        matcher: PathMatcher | None = PathMatcher(expressions)
+    except UnsupportedPathError as exc:
+        logger.info("JSONPath expression not supported by the single-pass matcher", path=str(exc))
+        matcher = None
+    compile_seconds = time.perf_counter() - start
+
+    logger.info(
+        "Compiled JSONPath expressions",
+        path_count=len(paths),
+        compile_time_ms=round(compile_seconds * 1000, 3),
+        single_pass=matcher is not None,
+    )
+
+    return CompiledPaths(
+        paths=paths,
+        expressions=expressions,
+        compile_seconds=compile_seconds,
+        matcher=matcher,
+        path_compile_seconds=tuple(seconds for _, seconds in parsed),
+        match_locations=(
+            MatchLocationCache(matcher, max_entries=settings.CONVERSION_MATCH_LOCATION_CACHE_SIZE)
+            if matcher is not None
+            else None
+        ),
+    )
+
+
+def apply_compiled_paths(
+    schema: Schema,
+    compiled_paths: CompiledPaths,
+    process: Process | Sequence[Process],
+    timings: PathTimings | None = None,
+    *,
+    in_place: bool = True,
+) -> Schema:
+    """Processes every match of the compiled paths in the schema, in the order of the paths.
+
+    The matches are found in a single walk of the schema with the single-pass matcher, from the
+    match location cache if a schema of the same shape has been matched before, or, if an expression
+    is not supported by the matcher, by evaluating each expression in turn with the jsonpath-ng library.
+
+    Parameters:
+    - schema: The schema to process.
+    - compiled_paths: The compiled JSONPath expressions to match.
+    - process: The function to call with the context and key of each match, or one function per path.
+    - timings: Where to record the time spent on each path, if path statistics are enabled.
+    - in_place: Whether to process the schema in place. Otherwise the schema is left unchanged, and
+      the processed schema shares every dictionary and list that is not changed with it.
+
+    Returns:
+    - The processed schema.
+    """
+    if compiled_paths.matcher is not None and not in_place:
+        return cast(Schema, compiled_paths.matcher.apply_shared(schema, process, timings).root)
+    if not in_place:
+        # Expressions evaluated one at a time by jsonpath-ng are not walked with the parents needed
+        # to copy only along changed paths, so the schema is copied whole
+        schema = copy.deepcopy(schema)
+
+    if compiled_paths.matcher is not None:
+        match_locations = compiled_paths.match_locations
+        compiled_paths.matcher.apply(
+            schema,
+            process,
+            timings,
+            match_locations.find if match_locations is not None else None,
+        )
+        return schema
+
+    for path_index, jsonpath_expression in enumerate(compiled_paths.expressions):
+        path_process = process[path_index] if isinstance(process, Sequence) else process
+        match_process = path_process if timings is None else timings.timed(path_process, path_index)
+        start = time.perf_counter()
+        matches = jsonpath_expression.find(schema)
+        if timings is not None:
+            timings.find_seconds[path_index] += time.perf_counter() - start
+        for match in matches:
+            matched_path = match.path
+            if hasattr(matched_path, "index"):
+                match_process(match.context.value, matched_path.index)
+            elif hasattr(matched_path, "fields"):
+                match_process(match.context.value, matched_path.fields[0])
+
+    return schema
@@ -0,0 +1,161 @@
+"""A cache of the matches of the single-pass matcher, keyed by the shape of the schema.
+
+Schemas from the same survey family share a structure even when their text differs, and the matches
+the matcher finds in a schema depend only on its structure: the keys of each dictionary, in order,
+the length of each list, and, for the other values, their type and whether they are empty. The
+shape of a schema is walked and hashed, which is several times quicker than matching it, and the
+matches found for a shape are kept as the positions of their contexts in the walk. A schema with a
+known shape gets its matches by looking up the nodes at those positions, without matching.
+
+Only the first walk of a conversion is cached. Processing a match can change the structure of the
+schema depending on its text, such as splitting a string into paragraphs, so the matcher still
+walks the schema again when that happens.
+"""
+
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import NamedTuple
+
+from eq_cir_converter_service.converters.path_matcher import PathMatch, PathMatcher
+
+# The matches of a shape, with each context replaced by its position among the containers of the schema
+_Locations = tuple[tuple[int, int, str | int, tuple, list], ...]
+
+
+class MatchLocationStats(NamedTuple):
+    """A snapshot of a match location cache.
+
+    Attributes:
+    - hits: The number of schemas whose matches were found from their shape.
+    - misses: The number of schemas matched because their shape was not in the cache.
+    - hit_rate: The share of schemas whose matches were found from their shape, from 0 to 1.
+    - evictions: The number of shapes removed to keep the cache within its size.
+    - uncacheable: The number of schemas whose matches could not be cached, because a container
+      appears in them more than once or a match is not within the schema.
+    - entries: The number of shapes in the cache.
+    - max_entries: The size of the cache.
+    """
+
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    uncacheable: int
+    entries: int
+    max_entries: int
+
+
+def schema_shape(data: object) -> tuple[bytes, list[dict | list]]:
+    """Returns the hash of the shape of the data, and its dictionaries and lists in the order they were walked.
+
+    Parameters:
+    - data: The data to walk.
+
+    Returns:
+    - tuple: The hash of the shape, and the containers of the data, the data itself first.
+    """
+    tokens: list[object] = []
+    containers: list[dict | list] = []
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            containers.append(value)
+            tokens.append(tuple(value))
+            pending.extend(reversed(value.values()))
+        elif isinstance(value, list):
+            containers.append(value)
+            tokens.append(len(value))
+            pending.extend(reversed(value))
+        else:
+            # Matching depends on the type of a value, and on whether it is empty, but not on its text
+            tokens.append(type(value).__name__ if value else "")
+    return hashlib.blake2b(repr(tokens).encode(), digest_size=16).digest(), containers
+
+
+class MatchLocationCache:
+    """A least recently used cache of the matches of a matcher for each schema shape."""
+
+    def __init__(self, matcher: PathMatcher, *, max_entries: int) -> None:
+        """Creates an empty cache.
+
+        Parameters:
+        - matcher: The matcher whose matches are cached.
+        - max_entries: The number of shapes to keep the matches of, or 0 to disable the cache.
+        """
+        self.matcher = matcher
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, _Locations] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Counter[str] = Counter()
+
+    def find(self, data: object) -> list[PathMatch]:
+        """Returns the matches of the matcher in the data, from the cache if its shape is known.
+
+        Parameters:
+        - data: The data to search.
+
+        Returns:
+        - list: The matches, in the same order as the matcher finds them.
+        """
+        if self.max_entries <= 0:
+            return self.matcher.find(data)
+
+        shape, containers = schema_shape(data)
+        with self._lock:
+            locations = self._entries.get(shape)
+            if locations is not None:
+                self._entries.move_to_end(shape)
+                self._counters["hits"] += 1
+            else:
+                self._counters["misses"] += 1
+        if locations is not None:
+            return [
+                PathMatch(path_index, containers[position], key, order, states)
+                for path_index, position, key, order, states in locations
+            ]
+
+        matches = self.matcher.find(data)
+        self._put(shape, containers, matches)
+        return matches
+
+    def _put(self, shape: bytes, containers: list[dict | list], matches: list[PathMatch]) -> None:
+        """Caches the matches of a shape, as the positions of their contexts among the containers."""
+        positions = {id(container): position for position, container in enumerate(containers)}
+        if len(positions) == len(containers) and all(id(match.context) in positions for match in matches):
+            locations = tuple(
+                (match.path_index, positions[id(match.context)], match.key, match.order, match.states)
+                for match in matches
+            )
+        else:
+            locations = None
+
+        with self._lock:
+            if locations is None:
+                self._counters["uncacheable"] += 1
+                return
+            self._entries[shape] = locations
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Removes every shape and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+    def stats(self) -> MatchLocationStats:
+        """Returns the cache counters and size."""
+        with self._lock:
+            hits, misses = self._counters["hits"], self._counters["misses"]
+            return MatchLocationStats(
+                hits=hits,
+                misses=misses,
+                hit_rate=round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                evictions=self._counters["evictions"],
+                uncacheable=self._counters["uncacheable"],
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+            )
@@ -0,0 +1,490 @@
+"""Single-pass matcher for a list of JSONPath expressions.
+
+Evaluating each JSONPath expression with jsonpath-ng walks the schema once per expression, and
+every ``$..`` expression walks all of it. The matcher compiles the expressions into one trie of
+key and index steps, walks the schema once and returns the matches in the same order jsonpath-ng
+would, expression by expression, so the conversion applied to them is unchanged.
+
+Only the subset of JSONPath used by the converters is supported: field names, ``*``, ``[*]``
+and a single leading ``..``.
+"""
+
+import time
+from collections.abc import Callable, Sequence
+from functools import partial
+from typing import NamedTuple
+
+from jsonpath_ng import JSONPath
+from jsonpath_ng.jsonpath import Child, Descendants, Fields, Root, Slice
+
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.converters.shared_tree import Parents, SharedTree
+
+# The function that processes a match, called with its context and key
+Process = Callable[[dict | list, str | int], None]
+
+
+class UnsupportedPathError(ValueError):
+    """Raised when a JSONPath expression uses syntax the matcher does not support."""
+
+
+class _Step(NamedTuple):
+    kind: str
+    name: str = ""
+
+
+_DESCENDANTS = _Step("descendants")
+_ANY_INDEX = _Step("any_index")
+_ANY_FIELD = _Step("any_field")
+
+
+class _TrieNode:
+    """A state of the matcher, shared by every expression with the same leading steps."""
+
+    __slots__ = ("any_field", "any_index", "fields", "first_path_index", "last_child_path_index", "path_indexes")
+
+    def __init__(self) -> None:
+        self.fields: dict[str, _TrieNode] = {}
+        self.any_field: _TrieNode | None = None
+        self.any_index: _TrieNode | None = None
+        self.path_indexes: list[int] = []
+        # The lowest expression index ending at or below this node
+        self.first_path_index = -1
+        # The highest expression index ending strictly below this node
+        self.last_child_path_index = -1
+
+    def children(self) -> list["_TrieNode"]:
+        """Returns the child nodes, for every kind of step."""
+        children = list(self.fields.values())
+        children.extend(child for child in (self.any_field, self.any_index) if child is not None)
+        return children
+
+    def last_path_index(self) -> int:
+        """Returns the highest expression index ending at or below this node."""
+        return max(self.last_child_path_index, *self.path_indexes, -1)
+
+    def index_path_range(self) -> None:
+        """Records the lowest and highest expression indexes below this node, and below each child."""
+        children = self.children()
+        for child in children:
+            child.index_path_range()
+        self.last_child_path_index = max((child.last_path_index() for child in children), default=-1)
+        self.first_path_index = min(
+            [*self.path_indexes, *(child.first_path_index for child in children if child.first_path_index >= 0)],
+            default=-1,
+        )
+
+
+# A trie node paired with the route of the value the expression was anchored at
+_State = tuple[_TrieNode, tuple[int, ...]]
+
+
+class PathMatch(NamedTuple):
+    """A value matched by one of the expressions.
+
+    Attributes:
+    - path_index: The position of the matching expression in the compiled list.
+    - context: The dictionary or list holding the matched value.
+    - key: The dictionary key, or list index, of the matched value within the context.
+    - order: The sort key that reproduces the jsonpath-ng match order for the expression.
+    - states: The matcher states active at the matched value, used to tell whether processing
+      the match changes what later expressions match.
+    """
+
+    path_index: int
+    context: dict | list
+    key: str | int
+    order: tuple[tuple[int, ...], tuple[int, ...]]
+    states: list[_State]
+
+
+def _expression_to_steps(expression: JSONPath) -> list[_Step]:
+    """Flattens a parsed jsonpath-ng expression into the list of steps the matcher follows.
+
+    Raises:
+    - UnsupportedPathError: If the expression uses syntax outside the supported subset.
+    """
+    if isinstance(expression, Root):
+        return []
+    if isinstance(expression, Child):
+        right_steps = _expression_to_steps(expression.right)
+        if isinstance(expression.right, Root) or _DESCENDANTS in right_steps:
+            raise UnsupportedPathError(str(expression))
+        return _expression_to_steps(expression.left) + right_steps
+    if isinstance(expression, Descendants):
+        if not isinstance(expression.left, Root):
+            raise UnsupportedPathError(str(expression))
+        return [_DESCENDANTS, *_expression_to_steps(expression.right)]
+    if isinstance(expression, Fields) and len(expression.fields) == 1:
+        field = expression.fields[0]
+        return [_ANY_FIELD] if field == "*" else [_Step("field", field)]
+    if (
+        isinstance(expression, Slice)
+        and expression.start is None
+        and expression.end is None
+        and expression.step is None
+    ):
+        return [_ANY_INDEX]
+    raise UnsupportedPathError(str(expression))
+
+
+class PathMatcher:
+    """Finds the matches of a list of JSONPath expressions in a single walk of the schema."""
+
+    def __init__(self, expressions: tuple[JSONPath, ...]) -> None:
+        """Compiles the expressions into a trie.
+
+        Parameters:
+        - expressions: The parsed jsonpath-ng expressions, in the order they are applied.
+
+        Raises:
+        - UnsupportedPathError: If any expression uses syntax outside the supported subset.
+        """
+        self._root = _TrieNode()
+        # Expressions starting with `..` are anchored at every value in the schema
+        self._descendants = _TrieNode()
+
+        for path_index, expression in enumerate(expressions):
+            steps = _expression_to_steps(expression)
+            node = self._root
+            if steps and steps[0] == _DESCENDANTS:
+                node = self._descendants
+                steps = steps[1:]
+            for step in steps:
+                node = self._next_node(node, step)
+            node.path_indexes.append(path_index)
+
+        self._root.index_path_range()
+        self._descendants.index_path_range()
+
+    @staticmethod
+    def _next_node(node: _TrieNode, step: _Step) -> _TrieNode:
+        """Returns the child of the trie node for the step, adding it if needed."""
+        if step == _ANY_INDEX:
+            if node.any_index is None:
+                node.any_index = _TrieNode()
+            return node.any_index
+        if step == _ANY_FIELD:
+            if node.any_field is None:
+                node.any_field = _TrieNode()
+            return node.any_field
+        return node.fields.setdefault(step.name, _TrieNode())
+
+    def matches_within_items(self, field: str) -> bool:
+        """Checks that no expression matches the list under a top-level field, or one of its items, as a whole.
+
+        Matches for the other expressions all lie within a single item, and processing one item
+        cannot change the matches in another, so each item can be converted on its own with the
+        same result as converting the whole schema.
+
+        Parameters:
+        - field: The name of the top-level field.
+
+        Returns:
+        - bool: True if every match is within a single item of the list.
+        """
+        nodes = [
+            self._root.fields.get(field),
+            self._root.any_field,
+            self._descendants.fields.get(field),
+            self._descendants.any_field,
+        ]
+        nodes.extend(node.any_index for node in list(nodes) if node is not None)
+        # A `..[*]` expression matches the items of every list
+        nodes.append(self._descendants.any_index)
+        return not any(node.path_indexes for node in nodes if node is not None)
+
+    def find(
+        self,
+        data: object,
+        first_path_index: int = 0,
+        parents: Parents | None = None,
+    ) -> list[PathMatch]:
+        """Walks the data once and returns every match, ordered as jsonpath-ng would apply them.
+
+        Matches are ordered by expression, then by the position of the value the expression was
+        anchored at, then by the position of the matched value. Every match is found against the
+        data as passed in.
+
+        Parameters:
+        - data: The data to search.
+        - first_path_index: The position of the first expression to find matches for.
+        - parents: Where to record the dictionary or list holding each value visited, its key within
+          it and the value, by the id of the value, if needed.
+
+        Returns:
+        - The matches for the expressions.
+        """
+        walk = _Walk(self._descendants, first_path_index, parents)
+        walk.visit(data, walk.live_states([(self._root, ())]), None, 0, ())
+        walk.matches.sort(key=lambda match: (match.path_index, match.order))
+        return walk.matches
+
+    def apply(
+        self,
+        data: object,
+        process: Process | Sequence[Process],
+        timings: PathTimings | None = None,
+        find: Callable[[object], list[PathMatch]] | None = None,
+    ) -> None:
+        """Processes every match in the data, in order, the same way as evaluating each expression in turn.
+
+        jsonpath-ng evaluates each expression against the data as modified by the expressions before
+        it. The matches are found in a single walk up front, so after processing a match that replaces
+        a dictionary or list, or changes the length of a list, that a later expression could match in,
+        the data is walked again for the remaining expressions.
+
+        Parameters:
+        - data: The data to process.
+        - process: The function to call with the context and key of each match, or one function per expression.
+        - timings: Where to record the time spent on each expression, if path statistics are enabled.
+        - find: The function that finds the matches up front, such as a match location cache, if not `find`.
+        """
+        self._apply(data, process, timings, find or self.find, None)
+
+    def apply_shared(
+        self,
+        data: object,
+        process: Process | Sequence[Process],
+        timings: PathTimings | None = None,
+    ) -> SharedTree:
+        """Processes every match the same way as `apply`, leaving the data unchanged.
+
+        Each dictionary or list that processing changes is copied first, together with those above
+        it, so the output shares every unchanged dictionary and list with the data.
+
+        Parameters:
+        - data: The data to process, which is left unchanged.
+        - process: The function to call with the context and key of each match, or one function per expression.
+        - timings: Where to record the time spent on each expression, if path statistics are enabled.
+
+        Returns:
+        - SharedTree: The output, with its root and the number of dictionaries and lists copied.
+        """
+        tree = SharedTree(data)
+        self._apply(data, process, timings, lambda value: self.find(value, parents=tree.parents), tree)
+        return tree
+
+    def _apply(
+        self,
+        data: object,
+        process: Process | Sequence[Process],
+        timings: PathTimings | None,
+        find: Callable[[object], list[PathMatch]],
+        tree: SharedTree | None,
+    ) -> None:
+        """Processes every match in the data, in order, walking it again after a change later expressions depend on.
+
+        Parameters:
+        - data: The data to process.
+        - process: The function to call with the context and key of each match, or one function per expression.
+        - timings: Where to record the time spent on each expression, if path statistics are enabled.
+        - find: The function that finds the matches up front.
+        - tree: The output to copy changed values into, or None to process the data in place.
+        """
+        start = time.perf_counter()
+        matches = find(data)
+        if timings is not None:
+            timings.walk_seconds += time.perf_counter() - start
+        position = 0
+        changed_path_index: int | None = None
+        while position < len(matches):
+            match = matches[position]
+            if changed_path_index is not None and match.path_index > changed_path_index:
+                start = time.perf_counter()
+                if tree is None:
+                    matches = self.find(data, changed_path_index + 1)
+                else:
+                    matches = self.find(tree.root, changed_path_index + 1, tree.parents)
+                if timings is not None:
+                    timings.find_seconds[changed_path_index] += time.perf_counter() - start
+                position = 0
+                changed_path_index = None
+                continue
+            path_process = process[match.path_index] if isinstance(process, Sequence) else process
+            match_process = path_process if timings is None else timings.timed(path_process, match.path_index)
+            if tree is None:
+                changed = self._process_match(match, match_process)
+            else:
+                changed = tree.process(match.context, match.key, partial(self._process_match_at, match, match_process))
+            if changed:
+                changed_path_index = match.path_index
+            position += 1
+
+    def _process_match(self, match: PathMatch, process: Process) -> bool:
+        """Processes a match and returns whether the later expressions may now match differently."""
+        context, key, path_index = match.context, match.key, match.path_index
+        if isinstance(context, list):
+            old_length = len(context)
+            old_value = context[int(key)]
+            process(context, key)
+            new_values = context[int(key) : int(key) + len(context) - old_length + 1]
+            if len(new_values) != 1 and (
+                self._later_states(match.states, path_index, include_matches=True)
+                or self._descendants.last_child_path_index > path_index
+            ):
+                return True
+        else:
+            old_value = context[str(key)]
+            process(context, key)
+            new_values = [context[str(key)]]
+
+        if len(new_values) == 1 and new_values[0] is old_value:
+            return False
+        return self._later_states(match.states, path_index, include_matches=False) or any(
+            self._may_contain_matches(value, path_index) for value in (old_value, *new_values)
+        )
+
+    def _process_match_at(
+        self,
+        match: PathMatch,
+        process: Process,
+        context: dict | list,
+        key: str | int,
+    ) -> bool:
+        """Processes a match at another context and key, such as a copy of its context, and returns the same."""
+        return self._process_match(match._replace(context=context, key=key), process)
+
+    def _later_states(self, states: list[_State], path_index: int, *, include_matches: bool) -> bool:
+        """Checks whether any state, other than a `..` anchor, leads to a match for a later expression."""
+        for node, _ in states:
+            if node is self._descendants:
+                continue
+            if node.last_child_path_index > path_index:
+                return True
+            if include_matches and any(index > path_index for index in node.path_indexes):
+                return True
+        return False
+
+    def _may_contain_matches(self, value: object, path_index: int) -> bool:
+        """Checks whether a later `..` expression could match anything within the value."""
+        descendants = self._descendants
+        if descendants.last_child_path_index <= path_index:
+            return False
+        if descendants.any_index is not None:
+            # A `..[*]` expression matches any scalar
+            return True
+
+        pending = [value]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, dict):
+                if descendants.any_field is not None:
+                    return True
+                for child_key, child_value in item.items():
+                    child_node = descendants.fields.get(child_key)
+                    if child_node is not None and child_node.last_path_index() > path_index:
+                        return True
+                    if isinstance(child_value, dict | list):
+                        pending.append(child_value)
+            elif isinstance(item, list):
+                pending.extend(child_value for child_value in item if isinstance(child_value, dict | list))
+        return False
+
+
+class _Walk:
+    """The state of a single walk of the data by a matcher."""
+
+    def __init__(
+        self,
+        descendants: _TrieNode,
+        first_path_index: int,
+        parents: Parents | None = None,
+    ) -> None:
+        self.descendants = descendants
+        self.parents = parents
+        # A `..[*]` expression can match a scalar by wrapping it in a list, so scalars need visiting too
+        self.descendants_match_scalars = descendants.any_index is not None
+        self.first_path_index = first_path_index
+        self.descend = self.descendants.last_path_index() >= first_path_index
+        self.matches: list[PathMatch] = []
+
+    def live_states(self, states: list[_State]) -> list[_State]:
+        """Drops the states that can only lead to matches for expressions before the first one."""
+        return [state for state in states if state[0].last_path_index() >= self.first_path_index]
+
+    def visit(
+        self,
+        value: object,
+        states: list[_State],
+        context: dict | list | None,
+        key: str | int,
+        route: tuple[int, ...],
+        *,
+        descend: bool = True,
+    ) -> None:
+        """Matches the active trie states against a value and then against its children.
+
+        Parameters:
+        - value: The value being visited.
+        - states: The trie nodes to match against the value, with their anchors.
+        - context: The dictionary or list holding the value, None for the root.
+        - key: The key or index of the value within the context.
+        - route: The position of the value, as child positions from the root.
+        - descend: Whether `..` expressions are anchored at this value and its children.
+        """
+        descend = descend and self.descend
+        if descend:
+            states = [*states, (self.descendants, route)]
+
+        for node, anchor in states:
+            if node.path_indexes and context is not None:
+                self.matches.extend(
+                    PathMatch(path_index, context, key, (anchor, route), states)
+                    for path_index in node.path_indexes
+                    if path_index >= self.first_path_index
+                )
+            if node.any_index is not None and not isinstance(value, list):
+                self.visit_wrapped(value, (node.any_index, anchor), route)
+
+        if isinstance(value, dict):
+            self.visit_dict(value, states, route, descend=descend)
+        elif isinstance(value, list):
+            self.visit_list(value, states, route, descend=descend)
+
+    def visit_dict(self, value: dict, states: list[_State], route: tuple[int, ...], *, descend: bool) -> None:
+        """Visits the values in a dictionary, following the field steps of the active states."""
+        for position, (child_key, child_value) in enumerate(value.items()):
+            child_states: list[_State] = []
+            for node, anchor in states:
+                field_node = node.fields.get(child_key)
+                if field_node is not None:
+                    child_states.append((field_node, anchor))
+                if node.any_field is not None:
+                    child_states.append((node.any_field, anchor))
+            child_states = self.live_states(child_states)
+            if child_states or (descend and self.may_descend(child_value)):
+                if self.parents is not None:
+                    self.parents[id(child_value)] = (value, child_key, child_value)
+                self.visit(child_value, child_states, value, child_key, (*route, position), descend=descend)
+
+    def visit_list(self, value: list, states: list[_State], route: tuple[int, ...], *, descend: bool) -> None:
+        """Visits the items in a list, following the `[*]` steps of the active states."""
+        index_states = self.live_states(
+            [(node.any_index, anchor) for node, anchor in states if node.any_index is not None],
+        )
+        for index, child_value in enumerate(value):
+            if index_states or (descend and self.may_descend(child_value)):
+                if self.parents is not None:
+                    self.parents[id(child_value)] = (value, index, child_value)
+                self.visit(child_value, index_states, value, index, (*route, index), descend=descend)
+
+    def may_descend(self, value: object) -> bool:
+        """Checks whether a value with no active states can still match a `..` expression."""
+        return isinstance(value, dict | list) or self.descendants_match_scalars
+
+    def visit_wrapped(self, value: object, state: _State, route: tuple[int, ...]) -> None:
+        """Applies `[*]` to a value that is not a list, the way jsonpath-ng does.
+
+        jsonpath-ng treats a truthy dictionary, string or number as a single element list, so the
+        value is matched again inside a throwaway list. Other truthy values cannot be sliced, and
+        jsonpath-ng raises a TypeError as soon as it reaches them, so they are matched in their own
+        throwaway list first, where processing them raises the same error.
+        """
+        if not value:
+            return
+        if isinstance(value, dict | int | str):
+            self.visit(value, [state], [value], 0, (*route, 0), descend=False)
+            return
+        first_path_index = max(state[0].first_path_index, self.first_path_index)
+        self.matches.append(PathMatch(first_path_index, [value], 0, ((), ()), []))
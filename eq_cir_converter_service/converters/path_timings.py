@@ -0,0 +1,75 @@
+"""Timings of each JSONPath expression in a conversion, recorded when path statistics are enabled."""
+
+import time
+from collections.abc import Callable
+
+
+class PathTimings:
+    """The time spent finding and processing the matches of each JSONPath expression.
+
+    With the single-pass matcher every expression is found in the same walk of the schema, so the
+    first walk is recorded on its own, and a walk repeated after a match changes the schema is
+    recorded against the expression of that match. When each expression is evaluated separately,
+    the time to evaluate it is its find time.
+
+    Attributes:
+    - find_seconds: The time spent finding the matches of each expression.
+    - matches: The number of matches of each expression.
+    - process_seconds: The time spent processing the matches of each expression.
+    - list_expansions: The number of matches of each expression that changed the length of the
+      list holding them, by replacing a list item with several items.
+    - walk_seconds: The time spent on the first walk of the schema by the single-pass matcher.
+    """
+
+    __slots__ = ("find_seconds", "list_expansions", "matches", "process_seconds", "walk_seconds")
+
+    def __init__(self, path_count: int) -> None:
+        """Creates empty timings.
+
+        Parameters:
+        - path_count: The number of JSONPath expressions.
+        """
+        self.find_seconds = [0.0] * path_count
+        self.matches = [0] * path_count
+        self.process_seconds = [0.0] * path_count
+        self.list_expansions = [0] * path_count
+        self.walk_seconds = 0.0
+
+    def timed(
+        self,
+        process: Callable[[dict | list, str | int], None],
+        path_index: int,
+    ) -> Callable[[dict | list, str | int], None]:
+        """Wraps the function that processes a match, to record the match against the expression.
+
+        Parameters:
+        - process: The function to call with the context and key of the match.
+        - path_index: The position of the expression that matched.
+
+        Returns:
+        - Callable: The function, recording its time and whether it expanded a list.
+        """
+
+        def timed_process(context: dict | list, key: str | int) -> None:
+            old_length = len(context)
+            start = time.perf_counter()
+            process(context, key)
+            self.process_seconds[path_index] += time.perf_counter() - start
+            self.matches[path_index] += 1
+            if isinstance(context, list) and len(context) != old_length:
+                self.list_expansions[path_index] += 1
+
+        return timed_process
+
+    def add(self, other: "PathTimings") -> None:
+        """Adds the timings of another conversion to these timings.
+
+        Parameters:
+        - other: The timings to add, for the same JSONPath expressions.
+        """
+        for path_index, matches in enumerate(other.matches):
+            self.find_seconds[path_index] += other.find_seconds[path_index]
+            self.matches[path_index] += matches
+            self.process_seconds[path_index] += other.process_seconds[path_index]
+            self.list_expansions[path_index] += other.list_expansions[path_index]
+        self.walk_seconds += other.walk_seconds
@@ -0,0 +1,282 @@
+"""A registry of the conversions between schema versions, resolved into cached conversion plans.
+
+Each conversion step converts schemas from a range of versions to a target version, either by
+processing the matches of a list of JSONPath expressions or with a function that converts the whole
+schema. The shortest chain of steps from a current version to a target version is compiled into a
+plan once, and the plan is cached for every later conversion between the same versions.
+
+Consecutive steps that process JSONPath matches are fused into a single stage: their expressions are
+compiled together into one matcher, each with the process of its own step, so the schema is walked
+once for all of them rather than once per step. The matcher processes the matches of each expression
+against the schema as changed by the expressions before it, so a fused stage gives the same result as
+applying its steps one after another.
+"""
+
+import copy
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import NamedTuple, cast
+
+from semver import VersionInfo
+
+from eq_cir_converter_service.converters.compiled_paths import CompiledPaths, apply_compiled_paths, compile_paths
+from eq_cir_converter_service.converters.path_matcher import Process
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.types.custom_types import Schema
+
+# The function called with the compiled paths of a stage and the time spent on each of them
+RecordTimings = Callable[[CompiledPaths, PathTimings], None]
+
+
+def version_in_range(version: str, version_range: str) -> bool:
+    """Checks whether a version is in a range of space separated comparisons, such as ">=9.0.0 <10.0.0".
+
+    Parameters:
+    - version: The semantic version to check.
+    - version_range: The comparisons the version must all match, or "*" for any version.
+
+    Returns:
+    - bool: Whether the version is in the range.
+    """
+    if version_range == "*":
+        return True
+    parsed_version = VersionInfo.parse(version)
+    return all(parsed_version.match(comparison) for comparison in version_range.split())
+
+
+class ConversionStep(NamedTuple):
+    """A conversion from a range of schema versions to a target version.
+
+    Attributes:
+    - name: The name of the step, used in logs.
+    - source_range: The versions the step converts from, as space separated comparisons, or "*" for any version.
+    - target_version: The version the step converts to.
+    - paths: The JSONPath expressions whose matches the step processes, in order.
+    - process: The function to call with the context and key of each match of the paths.
+    - convert: The function that converts a whole schema, for a step that does not process matches.
+    """
+
+    name: str
+    source_range: str
+    target_version: str
+    paths: tuple[str, ...] = ()
+    process: Process | None = None
+    convert: Callable[[Schema], Schema] | None = None
+
+
+@dataclass(frozen=True)
+class ConversionStage:
+    """A part of a conversion plan, applied with a single walk of the schema.
+
+    Attributes:
+    - step_names: The names of the steps the stage applies.
+    - compiled_paths: The JSONPath expressions of every step, compiled together, or None for a function step.
+    - processes: The process of the step of each compiled path.
+    - convert: The function of a step that converts the whole schema.
+    """
+
+    step_names: tuple[str, ...]
+    compiled_paths: CompiledPaths | None = None
+    processes: tuple[Process, ...] = ()
+    convert: Callable[[Schema], Schema] | None = None
+
+    def apply(self, schema: Schema, *, in_place: bool, record_timings: RecordTimings | None = None) -> Schema:
+        """Applies the steps of the stage to the schema.
+
+        Parameters:
+        - schema: The schema to convert.
+        - in_place: Whether to convert the schema in place, or leave it unchanged.
+        - record_timings: The function to record the time spent on each path with, if path statistics are enabled.
+
+        Returns:
+        - dict: The converted schema.
+        """
+        if self.convert is not None:
+            return self.convert(schema if in_place else copy.deepcopy(schema))
+        compiled_paths = cast(CompiledPaths, self.compiled_paths)
+        if record_timings is None:
+            return apply_compiled_paths(schema, compiled_paths, self.processes, in_place=in_place)
+
+        timings = PathTimings(len(compiled_paths.paths))
+        output_schema = apply_compiled_paths(schema, compiled_paths, self.processes, timings, in_place=in_place)
+        record_timings(compiled_paths, timings)
+        return output_schema
+
+
+@dataclass(frozen=True)
+class ConversionPlan:
+    """The stages that convert a schema from a current version to a target version.
+
+    Attributes:
+    - current_version: The version the plan converts from.
+    - target_version: The version the plan converts to.
+    - stages: The stages, in the order they are applied, or none if there is no conversion between the versions.
+    """
+
+    current_version: str
+    target_version: str
+    stages: tuple[ConversionStage, ...] = ()
+
+    @property
+    def step_names(self) -> tuple[str, ...]:
+        """The names of the steps of the plan, in the order they are applied."""
+        return tuple(name for stage in self.stages for name in stage.step_names)
+
+    def converts_items_separately(self, field: str) -> bool:
+        """Checks whether each item of the list under a top-level field converts on its own, as in the whole schema.
+
+        Parameters:
+        - field: The name of the top-level field.
+
+        Returns:
+        - bool: True if every stage matches paths with the single-pass matcher, and every match is within a single item.
+        """
+        return all(
+            stage.compiled_paths is not None
+            and stage.compiled_paths.matcher is not None
+            and stage.compiled_paths.matcher.matches_within_items(field)
+            for stage in self.stages
+        )
+
+    def apply(self, schema: Schema, *, in_place: bool = True, record_timings: RecordTimings | None = None) -> Schema:
+        """Converts the schema from the current version to the target version.
+
+        Parameters:
+        - schema: The schema to convert.
+        - in_place: Whether to convert the schema in place. Otherwise the schema is left unchanged.
+        - record_timings: The function to record the time spent on each path with, if path statistics are enabled.
+
+        Returns:
+        - dict: The converted schema, or the schema itself if the plan has no stages.
+        """
+        for stage in self.stages:
+            schema = stage.apply(schema, in_place=in_place, record_timings=record_timings)
+        return schema
+
+
+def fuse_steps(steps: list[ConversionStep]) -> ConversionStage:
+    """Returns a stage that processes the matches of every step, with the paths of the steps compiled together."""
+    paths = tuple(path for step in steps for path in step.paths)
+    processes = tuple(step.process for step in steps if step.process is not None for _ in step.paths)
+    return ConversionStage(
+        step_names=tuple(step.name for step in steps),
+        compiled_paths=compile_paths(paths),
+        processes=processes,
+    )
+
+
+def compile_plan(current_version: str, target_version: str, steps: tuple[ConversionStep, ...]) -> ConversionPlan:
+    """Compiles a chain of steps into a plan, fusing each run of consecutive steps that process matches.
+
+    Parameters:
+    - current_version: The version the steps convert from.
+    - target_version: The version the steps convert to.
+    - steps: The steps, in the order they are applied.
+
+    Returns:
+    - ConversionPlan: The plan.
+    """
+    stages: list[ConversionStage] = []
+    path_steps: list[ConversionStep] = []
+    for step in steps:
+        if step.convert is None:
+            path_steps.append(step)
+            continue
+        if path_steps:
+            stages.append(fuse_steps(path_steps))
+            path_steps = []
+        stages.append(ConversionStage(step_names=(step.name,), convert=step.convert))
+    if path_steps:
+        stages.append(fuse_steps(path_steps))
+    return ConversionPlan(current_version, target_version, tuple(stages))
+
+
+class ConverterRegistry:
+    """The conversion steps between schema versions, with a least recently used cache of conversion plans."""
+
+    def __init__(self, *, max_plans: int) -> None:
+        """Creates an empty registry.
+
+        Parameters:
+        - max_plans: The number of plans, one for each pair of current and target versions, kept in the cache.
+        """
+        self.max_plans = max_plans
+        self._steps: list[ConversionStep] = []
+        self._plans: OrderedDict[tuple[str, str], ConversionPlan] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def steps(self) -> tuple[ConversionStep, ...]:
+        """The registered steps, in the order they were registered."""
+        return tuple(self._steps)
+
+    def register(self, step: ConversionStep) -> None:
+        """Adds a conversion step, clearing the cached plans as they may now resolve differently.
+
+        Parameters:
+        - step: The step to add.
+
+        Raises:
+        - ValueError: If the step does not have either paths and a process, or a convert function.
+        """
+        if (step.convert is None) == (step.process is None) or (step.process is not None and not step.paths):
+            message = f"Conversion step {step.name} must have either paths and a process, or a convert function"
+            raise ValueError(message)
+        with self._lock:
+            self._steps.append(step)
+            self._plans.clear()
+
+    def resolve(self, current_version: str, target_version: str) -> tuple[ConversionStep, ...]:
+        """Returns the shortest chain of steps from the current version to the target version.
+
+        Parameters:
+        - current_version: The version to convert from.
+        - target_version: The version to convert to.
+
+        Returns:
+        - tuple: The steps, in the order they are applied, or none if no chain of steps reaches the target version.
+        """
+        steps = self.steps
+        seen_versions = {current_version}
+        pending: deque[tuple[str, tuple[ConversionStep, ...]]] = deque([(current_version, ())])
+        while pending:
+            version, chain = pending.popleft()
+            for step in steps:
+                if step.target_version in seen_versions or not version_in_range(version, step.source_range):
+                    continue
+                if step.target_version == target_version:
+                    return (*chain, step)
+                seen_versions.add(step.target_version)
+                pending.append((step.target_version, (*chain, step)))
+        return ()
+
+    def plan(self, current_version: str, target_version: str) -> ConversionPlan:
+        """Returns the plan that converts a schema between the versions, compiling it unless it is in the cache.
+
+        Parameters:
+        - current_version: The version to convert from.
+        - target_version: The version to convert to.
+
+        Returns:
+        - ConversionPlan: The plan, with no stages if there is no conversion between the versions.
+        """
+        key = (current_version, target_version)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                return plan
+
+        plan = compile_plan(current_version, target_version, self.resolve(current_version, target_version))
+        with self._lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self) -> None:
+        """Removes every cached plan."""
+        with self._lock:
+            self._plans.clear()
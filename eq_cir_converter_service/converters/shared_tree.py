@@ -0,0 +1,183 @@
+"""The output of a conversion that leaves its input unchanged, sharing every unchanged subtree with it.
+
+A conversion that leaves its input unchanged copies a dictionary or list only when one of its
+values is changed, together with the dictionaries and lists above it, and shares everything else
+with the input. The cost of the copies is proportional to the number of changed values and their
+depth, rather than to the size of the schema, as it would be for a deep copy of the input.
+"""
+
+from collections.abc import Callable
+
+Container = dict | list
+
+# The dictionary or list holding each value visited by the matcher, its key within it and the value, by the value id
+Parents = dict[int, tuple[Container, str | int, object]]
+
+
+def shallow_copy(value: Container) -> Container:
+    """Returns a copy of a dictionary or list, sharing its values."""
+    return dict(value) if isinstance(value, dict) else list(value)
+
+
+class SharedTree:
+    """A tree of dictionaries and lists built from an input tree by copying only along changed paths.
+
+    The parent of each dictionary or list is recorded as the matcher walks the tree, so that when a
+    value is changed, its dictionary or list and those above it can be copied and linked into the
+    output, up to the root. Each input dictionary or list is copied at most once, and later changes
+    within it are made to the copy.
+
+    Attributes:
+    - root: The root of the output, which is the input until the first change.
+    - parents: The dictionary or list holding each value visited by the matcher, its key within
+      it and the value, by the id of the value. The value is kept so that its id is not reused.
+    """
+
+    def __init__(self, root: object) -> None:
+        """Starts the output as the input, with nothing copied.
+
+        Parameters:
+        - root: The root of the input.
+        """
+        self.root = root
+        self._input_root = root
+        self.parents: Parents = {}
+        # Each dictionary or list that has been copied, and its copy, by the id of the dictionary or list
+        self._copies: dict[int, tuple[Container, Container]] = {}
+        # The ids of the copies, which can be changed without changing the input
+        self._owned: set[int] = set()
+        # The ids of the copies that have been linked into the output in place of their values
+        self._linked: set[int] = set()
+        # The number of dictionaries and lists copied, so the cost of a conversion can be measured
+        self.copy_count = 0
+
+    def current(self, value: Container) -> Container:
+        """Returns the copy of a dictionary or list if it has been copied, otherwise the value itself."""
+        copied = self._copies.get(id(value))
+        return copied[1] if copied is not None and copied[0] is value else value
+
+    def own(self, value: Container) -> Container:
+        """Returns a copy of a dictionary or list, linked into the output in its place, that can be changed.
+
+        The dictionaries and lists above the value are copied too, up to the root. A value that is
+        not in the output, such as the single item list the matcher wraps a value in, is copied
+        but not linked.
+
+        Parameters:
+        - value: The dictionary or list, from the input or the output.
+
+        Returns:
+        - dict | list: The copy.
+        """
+        copied = self._copy(value)
+        if copied is value or id(copied) in self._linked:
+            return copied
+        self._linked.add(id(copied))
+        if value is self._input_root:
+            self.root = copied
+            return copied
+
+        parent_key_value = self.parents.get(id(value))
+        if parent_key_value is not None and parent_key_value[2] is value:
+            parent = self.own(parent_key_value[0])
+            self._link(parent, parent_key_value[1], value, copied)
+        return copied
+
+    def own_subtree(self, value: object) -> object:
+        """Returns a copy of a value in which every dictionary and list can be changed, if it holds any.
+
+        Parameters:
+        - value: The value, held by a dictionary or list that has already been copied.
+
+        Returns:
+        - object: The copy of the value, or the value itself if it is not a dictionary or list.
+        """
+        if not isinstance(value, dict | list):
+            return value
+        copied = self._copy(value)
+        for key, child in copied.items() if isinstance(copied, dict) else enumerate(copied):
+            owned_child = self.own_subtree(child)
+            if owned_child is not child:
+                copied[key] = owned_child
+        return copied
+
+    def is_output(self, value: Container) -> bool:
+        """Checks whether a dictionary or list is the root of the output or held by a value in it."""
+        parent_key_value = self.parents.get(id(value))
+        return (
+            value is self._input_root
+            or (parent_key_value is not None and parent_key_value[2] is value)
+            or id(value) in self._owned
+        )
+
+    def process(
+        self,
+        context: Container,
+        key: str | int,
+        process: Callable[[Container, str | int], bool],
+    ) -> bool:
+        """Processes a value in the output, copying it and the values above it first if processing may change it.
+
+        The value is processed in a scratch dictionary or list, as a copy if it is a dictionary or
+        list, since processing can change the values within it. The result is only copied into the
+        output, with the dictionaries and lists above it, if it differs from the value.
+
+        Parameters:
+        - context: The dictionary or list holding the value, from the input or the output.
+        - key: The key or index of the value within the context.
+        - process: The function to process the value with, given the context and key, returning
+          whether the later expressions may now match differently.
+
+        Returns:
+        - bool: The result of the process function.
+        """
+        if not self.is_output(context):
+            # The matcher wraps a value in a single item list of its own, where processing can only
+            # change the value itself, so the value is copied into the output to be processed
+            value = context[key]  # type: ignore[index]
+            if isinstance(value, dict | list):
+                context[key] = self.own_subtree(self.own(value))  # type: ignore[index]
+            return process(context, key)
+
+        current = self.current(context)
+        value = current[key]  # type: ignore[index]
+        # The copies of the dictionaries and lists within the value are kept, even if unchanged, so
+        # later matches within them are made to the copies
+        scratch: Container = [self.own_subtree(value)] if isinstance(current, list) else {key: self.own_subtree(value)}
+        changed = process(scratch, 0 if isinstance(current, list) else key)
+        new_values = scratch if isinstance(scratch, list) else list(scratch.values())
+        if len(new_values) == 1 and (new_values[0] is value or new_values[0] == value):
+            return changed
+
+        owned = self.own(context)
+        if isinstance(owned, list):
+            owned[int(key) : int(key) + 1] = new_values
+        else:
+            owned[key] = new_values[0]
+        return changed
+
+    def _copy(self, value: Container) -> Container:
+        """Returns the copy of a dictionary or list, copying it if it has not been copied."""
+        if id(value) in self._owned:
+            return value
+        copied = self.current(value)
+        if copied is value:
+            copied = shallow_copy(value)
+            self._copies[id(value)] = (value, copied)
+            self._owned.add(id(copied))
+            self.copy_count += 1
+        return copied
+
+    @staticmethod
+    def _link(parent: Container, key: str | int, value: Container, copied: Container) -> None:
+        """Replaces a value with its copy in the copy of the dictionary or list holding it."""
+        if isinstance(parent, dict):
+            if parent.get(str(key)) is value:
+                parent[str(key)] = copied
+            return
+        index = int(key)
+        if index >= len(parent) or parent[index] is not value:
+            # Items before the value have been replaced by several items since it was visited
+            index = next((position for position, item in enumerate(parent) if item is value), -1)
+        if index >= 0:
+            parent[index] = copied
@@ -0,0 +1,101 @@
+"""A memo table for pure string transforms, shared by every conversion in the process.
+
+Questionnaires repeat the same strings many times, such as "Yes", "No", standard guidance and legal
+text, within a schema and across schemas. A transform whose result depends only on its input string
+is memoised here, so each distinct string is transformed once until it is evicted.
+
+List results are stored as tuples and returned as new lists, so a caller that changes the list it
+is given, such as the splice of paragraphs into a schema list, never changes the memoised result.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import NamedTuple
+
+
+class StringMemoStats(NamedTuple):
+    """A snapshot of a string memo.
+
+    Attributes:
+    - hits: The number of transforms returned from the memo.
+    - misses: The number of transforms computed because the string was not in the memo.
+    - hit_rate: The share of transforms returned from the memo, from 0 to 1.
+    - evictions: The number of entries removed to keep the memo within its size.
+    - entries: The number of strings in the memo.
+    - max_entries: The size of the memo.
+    """
+
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    entries: int
+    max_entries: int
+
+
+class StringMemo:
+    """A least recently used memo of the results of a string transform, with a maximum number of entries."""
+
+    def __init__(self, transform: Callable[[str], str | list[str]], *, max_entries: int) -> None:
+        """Creates an empty memo.
+
+        Parameters:
+        - transform: The transform to memoise. Its result must depend only on the string.
+        - max_entries: The number of strings to keep the results of, or 0 to disable the memo.
+        """
+        self.transform = transform
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, str | tuple[str, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __call__(self, text: str) -> str | list[str]:
+        """Returns the result of the transform for the string, from the memo if it is there.
+
+        Parameters:
+        - text: The string to transform.
+
+        Returns:
+        - str | list[str]: The result of the transform. A list is always a new list.
+        """
+        if self.max_entries <= 0:
+            return self.transform(text)
+
+        with self._lock:
+            memoised = self._entries.get(text)
+            if memoised is not None:
+                self._entries.move_to_end(text)
+                self._hits += 1
+                return memoised if isinstance(memoised, str) else list(memoised)
+            self._misses += 1
+
+        # The transform runs outside the lock, so two threads may both compute a new string
+        result = self.transform(text)
+        with self._lock:
+            self._entries[text] = result if isinstance(result, str) else tuple(result)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    def clear(self) -> None:
+        """Removes every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> StringMemoStats:
+        """Returns the memo counters and size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return StringMemoStats(
+                hits=self._hits,
+                misses=self._misses,
+                hit_rate=round(self._hits / lookups, 4) if lookups else 0.0,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+            )
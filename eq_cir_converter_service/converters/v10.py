@@ -3,8 +3,10 @@
 import re
 from collections import Counter
 
-from jsonpath_ng.ext import parse
-
+from eq_cir_converter_service.config import settings
+from eq_cir_converter_service.converters.compiled_paths import CompiledPaths, apply_compiled_paths, compile_paths
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.converters.string_memo import StringMemo
 from eq_cir_converter_service.types.custom_types import Schema
 
 # Compiled regular expressions for HTML tag processing
@@ -15,18 +17,31 @@ REGEX_BR_TAGS = re.compile(r"</?br>", flags=re.IGNORECASE)
 REGEX_PARAGRAPH_SPLIT = re.compile(r"<p>(.*?)</p>", flags=re.IGNORECASE | re.DOTALL)
 REGEX_PLACEHOLDER = re.compile(r"\{(.*?)}", flags=re.IGNORECASE)
 
+# The same tags as above, combined so they are cleaned in two passes rather than four
+REGEX_B_TAGS = re.compile(r"<\s*(/)?\s*b\s*>", flags=re.IGNORECASE)
+REGEX_BR_AND_P_TAGS = re.compile(r"</?(?:br|p)>", flags=re.IGNORECASE)
+
 PlaceholdersDict = dict[str, str | list | object]
 
 
-def convert_to_v10(schema: Schema, jsonpaths: list[str]) -> Schema:
+def convert_to_v10(
+    schema: Schema,
+    jsonpaths: list[str] | CompiledPaths,
+    timings: PathTimings | None = None,
+    *,
+    in_place: bool = True,
+) -> Schema:
     """Transforms the schema dictionary based on the provided JSONPath expressions.
 
     Following steps are performed:
-    1. Iterate over each JSONPath expression in the paths list.
-    2. For each path, use the jsonpath-ng library to find all matching elements
-    in the schema.
-    3. For each matched element, retrieve the context (the parent structure) and
-    the path data (information about the matched element).
+    1. Compile the JSONPath expressions (or fetch them from the compiled paths cache),
+    unless they are already compiled.
+    2. Find all matching elements in the schema for every expression, either in a single
+    walk of the schema with the single-pass matcher, from the match location cache if a schema
+    of the same shape has been matched before, or, if an expression is not supported by the
+    matcher, by evaluating each expression in turn with the jsonpath-ng library.
+    3. For each matched element, in the order of the expressions, retrieve the context (the
+    parent structure) and the key or index of the element within it.
     4. Return a single context or list of contexts (e.g. "$.title",
     can only return one survey title, so a single context but "$..question.description[*]"
     will likely return multiple elements, depending on schema structure),
@@ -35,28 +50,54 @@ def convert_to_v10(schema: Schema, jsonpaths: list[str]) -> Schema:
 
     Parameters:
     - schema: The input schema to transform.
-    - jsonpaths: A list containing JSONPath paths to look for.
+    - jsonpaths: A list containing JSONPath paths to look for, or the compiled paths.
+    - timings: Where to record the time spent on each path, if path statistics are enabled.
+    - in_place: Whether to transform the schema in place. Otherwise the schema is left unchanged, and
+      the transformed schema shares every dictionary and list that is not changed with it.
 
     Returns:
     - A new schema with the transformations applied.
     """
-    for jsonpath in jsonpaths:
-        jsonpath_expression = parse(jsonpath)
-        for match in jsonpath_expression.find(schema):
-            matched_context = match.context.value
-            matched_path = match.path
-            if hasattr(matched_path, "index"):
-                process_context_list(matched_context, matched_path.index)
-            elif hasattr(matched_path, "fields"):
-                key = matched_path.fields[0]
-                matched_context[key] = process_item(matched_context[key])
+    compiled_paths = jsonpaths if isinstance(jsonpaths, CompiledPaths) else compile_paths(tuple(jsonpaths))
+    return apply_compiled_paths(schema, compiled_paths, process_match, timings, in_place=in_place)
+
 
-    return schema
+def process_match(context: dict | list, key: str | int) -> None:
+    """Processes a matched element in place, within the dictionary or list holding it.
+
+    Parameters:
+    - context: The dictionary or list holding the matched element.
+    - key: The dictionary key, or list index, of the matched element.
+    """
+    if isinstance(context, list):
+        process_context_list(context, int(key))
+    else:
+        context[str(key)] = process_item(context[str(key)])
 
 
 def get_sanitised_text(text: str) -> str:
     """Cleans HTML tags from the text, replacing <b> with <strong> and removing <br> and <p> tags.
 
+    :param text: The input text containing HTML tags.
+    :return: The cleaned text with HTML tags removed or replaced.
+    """
+    if "<" not in text:
+        # No tags to clean, and strip returns the same string when there is no whitespace to remove
+        return text.strip()
+
+    sanitised = REGEX_BR_AND_P_TAGS.sub("", REGEX_B_TAGS.sub(r"<\1strong>", text))
+    if "<" in sanitised and REGEX_P_TAGS.search(sanitised):
+        # Removing <br> tags before <p> tags also removes a <p> tag made by joining the text either
+        # side of a <br> tag, such as "<<br>p>", so the tags are removed one kind at a time instead
+        return get_sanitised_text_chained(text)
+    return sanitised.strip()
+
+
+def get_sanitised_text_chained(text: str) -> str:
+    """Cleans HTML tags from the text with one substitution for each kind of tag, in turn.
+
+    This is the definition of the sanitised text, which `get_sanitised_text` returns in fewer passes.
+
     :param text: The input text containing HTML tags.
     :return: The cleaned text with HTML tags removed or replaced.
     """
@@ -72,6 +113,39 @@ def get_sanitised_text(text: str) -> str:
     ).strip()
 
 
+def sanitise_html(text: str) -> str | list[str]:
+    """Cleans HTML tags from the text, or splits it into cleaned paragraphs if it has any.
+
+    The paragraphs are found in a single scan of the text, and text without any tags is not scanned at all.
+    Text with tags is cleaned once and then served from the memo of cleaned HTML, which is shared by
+    every conversion, so the same text in a later schema is not scanned again.
+
+    :param text: The input text containing HTML tags.
+    :return: The cleaned text if it has no paragraphs, otherwise a new list of cleaned paragraphs,
+             leaving out the paragraphs that are empty.
+    """
+    if "<" not in text:
+        return text.strip()
+    return sanitised_html_memo(text)
+
+
+def sanitise_tagged_html(text: str) -> str | list[str]:
+    """Cleans HTML tags from text that has tags, or splits it into cleaned paragraphs if it has any.
+
+    :param text: The input text containing HTML tags.
+    :return: The cleaned text if it has no paragraphs, otherwise the list of cleaned paragraphs,
+             leaving out the paragraphs that are empty.
+    """
+    paragraphs = REGEX_PARAGRAPH_SPLIT.findall(text)
+    if not paragraphs:
+        return get_sanitised_text(text)
+    return [get_sanitised_text(stripped) for paragraph in paragraphs if (stripped := paragraph.strip())]
+
+
+# The cleaned HTML of each distinct text with tags, kept for every conversion in the process
+sanitised_html_memo = StringMemo(sanitise_tagged_html, max_entries=settings.CONVERSION_STRING_MEMO_SIZE)
+
+
 def split_paragraphs_into_list(paragraphs_string: str) -> list[str]:
     """Extracts paragraphs from string, returning a list of cleaned paragraph strings.
 
@@ -154,26 +228,38 @@ def split_paragraphs_with_placeholders(
     }
     :return: A list of cleaned paragraphs or dictionaries with placeholders.
     """
-    placeholder_text = str(placeholders_dict.get("text", ""))
-    placeholders = placeholders_dict.get("placeholders", [])
-    paragraphs = split_paragraphs_into_list(placeholder_text)
+    paragraphs = sanitise_html(str(placeholders_dict.get("text", "")))
+    if isinstance(paragraphs, str):
+        return []
+    return attach_placeholders(paragraphs, placeholders_dict.get("placeholders", []))
+
+
+def attach_placeholders(paragraphs: list[str], placeholders: object) -> list[str | PlaceholdersDict]:
+    """Attaches to each cleaned paragraph the definitions of the placeholders it contains.
 
+    The definitions are indexed by name once, when the first paragraph with a placeholder is found,
+    rather than searched for each placeholder in each paragraph.
+
+    :param paragraphs: The cleaned paragraphs.
+    :param placeholders: The placeholder definitions of the text the paragraphs were split from.
+    :return: A list of the paragraphs, as dictionaries with their placeholders where they contain any.
+    """
     output_paragraphs: list[str | dict[str, str | list | object]] = []
-    for paragraph in paragraphs:
-        sanitised_paragraph = get_sanitised_text(paragraph)
+    definitions: dict[str, object] | None = None
+    for sanitised_paragraph in paragraphs:
         placeholders_found_in_paragraph = Counter(extract_placeholder_names_from_text_field(sanitised_paragraph))
-        paragraphs_with_matching_placeholders: list[dict] = []
-        for placeholder_name, count in placeholders_found_in_paragraph.items():
-            paragraphs_with_placeholders_definitions = []
-            # placeholders are always a list
-            for placeholder in placeholders:  # type: ignore
-                if placeholder.get("placeholder", None) == placeholder_name:
-                    paragraphs_with_placeholders_definitions = [placeholder]
-
-            if paragraphs_with_placeholders_definitions:
-                paragraphs_with_matching_placeholders.extend(
-                    paragraphs_with_placeholders_definitions[0] for _ in range(count)
-                )
+        if not placeholders_found_in_paragraph:
+            output_paragraphs.append(sanitised_paragraph)
+            continue
+        if definitions is None:
+            definitions = index_placeholders(placeholders)
+
+        paragraphs_with_matching_placeholders = [
+            definitions[placeholder_name]
+            for placeholder_name, count in placeholders_found_in_paragraph.items()
+            if placeholder_name in definitions
+            for _ in range(count)
+        ]
         if paragraphs_with_matching_placeholders:
             output_paragraphs.append(
                 {"text": sanitised_paragraph, "placeholders": paragraphs_with_matching_placeholders},
@@ -184,19 +270,34 @@ def split_paragraphs_with_placeholders(
     return output_paragraphs
 
 
+def index_placeholders(placeholders: object) -> dict[str, object]:
+    """Indexes the placeholder definitions of a text object by placeholder name.
+
+    Where more than one definition has the same name, the last one is used.
+
+    :param placeholders: The list of placeholder definitions.
+    :return: The placeholder definitions by name.
+    """
+    # placeholders are always a list
+    return {
+        placeholder.get("placeholder", None): placeholder
+        for placeholder in placeholders  # type: ignore
+        if isinstance(placeholder.get("placeholder", None), str)
+    }
+
+
 def process_string(string: str) -> str | list[str]:
     """Processes a string, cleaning HTML tags and splitting into paragraphs if necessary.
 
     :param string: The input string to process.
     :return: A cleaned string or a list of paragraphs.
     """
-    if REGEX_PARAGRAPH_SPLIT.search(string):
-        # If the text contains <p> tags, split into paragraphs
-        # and clean each paragraph
-        paragraphs = [get_sanitised_text(paragraph) for paragraph in split_paragraphs_into_list(string)]
-        # Return string if only one paragraph
-        return paragraphs[0] if len(paragraphs) == 1 else paragraphs
-    return get_sanitised_text(string)
+    # If the text contains <p> tags, it is split into paragraphs and each paragraph cleaned
+    paragraphs = sanitise_html(string)
+    # Return string if only one paragraph
+    if isinstance(paragraphs, list) and len(paragraphs) == 1:
+        return paragraphs[0]
+    return paragraphs
 
 
 def process_placeholder(
@@ -207,11 +308,12 @@ def process_placeholder(
     :param placeholders_dict: A dictionary containing 'text' and possibly 'placeholders'.
     :return: A cleaned text object or a list of paragraphs with placeholders.
     """
-    if REGEX_PARAGRAPH_SPLIT.search(str(placeholders_dict.get("text", ""))):
-        # If the text contains <p> tags, split into paragraphs
-        # and clean each paragraph, extracting placeholders
-        return split_paragraphs_with_placeholders(placeholders_dict)
-    placeholders_dict["text"] = get_sanitised_text(str(placeholders_dict["text"]))
+    paragraphs = sanitise_html(str(placeholders_dict.get("text", "")))
+    if isinstance(paragraphs, list):
+        # If the text contains <p> tags, it is split into paragraphs
+        # and each paragraph cleaned, extracting placeholders
+        return attach_placeholders(paragraphs, placeholders_dict.get("placeholders", []))
+    placeholders_dict["text"] = paragraphs
     return placeholders_dict
 
 
@@ -226,7 +328,11 @@ def process_list(list_items: list) -> list[str | list | dict]:
     for item in list_items:
         if isinstance(item, dict):
             expandable_key = next(
-                (key for key, value in item.items() if isinstance(value, str) and REGEX_PARAGRAPH_SPLIT.search(value)),
+                (
+                    key
+                    for key, value in item.items()
+                    if isinstance(value, str) and "<" in value and REGEX_PARAGRAPH_SPLIT.search(value)
+                ),
                 None,
             )
             if expandable_key is not None:
@@ -8,7 +8,32 @@ EXCEPTION_400_MATCHING_SCHEMA_VERSIONS = (
 
 EXCEPTION_400_EMPTY_INPUT_JSON = "Input JSON schema is empty"
 
+EXCEPTION_503_CONVERSION_QUEUE_FULL = "Too many schemas are waiting to be converted - try again later"
+
+EXCEPTION_413_BATCH_TOO_LARGE = "Too many schemas in the batch - split it into smaller batches"
+
+EXCEPTION_422_INVALID_BATCH_ITEM = (
+    "The item must be an object with current_version and target_version strings and a schema object"
+)
+
+EXCEPTION_404_JOB_NOT_FOUND = "The conversion job does not exist, or its result has expired"
+
+EXCEPTION_409_JOB_NOT_FINISHED = "The conversion job has not finished - check its status and try again later"
+
+EXCEPTION_429_JOB_QUEUE_FULL = "Too many conversion jobs are waiting to run - try again later"
+
+EXCEPTION_415_UNSUPPORTED_CONTENT_ENCODING = "The Content-Encoding of the request body must be gzip or deflate"
+
+EXCEPTION_400_INVALID_CONTENT_ENCODING = "The request body could not be decompressed with its Content-Encoding"
+
+EXCEPTION_413_DECOMPRESSED_BODY_TOO_LARGE = "The request body is too large once decompressed"
+
 
 def exception_400_invalid_version(version_type: str) -> str:
     """Returns the exception message for an invalid version."""
     return f"The {version_type} version must be in the format x.y.z where x, y, z are numbers"
+
+
+def exception_422_invalid_batch_json(error: str) -> str:
+    """Returns the exception message for a batch item that is not valid JSON."""
+    return f"The item is not valid JSON - {error}"
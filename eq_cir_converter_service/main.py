@@ -1,12 +1,55 @@
 """This module is the entry point of the FastAPI application."""
 
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import fastapi
+from fastapi.exceptions import RequestValidationError
+from starlette.exceptions import HTTPException
 
+from eq_cir_converter_service.config import settings
 from eq_cir_converter_service.config.logging_config import setup_logging
-from eq_cir_converter_service.routers import schema_router, status_router
+from eq_cir_converter_service.middleware.content_encoding_middleware import ContentEncodingMiddleware
+from eq_cir_converter_service.middleware.metrics_middleware import (
+    MetricsMiddleware,
+    count_http_exception,
+    count_validation_error,
+)
+from eq_cir_converter_service.middleware.server_timing_middleware import ServerTimingMiddleware
+from eq_cir_converter_service.routers import jobs_router, metrics_router, schema_router, status_router
+from eq_cir_converter_service.services.conversion_jobs import conversion_jobs
+from eq_cir_converter_service.services.conversion_process_pool import conversion_process_pool
+
+
+@asynccontextmanager
+async def lifespan(_app: fastapi.FastAPI) -> AsyncIterator[None]:
+    """Starts the conversion worker processes and job runners before serving requests and stops them on shutdown."""
+    await asyncio.to_thread(conversion_process_pool.start)
+    await conversion_jobs.start()
+    yield
+    await conversion_jobs.shutdown()
+    await asyncio.to_thread(conversion_process_pool.shutdown)
+
 
 setup_logging()
-app = fastapi.FastAPI()
+app = fastapi.FastAPI(lifespan=lifespan)
+
+# Added first, so it runs inside the other middleware, which see the request and response bodies as sent
+app.add_middleware(
+    ContentEncodingMiddleware,
+    max_request_bytes=settings.REQUEST_MAX_DECOMPRESSED_BYTES,
+    min_response_bytes=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+    level=settings.RESPONSE_COMPRESSION_LEVEL,
+    thread_min_bytes=settings.CONTENT_ENCODING_THREAD_MIN_BYTES,
+)
+app.add_middleware(MetricsMiddleware)
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+app.exception_handler(HTTPException)(count_http_exception)
+app.exception_handler(RequestValidationError)(count_validation_error)
 
 app.include_router(schema_router.router)
+app.include_router(jobs_router.router)
 app.include_router(status_router.router)
+app.include_router(metrics_router.router)
@@ -0,0 +1,269 @@
+"""ASGI middleware that decompresses request bodies and compresses response bodies.
+
+A request body with a Content-Encoding of gzip or deflate is decompressed as it is received, so the
+endpoints read JSON as usual. The decompressed size is limited, so a small body that expands to a
+huge one, a zip bomb, is rejected once it reaches the limit rather than filling the memory.
+
+A response body is compressed with gzip or deflate when the Accept-Encoding header of the request
+accepts it and the body is at least the size threshold. A streamed response is compressed as it is
+sent, flushing each chunk so the client receives it straight away.
+
+Compressing or decompressing a large part of a body takes tens of milliseconds, so parts from a
+size threshold are compressed or decompressed on a worker thread, keeping the event loop free.
+"""
+
+import asyncio
+import zlib
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.services import server_timing
+
+# The zlib window bits of each supported content coding, which select the gzip or zlib wrapper, in order of preference
+CONTENT_CODING_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def coding_quality(parameters: str) -> float:
+    """Returns the quality value of a content coding in an Accept-Encoding header, from the parameters after it."""
+    name, _, value = parameters.strip().partition("=")
+    if name.strip().lower() != "q":
+        return 1.0
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def accepted_content_coding(accept_encoding: str) -> str | None:
+    """Returns the content coding to compress a response with, given the Accept-Encoding header of the request.
+
+    Parameters:
+    - accept_encoding: The Accept-Encoding header.
+
+    Returns:
+    - str | None: gzip or deflate, whichever the client prefers, or None if it accepts neither.
+    """
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        qualities[coding.strip().lower()] = coding_quality(parameters)
+
+    best_coding, best_quality = None, 0.0
+    for coding in CONTENT_CODING_WBITS:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_coding, best_quality = coding, quality
+    return best_coding
+
+
+def content_encoding_error(status_code: int, message: str) -> HTTPException:
+    """Returns the error for a request body that cannot be decompressed."""
+    return HTTPException(status_code=status_code, detail={"status": "error", "message": message})
+
+
+class RequestDecoder:  # pylint: disable=too-few-public-methods
+    """Decompresses the body of a request as it is received, up to a maximum decompressed size."""
+
+    __slots__ = ("_decompressor", "_remaining")
+
+    def __init__(self, content_encoding: str, max_bytes: int) -> None:
+        """Starts decompressing a body.
+
+        Parameters:
+        - content_encoding: The Content-Encoding header of the request.
+        - max_bytes: The largest size the body can be decompressed to.
+        """
+        wbits = CONTENT_CODING_WBITS.get(content_encoding)
+        self._decompressor = zlib.decompressobj(wbits) if wbits is not None else None
+        self._remaining = max_bytes
+
+    def decode(self, message: Message) -> Message:
+        """Returns a message received from the client with its part of the body decompressed.
+
+        Raises:
+        - HTTPException: If the content coding is not supported, the body is not valid for it, or
+          the body decompresses to more than the maximum size.
+        """
+        if message["type"] != "http.request":
+            return message
+        if self._decompressor is None:
+            raise content_encoding_error(
+                status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                exception_messages.EXCEPTION_415_UNSUPPORTED_CONTENT_ENCODING,
+            )
+
+        more_body = message.get("more_body", False)
+        try:
+            # At most one byte more than the limit is decompressed, to tell a body at the limit from one above it
+            body = self._decompressor.decompress(message.get("body", b""), self._remaining + 1)
+            if not more_body and len(body) <= self._remaining:
+                body += self._decompressor.flush()
+        except zlib.error as exc:
+            raise content_encoding_error(
+                status.HTTP_400_BAD_REQUEST,
+                exception_messages.EXCEPTION_400_INVALID_CONTENT_ENCODING,
+            ) from exc
+
+        if len(body) > self._remaining:
+            raise content_encoding_error(
+                status.HTTP_413_CONTENT_TOO_LARGE,
+                exception_messages.EXCEPTION_413_DECOMPRESSED_BODY_TOO_LARGE,
+            )
+        self._remaining -= len(body)
+
+        if self._decompressor.unused_data or (not more_body and not self._decompressor.eof):
+            # Data after the end of the compressed body, or a body that ends before it
+            raise content_encoding_error(
+                status.HTTP_400_BAD_REQUEST,
+                exception_messages.EXCEPTION_400_INVALID_CONTENT_ENCODING,
+            )
+        return {**message, "body": body}
+
+
+class ResponseEncoder:  # pylint: disable=too-few-public-methods
+    """Compresses the body of a response as it is sent, if it is big enough or streamed."""
+
+    __slots__ = ("_compressor", "_content_coding", "_level", "_min_bytes", "_send", "_start", "_thread_min_bytes")
+
+    def __init__(
+        self,
+        send: Send,
+        content_coding: str,
+        *,
+        min_bytes: int,
+        level: int,
+        thread_min_bytes: int,
+    ) -> None:
+        """Prepares to compress a response.
+
+        Parameters:
+        - send: The function to send messages to the client with.
+        - content_coding: The content coding to compress the body with, gzip or deflate.
+        - min_bytes: The size from which a response that is not streamed is compressed.
+        - level: The zlib compression level.
+        - thread_min_bytes: The size from which a part of the body is compressed on a worker thread.
+        """
+        self._send = send
+        self._content_coding = content_coding
+        self._min_bytes = min_bytes
+        self._level = level
+        self._thread_min_bytes = thread_min_bytes
+        # The start of the response, held until the first part of the body shows whether to compress it
+        self._start: Message | None = None
+        self._compressor: zlib._Compress | None = None  # pylint: disable=no-member
+
+    async def send(self, message: Message) -> None:
+        """Sends a message of the response to the client, compressing its part of the body if the body is compressed."""
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        start, self._start = self._start, None
+        if start is not None:
+            headers = MutableHeaders(scope=start)
+            # A streamed body is compressed whatever the size of its first part
+            if "content-encoding" not in headers and (more_body or (body and len(body) >= self._min_bytes)):
+                wbits = CONTENT_CODING_WBITS[self._content_coding]
+                self._compressor = zlib.compressobj(self._level, zlib.DEFLATED, wbits)
+                headers["Content-Encoding"] = self._content_coding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+
+        if self._compressor is not None and len(body) >= self._thread_min_bytes:
+            body = await asyncio.to_thread(self._compress, body, more_body=more_body)
+        else:
+            body = self._compress(body, more_body=more_body)
+        if start is not None:
+            if self._compressor is not None and not more_body:
+                MutableHeaders(scope=start)["Content-Length"] = str(len(body))
+            await self._send(start)
+        await self._send({**message, "body": body})
+
+    def _compress(self, body: bytes, *, more_body: bool) -> bytes:
+        """Compresses part of the body, if the body is compressed, flushing it so the client can decompress it."""
+        if self._compressor is None:
+            return body
+        with server_timing.timed("compress"):
+            return self._compressor.compress(body) + self._compressor.flush(
+                zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH,
+            )
+
+
+class ContentEncodingMiddleware:  # pylint: disable=too-few-public-methods
+    """Decompresses gzip and deflate request bodies, and compresses response bodies for clients that accept it."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        max_request_bytes: int,
+        min_response_bytes: int,
+        level: int,
+        thread_min_bytes: int,
+    ) -> None:
+        """Wraps the application.
+
+        Parameters:
+        - app: The ASGI application.
+        - max_request_bytes: The largest size a compressed request body can be decompressed to.
+        - min_response_bytes: The size from which a response body is compressed.
+        - level: The zlib compression level of response bodies, from 1 to 9, or 0 to not compress them.
+        - thread_min_bytes: The size from which a part of a request body is decompressed, or a part of
+          a response body compressed, on a worker thread rather than on the event loop.
+        """
+        self.app = app
+        self.max_request_bytes = max_request_bytes
+        self.min_response_bytes = min_response_bytes
+        self.level = level
+        self.thread_min_bytes = thread_min_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handles the request with the application, decompressing its body and compressing the response body."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_encoding = headers.get("content-encoding", "identity").strip().lower()
+        if content_encoding != "identity":
+            decoder = RequestDecoder(content_encoding, self.max_request_bytes)
+            # The application reads the decompressed body, so its encoding and length are removed. The scope
+            # is changed in place, so the route set on it is still seen by the middleware outside this one.
+            scope["headers"] = [
+                (name, value)
+                for name, value in scope["headers"]
+                if name not in {b"content-encoding", b"content-length"}
+            ]
+            receive = self._decoded_receive(receive, decoder, self.thread_min_bytes)
+
+        content_coding = accepted_content_coding(headers.get("accept-encoding", "")) if self.level > 0 else None
+        if content_coding is not None:
+            send = ResponseEncoder(
+                send,
+                content_coding,
+                min_bytes=self.min_response_bytes,
+                level=self.level,
+                thread_min_bytes=self.thread_min_bytes,
+            ).send
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _decoded_receive(receive: Receive, decoder: RequestDecoder, thread_min_bytes: int) -> Receive:
+        """Returns a receive function that decompresses the body of each message received from the client."""
+
+        async def receive_decoded() -> Message:
+            message = await receive()
+            if len(message.get("body", b"")) >= thread_min_bytes:
+                return await asyncio.to_thread(decoder.decode, message)
+            return decoder.decode(message)
+
+        return receive_decoded
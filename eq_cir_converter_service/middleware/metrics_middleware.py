@@ -0,0 +1,111 @@
+"""ASGI middleware and exception handlers that record every HTTP request and error in the service metrics."""
+
+import time
+
+from fastapi import Request, Response
+from fastapi.exception_handlers import http_exception_handler, request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from starlette.datastructures import QueryParams
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from eq_cir_converter_service.services import metrics
+
+
+class MetricsMiddleware:  # pylint: disable=too-few-public-methods
+    """Records the duration, status and body sizes of each HTTP request, and the requests in flight.
+
+    Requests are labelled with the path of the route that handled them rather than the request path,
+    so the number of label values stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wraps the application.
+
+        Parameters:
+        - app: The ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handles the request with the application, recording its metrics once it has been handled."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics()
+
+        async def receive_counted() -> Message:
+            message = await receive()
+            request.count_received(message)
+            return message
+
+        async def send_counted(message: Message) -> None:
+            request.count_sent(message)
+            await send(message)
+
+        metrics.requests_in_flight.inc()
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            metrics.requests_in_flight.dec()
+            request.record(scope)
+
+
+class RequestMetrics:
+    """The metrics of a request, recorded once the request has been handled."""
+
+    __slots__ = ("body_bytes", "response_bytes", "start", "status_code")
+
+    def __init__(self) -> None:
+        """Starts timing the request. An error response is assumed until the response starts."""
+        self.start = time.perf_counter()
+        self.status_code = 500
+        self.body_bytes = 0
+        self.response_bytes = 0
+
+    def count_received(self, message: Message) -> None:
+        """Counts the bytes of the request body in a message received from the client."""
+        if message["type"] == "http.request":
+            self.body_bytes += len(message.get("body", b""))
+
+    def count_sent(self, message: Message) -> None:
+        """Records the status, and counts the bytes of the response body, in a message sent to the client."""
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            self.response_bytes += len(message.get("body", b""))
+
+    def record(self, scope: Scope) -> None:
+        """Records the duration, status and body sizes of the handled request.
+
+        Parameters:
+        - scope: The ASGI scope of the request, holding the route that handled it.
+        """
+        duration = time.perf_counter() - self.start
+        route = scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        query_string = scope.get("query_string", b"")
+        target_version = QueryParams(query_string).get("target_version") if b"target_version" in query_string else None
+        metrics.request_duration_seconds.observe(
+            duration,
+            scope["method"],
+            route_path,
+            str(self.status_code),
+            metrics.target_version_label(target_version),
+        )
+        metrics.request_body_bytes.observe(self.body_bytes, route_path)
+        metrics.response_body_bytes.observe(self.response_bytes, route_path)
+
+
+async def count_http_exception(request: Request, exc: HTTPException) -> Response:
+    """Counts an HTTP exception by its status code and message, and returns the usual error response."""
+    message = exc.detail.get("message", "") if isinstance(exc.detail, dict) else exc.detail
+    metrics.record_error(exc.status_code, str(message))
+    return await http_exception_handler(request, exc)
+
+
+async def count_validation_error(request: Request, exc: RequestValidationError) -> Response:
+    """Counts a request validation error, and returns the usual error response."""
+    metrics.record_error(422, "")
+    return await request_validation_exception_handler(request, exc)
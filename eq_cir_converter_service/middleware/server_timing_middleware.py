@@ -0,0 +1,55 @@
+"""ASGI middleware that adds a Server-Timing header, with the duration of each phase, to every HTTP response."""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from eq_cir_converter_service.services.server_timing import ServerTiming, request_server_timing
+
+
+class ServerTimingMiddleware:  # pylint: disable=too-few-public-methods
+    """Times the phases of each HTTP request and reports them in the Server-Timing header of the response.
+
+    The time spent waiting for the request body is recorded as the `read` phase, and the end of the
+    body is marked, so the endpoint can record the time FastAPI takes to parse it. The other phases
+    are recorded by the code that runs them, and the header also has the `total` time to the start
+    of the response.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wraps the application.
+
+        Parameters:
+        - app: The ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handles the request with the application, timing its phases for the response header."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        server_timing = ServerTiming()
+
+        async def receive_timed() -> Message:
+            start = time.perf_counter()
+            message = await receive()
+            if message["type"] == "http.request":
+                end = time.perf_counter()
+                server_timing.add("read", end - start)
+                if not message.get("more_body", False):
+                    server_timing.mark = end
+            return message
+
+        async def send_with_header(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", server_timing.header_value())
+            await send(message)
+
+        token = request_server_timing.set(server_timing)
+        try:
+            await self.app(scope, receive_timed, send_with_header)
+        finally:
+            request_server_timing.reset(token)
@@ -0,0 +1,144 @@
+"""This module contains the FastAPI router for converting schemas as jobs.
+
+A large schema can take close to the request timeout to convert, so it can be submitted as a job
+instead, and its status and result fetched with separate requests.
+"""
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from structlog import get_logger
+
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.routers.schema_router import parse_schema
+from eq_cir_converter_service.services.conversion_jobs import (
+    SUCCEEDED,
+    ConversionJob,
+    JobError,
+    JobQueueFullError,
+    conversion_jobs,
+)
+from eq_cir_converter_service.types.custom_types import Schema
+from eq_cir_converter_service.utils.helper_utils import validate_versions
+from eq_cir_converter_service.utils.log_utils import SchemaSummary
+
+router = APIRouter()
+
+logger = get_logger()
+
+
+@router.post(
+    "/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra={
+        "requestBody": {"required": True, "content": {"application/json": {"schema": {"type": "object"}}}},
+    },
+)
+async def post_job(
+    current_version: str,
+    target_version: str,
+    request: Request,
+    response: Response,
+) -> dict:
+    """Submit the CIR schema to be converted from one version to another as a job.
+
+    The request is validated straight away, as for POST /schema, and the job id returned without
+    waiting for the conversion.
+
+    Request query parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+
+    Request body:
+    - The schema to convert.
+
+    Returns:
+    - dict: The id and status of the job.
+    """
+    logger.debug("Posting the cir schema job...")
+
+    # The body is parsed on a conversion worker thread, as a large schema takes a while to parse
+    schema_json = await request.body()
+    schema = await parse_schema(schema_json, target_version)
+    logger.debug("Received schema:", schema=SchemaSummary(schema))
+
+    validate_versions(current_version, target_version)
+
+    if not schema:
+        logger.error("Input JSON schema is empty")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"status": "error", "message": exception_messages.EXCEPTION_400_EMPTY_INPUT_JSON},
+        )
+
+    try:
+        job = conversion_jobs.submit(current_version=current_version, target_version=target_version, schema=schema)
+    except JobQueueFullError as exc:
+        logger.warning("The conversion job queue is full", queue_limit=conversion_jobs.queue_limit)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"status": "error", "message": exception_messages.EXCEPTION_429_JOB_QUEUE_FULL},
+        ) from exc
+
+    response.headers["Location"] = f"/jobs/{job.job_id}"
+    return job.summary()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> dict:
+    """Get the status of a conversion job.
+
+    Request path parameters:
+    - job_id: The id of the job.
+
+    Returns:
+    - dict: The id, versions and status of the job, and the error if it failed.
+    """
+    return find_job(job_id).summary()
+
+
+@router.get("/jobs/{job_id}/result", response_model=Schema)
+async def get_job_result(job_id: str) -> Response:
+    """Get the converted schema of a conversion job that has succeeded.
+
+    A job that has failed gives the error response the schema would have been given by POST /schema.
+
+    Request path parameters:
+    - job_id: The id of the job.
+
+    Returns:
+    - dict: The converted schema.
+    """
+    job = find_job(job_id)
+
+    if isinstance(job.result, JobError):
+        raise HTTPException(
+            status_code=job.result.status_code,
+            detail={"status": "error", "message": job.result.message},
+        )
+    if job.status != SUCCEEDED or job.result is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"status": "error", "message": exception_messages.EXCEPTION_409_JOB_NOT_FINISHED},
+        )
+
+    return Response(content=job.result, media_type="application/json")
+
+
+def find_job(job_id: str) -> ConversionJob:
+    """Returns the conversion job with the id.
+
+    Parameters:
+    - job_id: The id of the job.
+
+    Returns:
+    - ConversionJob: The job.
+
+    Raises:
+    - HTTPException: If there is no such job, or it has expired.
+    """
+    job = conversion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"status": "error", "message": exception_messages.EXCEPTION_404_JOB_NOT_FOUND},
+        )
+    return job
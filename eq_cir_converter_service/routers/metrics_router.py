@@ -0,0 +1,20 @@
+"""This module contains the FastAPI router for the metrics endpoint.
+
+Provides a GET endpoint for Prometheus to scrape the service metrics from.
+"""
+
+from fastapi import APIRouter, Response
+
+from eq_cir_converter_service.services import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """Metrics endpoint for Prometheus.
+
+    Returns:
+        Response: The service metrics in the Prometheus text exposition format.
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,17 +1,43 @@
 """This module contains the FastAPI router for the schema conversion endpoint."""
 
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+from collections.abc import Callable
+from typing import Literal, cast
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive
 from structlog import get_logger
 
+from eq_cir_converter_service.config import settings
 from eq_cir_converter_service.exception import exception_messages
-from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.services import metrics, server_timing
+from eq_cir_converter_service.services.conversion_cache import conversion_cache
+from eq_cir_converter_service.services.conversion_executor import ConversionQueueFullError, conversion_executor
+from eq_cir_converter_service.services.conversion_process_pool import conversion_process_pool
+from eq_cir_converter_service.services.schema import schema_batch, schema_processor, schema_streamer
+from eq_cir_converter_service.services.section_cache import SectionCounts, count_sections
 from eq_cir_converter_service.types.custom_types import Schema
-from eq_cir_converter_service.utils.helper_utils import validate_version
+from eq_cir_converter_service.utils.helper_utils import dump_json, load_schema_json, validate_versions
+from eq_cir_converter_service.utils.json_stream import JSONStreamError
+from eq_cir_converter_service.utils.log_utils import SchemaSummary
 
 router = APIRouter()
 
 logger = get_logger()
 
+# The formats of a conversion response: the converted schema, or the JSON Patch operations that give it
+ResponseFormat = Literal["schema", "patch"]
+
+# The media type of a JSON Patch document, defined by RFC 6902
+JSON_PATCH_MEDIA_TYPE = "application/json-patch+json"
+
+# The response headers with the number of sections reused from the section cache and converted again
+SECTIONS_REUSED_HEADER = "X-Sections-Reused"
+SECTIONS_RECOMPUTED_HEADER = "X-Sections-Recomputed"
+
 """The POST endpoint to convert the CIR schema from one version to another."""
 
 
@@ -23,73 +49,665 @@ async def post_schema(
     current_version: str,
     target_version: str,
     schema: Schema,
-) -> Schema:
+    request: Request,
+    response_format: ResponseFormat = "schema",
+) -> Response:
     """Convert the CIR schema from one version to another.
 
     Request query parameters:
     - current_version: The current version of the schema.
     - target_version: The target version of the schema.
+    - response_format: "schema" for the converted schema, or "patch" for the JSON Patch (RFC 6902)
+      operations that convert the schema when applied to it.
 
     Request body:
     - schema: The schema to convert.
 
-    Steps:
-    - Validate the current and target version.
-    - Validate the input JSON schema.
-
     Returns:
-    - dict: The converted schema.
+    - dict: The converted schema, or a list of the JSON Patch operations.
     """
+    # FastAPI has parsed and validated the body since it was read
+    server_timing.lap("parse")
     logger.debug("Posting the cir schema...")
 
-    logger.debug(
-        "Received current version and target version",
+    return await convert_request(
         current_version=current_version,
         target_version=target_version,
+        schema=schema,
+        schema_json=await request.body(),
+        response_format=response_format,
     )
-    logger.debug("Received schema:", schema=schema)
 
-    logger.debug("Validating the current and target version...")
-    validate_version(current_version, "current")
-    validate_version(target_version, "target")
 
-    if current_version == target_version:
-        logger.debug("The current and target schema versions are the same")
-        # Ideally, the caller must not send to the converter service with the same versions.
-        # Hence it is the best approach to give an error response.
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"status": "error", "message": exception_messages.EXCEPTION_400_MATCHING_SCHEMA_VERSIONS},
-        )
+@router.post(
+    "/schema/raw",
+    response_model=Schema,
+    openapi_extra={
+        "requestBody": {"required": True, "content": {"application/json": {"schema": {"type": "object"}}}},
+    },
+)
+async def post_schema_raw(
+    current_version: str,
+    target_version: str,
+    request: Request,
+    response_format: ResponseFormat = "schema",
+) -> Response:
+    """Convert the CIR schema from one version to another, reading the request body directly.
 
-    logger.info("Validating the input JSON schema...")
+    The body is parsed once and not validated or copied by FastAPI, which saves a full copy of a
+    large schema. Invalid input is rejected with the same responses as POST /schema.
+
+    Request query parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - response_format: "schema" for the converted schema, or "patch" for the JSON Patch (RFC 6902)
+      operations that convert the schema when applied to it.
+
+    Request body:
+    - The schema to convert.
+
+    Returns:
+    - dict: The converted schema, or a list of the JSON Patch operations.
+    """
+    logger.debug("Posting the raw cir schema...")
+
+    schema_json = await request.body()
+    schema = await parse_schema(schema_json, target_version)
+
+    return await convert_request(
+        current_version=current_version,
+        target_version=target_version,
+        schema=schema,
+        schema_json=schema_json,
+        response_format=response_format,
+    )
 
-    if not schema:
+
+@router.post(
+    "/schema/stream",
+    response_model=Schema,
+    openapi_extra={
+        "requestBody": {"required": True, "content": {"application/json": {"schema": {"type": "object"}}}},
+    },
+)
+async def post_schema_stream(
+    current_version: str,
+    target_version: str,
+    request: Request,
+) -> Response:
+    """Convert the CIR schema from one version to another while it is being received, streaming the result.
+
+    Each top-level member of the schema, and each section, is converted as soon as it has been
+    received and streamed back, so only the largest of them is held in memory. The converted JSON
+    is the same as the response from POST /schema.
+
+    Invalid JSON found after the response has started cannot change its status, so the response
+    ends early instead, with incomplete JSON.
+
+    Request query parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+
+    Request body:
+    - The schema to convert.
+
+    Returns:
+    - dict: The converted schema.
+    """
+    logger.debug("Posting the streamed cir schema...")
+
+    validate_versions(current_version, target_version)
+
+    events = schema_streamer.read_schema_events(request.stream())
+    try:
+        # Read up to the first member, so an empty or invalid schema is rejected before the response starts
+        first_event = await anext(events, None)
+    except JSONStreamError as exc:
+        logger.exception("Invalid input JSON schema", exc_info=exc)
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", exc.position),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": exc.message},
+                },
+            ],
+        ) from exc
+
+    if first_event is None:
         logger.error("Input JSON schema is empty")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"status": "error", "message": exception_messages.EXCEPTION_400_EMPTY_INPUT_JSON},
         )
 
+    return RequestStreamingResponse(
+        schema_streamer.stream_converted_schema(
+            current_version=current_version,
+            target_version=target_version,
+            first_event=first_event,
+            events=events,
+        ),
+        media_type="application/json",
+    )
+
+
+@router.post(
+    "/schemas/batch",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        },
+    },
+)
+async def post_schemas_batch(request: Request) -> Response:
+    """Convert a batch of CIR schemas, each from one version to another.
+
+    The schemas are converted at the same time, up to the batch concurrency. Each schema gets its
+    own result, so a schema that is invalid or cannot be converted does not stop the rest of the batch.
+
+    Request body:
+    - A JSON array, or newline-delimited JSON, of objects with the current_version, target_version
+      and schema of each schema to convert.
+
+    Returns:
+    - The result of each schema, in the order of the batch, as a JSON object or as newline-delimited
+      JSON if the request was newline-delimited JSON.
+    """
+    logger.debug("Posting the cir schema batch...")
+
+    media_type = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+    ndjson = media_type in schema_batch.NDJSON_MEDIA_TYPES
+    items = schema_batch.load_batch(await request.body(), ndjson=ndjson)
+
+    if len(items) > settings.CONVERSION_BATCH_MAX_ITEMS:
+        logger.error("Too many schemas in the batch", items=len(items))
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail={"status": "error", "message": exception_messages.EXCEPTION_413_BATCH_TOO_LARGE},
+        )
+
+    results = await convert_batch(items)
+    for result in results:
+        if isinstance(result, schema_batch.BatchItemError):
+            metrics.record_error(result.status_code, result.message)
+
+    logger.info("Schema batch converted", items=len(items))
+    return Response(
+        content=schema_batch.dump_results(results, ndjson=ndjson),
+        media_type=media_type if ndjson else "application/json",
+    )
+
+
+async def convert_batch(
+    items: list[schema_batch.BatchItem | schema_batch.BatchItemError],
+) -> list[schema_batch.BatchItemResult | schema_batch.BatchItemError]:
+    """Converts the schemas of a batch at the same time, up to the batch concurrency.
+
+    The versions are validated once for each distinct pair of versions in the batch.
+
+    Parameters:
+    - items: The items of the batch.
+
+    Returns:
+    - list: The result of each item, in the order of the batch.
+    """
+    semaphore = asyncio.Semaphore(settings.CONVERSION_BATCH_CONCURRENCY)
+    version_errors: dict[tuple[str, str], HTTPException | None] = {}
+
+    async def convert_item(
+        item: schema_batch.BatchItem | schema_batch.BatchItemError,
+    ) -> schema_batch.BatchItemResult | schema_batch.BatchItemError:
+        if isinstance(item, schema_batch.BatchItemError):
+            return item
+
+        versions = (item.current_version, item.target_version)
+        if versions not in version_errors:
+            version_errors[versions] = validate_batch_versions(*versions)
+        version_error = version_errors[versions]
+        if version_error is not None:
+            return schema_batch.BatchItemError(
+                item.position,
+                version_error.status_code,
+                cast(dict, version_error.detail)["message"],
+            )
+
+        try:
+            async with semaphore:
+                converted_json = await convert_validated_schema(
+                    current_version=item.current_version,
+                    target_version=item.target_version,
+                    schema=item.schema,
+                    schema_json=None,
+                )
+        except HTTPException as exc:
+            return schema_batch.BatchItemError(item.position, exc.status_code, cast(dict, exc.detail)["message"])
+        return schema_batch.BatchItemResult(item.position, converted_json)
+
+    # An unexpected exception is returned rather than raised, so it only fails its own item
+    results = await asyncio.gather(*(convert_item(item) for item in items), return_exceptions=True)
+    for position, result in enumerate(results):
+        if isinstance(result, BaseException):
+            logger.exception("An exception occurred while processing the schema", position=position, exc_info=result)
+            results[position] = schema_batch.BatchItemError(
+                position,
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                exception_messages.EXCEPTION_500_SCHEMA_PROCESSING,
+            )
+    return cast(list[schema_batch.BatchItemResult | schema_batch.BatchItemError], results)
+
+
+def validate_batch_versions(current_version: str, target_version: str) -> HTTPException | None:
+    """Validates the current and target version of a schema in a batch.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+
+    Returns:
+    - HTTPException | None: The error the versions would give as a request to POST /schema, or None if they are valid.
+    """
+    try:
+        validate_versions(current_version, target_version)
+    except HTTPException as exc:
+        return exc
+    return None
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """A streaming response that is sent while the request body is still being read.
+
+    StreamingResponse listens for the client disconnecting on the same channel the request body
+    is received on, which would take chunks of the body. Reading the body raises ClientDisconnect
+    instead, so the response does not listen itself.
+    """
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:  # noqa: ARG002
+        """Waits until the response has been sent, leaving the request body to be read by the endpoint."""
+        await anyio.sleep_forever()
+
+
+def conversion_queue_full_error() -> HTTPException:
+    """Logs that the conversion queue is full and returns the 503 error to raise for the request.
+
+    Returns:
+    - HTTPException: The error.
+    """
+    logger.warning("The conversion queue is full", **conversion_executor.stats()._asdict())
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"status": "error", "message": exception_messages.EXCEPTION_503_CONVERSION_QUEUE_FULL},
+    )
+
+
+def parse_schema_json(schema_json: bytes, target_version: str) -> Schema:
+    """Parses a request body into a schema, timing it as the parse phase of the conversion.
+
+    Parameters:
+    - schema_json: The request body.
+    - target_version: The target version of the schema.
+
+    Returns:
+    - dict: The schema.
+    """
+    with metrics.timed_phase("parse", target_version):
+        return load_schema_json(schema_json)
+
+
+async def parse_schema(schema_json: bytes, target_version: str) -> Schema:
+    """Parses a request body into a schema on a conversion worker thread, so a large body does not block the event loop.
+
+    The body is parsed before the request is validated, so invalid input is rejected with the same
+    responses as POST /schema, whose body FastAPI parses first.
+
+    Parameters:
+    - schema_json: The request body.
+    - target_version: The target version of the schema.
+
+    Returns:
+    - dict: The schema.
+
+    Raises:
+    - RequestValidationError: If the body is missing, is not valid JSON or is not a JSON object.
+    - HTTPException: If the body is not valid UTF-8, or the conversion queue is full.
+    """
+    try:
+        return await conversion_executor.run(parse_schema_json, schema_json, target_version)
+    except ConversionQueueFullError as exc:
+        raise conversion_queue_full_error() from exc
+
+
+async def convert_request(
+    *,
+    current_version: str,
+    target_version: str,
+    schema: Schema,
+    schema_json: bytes,
+    response_format: ResponseFormat = "schema",
+) -> Response:
+    """Validates the request and converts the schema, returning the converted schema as a JSON response.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema: The schema to convert.
+    - schema_json: The request body the schema was parsed from, or None if the schema was not received as JSON.
+    - response_format: "schema" for the converted schema, or "patch" for the JSON Patch operations that give it.
+
+    Returns:
+    - Response: The converted schema, or the JSON Patch, with the number of sections reused and recomputed
+      in the X-Sections-Reused and X-Sections-Recomputed headers if the schema was converted section by section.
+
+    Raises:
+    - HTTPException: If the request is invalid or the schema cannot be converted.
+    """
+    logger.debug(
+        "Received current version and target version",
+        current_version=current_version,
+        target_version=target_version,
+    )
+    logger.debug("Received schema:", schema=SchemaSummary(schema))
+
+    with server_timing.timed("validate"):
+        validate_versions(current_version, target_version)
+
+    section_counts = count_sections()
+    converted_json = await convert_validated_schema(
+        current_version=current_version,
+        target_version=target_version,
+        schema=schema,
+        schema_json=schema_json,
+        response_format=response_format,
+    )
+    media_type = JSON_PATCH_MEDIA_TYPE if response_format == "patch" else "application/json"
+    return Response(content=converted_json, media_type=media_type, headers=section_headers(section_counts))
+
+
+def section_headers(section_counts: SectionCounts) -> dict[str, str]:
+    """Returns the headers with the number of sections reused and recomputed, if the schema was converted by section.
+
+    Parameters:
+    - section_counts: The section counts of the request.
+
+    Returns:
+    - dict: The headers, or none if the schema was not converted section by section.
+    """
+    if not section_counts.converted:
+        return {}
+    return {
+        SECTIONS_REUSED_HEADER: str(section_counts.reused),
+        SECTIONS_RECOMPUTED_HEADER: str(section_counts.recomputed),
+    }
+
+
+async def convert_validated_schema(
+    *,
+    current_version: str,
+    target_version: str,
+    schema: Schema,
+    schema_json: bytes | None,
+    response_format: ResponseFormat = "schema",
+) -> bytes:
+    """Converts the schema between versions that have been validated, returning the converted schema as JSON bytes.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema: The schema to convert.
+    - schema_json: The schema as JSON bytes, used to decide whether to convert it in a worker process,
+      or None to serialise the schema on the conversion worker thread if the process pool is running.
+    - response_format: "schema" for the converted schema, or "patch" for the JSON Patch operations that give it.
+
+    Steps:
+    - Validate the input JSON schema.
+    - Serve the converted schema from the cache if the same schema has been converted before.
+    - Convert the schema on a conversion worker thread, so the event loop is not blocked.
+      A schema above the process pool threshold is handed to a worker process as JSON bytes.
+
+    Returns:
+    - bytes: The converted schema, or the JSON Patch.
+
+    Raises:
+    - HTTPException: If the schema is empty or cannot be converted.
+    """
+    logger.info("Validating the input JSON schema...")
+
+    with server_timing.timed("validate"):
+        if not schema:
+            logger.error("Input JSON schema is empty")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"status": "error", "message": exception_messages.EXCEPTION_400_EMPTY_INPUT_JSON},
+            )
+
     logger.debug("Input JSON schema is not empty")
 
     try:
+        cache_key = None
+        if conversion_cache.enabled:
+            # Hashing a large schema for the cache key takes hundreds of milliseconds, so it is kept off the event loop
+            cache_key, cached_json = await conversion_executor.run(
+                look_up_converted_schema,
+                current_version=current_version,
+                target_version=target_version,
+                schema=schema,
+                response_format=response_format,
+            )
+            if cached_json is not None:
+                logger.info("Converted schema served from the cache")
+                return cached_json
+
         logger.debug(
             "Processing the schema using current version and target version ",
             current_version=current_version,
             target_version=target_version,
         )
-        logger.debug("Processing schema:", schema=schema)
-        # Call the schema processor service to convert the schema
-        return schema_processor.process_schema(
+        logger.debug("Processing schema:", schema=SchemaSummary(schema))
+
+        converted_json = await convert_schema(
             current_version=current_version,
             target_version=target_version,
-            input_schema=schema,
+            schema=schema,
+            schema_json=schema_json,
+            response_format=response_format,
+            cache_key=cache_key,
         )
 
+    except ConversionQueueFullError as exc:
+        raise conversion_queue_full_error() from exc
+
     except HTTPException as exc:
         logger.exception("An exception occurred while processing the schema", exc_info=exc)
         raise HTTPException(
             status_code=500,
             detail={"status": "error", "message": exception_messages.EXCEPTION_500_SCHEMA_PROCESSING},
         ) from exc
+
+    return converted_json
+
+
+def look_up_converted_schema(
+    *,
+    current_version: str,
+    target_version: str,
+    schema: Schema,
+    response_format: ResponseFormat,
+) -> tuple[str, bytes | None]:
+    """Returns the conversion cache key for the schema, and the converted schema if it is cached.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema: The schema to convert.
+    - response_format: "schema" for the converted schema, or "patch" for the JSON Patch operations that give it.
+
+    Returns:
+    - tuple: The cache key, and the converted schema as JSON bytes or None if it is not cached.
+    """
+    cache_key = conversion_cache.make_key(
+        current_version=current_version,
+        target_version=target_version,
+        schema=schema,
+        response_format=response_format,
+    )
+    return cache_key, conversion_cache.get(cache_key)
+
+
+def convert_and_cache(convert: Callable[..., bytes], *, cache_key: str | None, **kwargs: object) -> bytes:
+    """Runs a conversion that returns JSON bytes, and caches the result under the key, if given.
+
+    Parameters:
+    - convert: The function that converts the schema.
+    - cache_key: The conversion cache key, or None if the cache is disabled.
+    - kwargs: The keyword arguments for the function.
+
+    Returns:
+    - bytes: The converted schema, or the JSON Patch, as JSON bytes.
+    """
+    converted_json = convert(**kwargs)
+    if cache_key is not None:
+        # Compressing the converted schema for the cache is done on the worker thread with the conversion
+        conversion_cache.put(cache_key, converted_json)
+    return converted_json
+
+
+async def convert_schema(
+    *,
+    current_version: str,
+    target_version: str,
+    schema: Schema,
+    schema_json: bytes | None,
+    response_format: ResponseFormat = "schema",
+    cache_key: str | None = None,
+) -> bytes:
+    """Converts the schema off the event loop and returns the converted schema as JSON bytes.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema: The schema to convert.
+    - schema_json: The request body the schema was parsed from, or None if the schema was not received as JSON.
+    - response_format: "schema" for the converted schema, or "patch" for the JSON Patch operations that give it.
+    - cache_key: The conversion cache key to cache the converted schema under, or None to not cache it.
+
+    Returns:
+    - bytes: The converted schema, or the JSON Patch, as JSON bytes.
+
+    Raises:
+    - ConversionQueueFullError: If the conversion queue is full.
+    """
+    if schema_json is None and conversion_process_pool.running:
+        # The schema is serialised on the worker thread, to find whether it is big enough to convert in a worker process
+        return await conversion_executor.run(
+            convert_and_cache,
+            convert_unserialised_schema,
+            cache_key=cache_key,
+            current_version=current_version,
+            target_version=target_version,
+            schema=schema,
+            response_format=response_format,
+        )
+
+    if schema_json is not None and conversion_process_pool.accepts(len(schema_json)):
+        return await conversion_executor.run(
+            convert_and_cache,
+            convert_in_process_pool,
+            cache_key=cache_key,
+            current_version=current_version,
+            target_version=target_version,
+            schema=schema,
+            schema_json=schema_json,
+            response_format=response_format,
+        )
+
+    # Call the schema processor service to convert the schema, or to make the patch that converts it, and serialise it
+    return await conversion_executor.run(
+        convert_and_cache,
+        schema_processor.process_schema_json,
+        cache_key=cache_key,
+        current_version=current_version,
+        target_version=target_version,
+        input_schema=schema,
+        response_format=response_format,
+    )
+
+
+def convert_unserialised_schema(
+    *,
+    current_version: str,
+    target_version: str,
+    schema: Schema,
+    response_format: ResponseFormat,
+) -> bytes:
+    """Serialises the schema, then converts it in a worker process if it is above the process pool threshold.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema: The schema to convert.
+    - response_format: "schema" for the converted schema, or "patch" for the JSON Patch operations that give it.
+
+    Returns:
+    - bytes: The converted schema, or the JSON Patch, as JSON bytes.
+    """
+    schema_json = dump_json(schema)
+    if conversion_process_pool.accepts(len(schema_json)):
+        return convert_in_process_pool(
+            current_version=current_version,
+            target_version=target_version,
+            schema=schema,
+            schema_json=schema_json,
+            response_format=response_format,
+        )
+    return schema_processor.process_schema_json(
+        current_version=current_version,
+        target_version=target_version,
+        input_schema=schema,
+        response_format=response_format,
+    )
+
+
+def convert_in_process_pool(
+    *,
+    current_version: str,
+    target_version: str,
+    schema: Schema,
+    schema_json: bytes,
+    response_format: ResponseFormat,
+) -> bytes:
+    """Converts the schema in the worker processes, split by section if the pool splits it.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema: The schema to convert.
+    - schema_json: The schema as JSON bytes.
+    - response_format: "schema" for the converted schema, or "patch" for the JSON Patch operations that give it.
+
+    Returns:
+    - bytes: The converted schema, or the JSON Patch, as JSON bytes.
+    """
+    # The worker process returns the converted schema already serialised
+    with server_timing.timed("convert"):
+        if response_format == "schema" and conversion_process_pool.splits_by_section(
+            current_version=current_version,
+            target_version=target_version,
+            schema=schema,
+        ):
+            return conversion_process_pool.process_schema_by_section(
+                current_version=current_version,
+                target_version=target_version,
+                schema=schema,
+            )
+        return conversion_process_pool.process_schema_json(
+            current_version=current_version,
+            target_version=target_version,
+            schema_json=schema_json,
+            response_format=response_format,
+        )
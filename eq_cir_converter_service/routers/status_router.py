@@ -6,6 +6,13 @@ Provides a simple GET endpoint for Cloud Run to verify that the CIR Converter Se
 from fastapi import APIRouter
 from structlog import get_logger
 
+from eq_cir_converter_service.converters.v10 import sanitised_html_memo
+from eq_cir_converter_service.services.conversion_cache import conversion_cache
+from eq_cir_converter_service.services.conversion_executor import conversion_executor
+from eq_cir_converter_service.services.path_stats import path_stats
+from eq_cir_converter_service.services.schema.schema_processor import V10_COMPILED_PATHS
+from eq_cir_converter_service.services.section_cache import section_cache
+
 router = APIRouter()
 logger = get_logger()
 
@@ -20,3 +27,79 @@ async def health_check() -> dict:
     """
     logger.info("Health check endpoint.")
     return {"status": "OK"}
+
+
+@router.get("/status/conversions")
+async def conversion_status() -> dict:
+    """Reports how many conversions are running and how many are waiting for a worker.
+
+    Returns:
+        dict: A JSON object with the conversion counts and limits.
+              Example: {"running": 2, "queued": 0, "max_workers": 4, "queue_limit": 32}
+    """
+    return conversion_executor.stats()._asdict()
+
+
+@router.get("/status/conversion-cache")
+async def conversion_cache_status() -> dict:
+    """Reports the hit, miss and eviction counters and the size of the conversion cache.
+
+    Returns:
+        dict: A JSON object with the cache counters and size.
+              Example: {"hits": 12, "misses": 3, "evictions": 0, "invalidations": 0, "entries": 3,
+                        "size_bytes": 24576, "max_bytes": 67108864}
+    """
+    return conversion_cache.stats()._asdict()
+
+
+@router.get("/status/section-cache")
+async def section_cache_status() -> dict:
+    """Reports the hit, miss and eviction counters and the size of the cache of converted sections.
+
+    Returns:
+        dict: A JSON object with the cache counters and size.
+              Example: {"hits": 45, "misses": 5, "evictions": 0, "entries": 5, "size_bytes": 40960,
+                        "max_bytes": 33554432}
+    """
+    return section_cache.stats()._asdict()
+
+
+@router.get("/status/string-memo")
+async def string_memo_status() -> dict:
+    """Reports the hit and miss counters and the size of the memo of cleaned HTML text.
+
+    Returns:
+        dict: A JSON object with the memo counters and size.
+              Example: {"hits": 940, "misses": 60, "hit_rate": 0.94, "evictions": 0, "entries": 60,
+                        "max_entries": 16384}
+    """
+    return sanitised_html_memo.stats()._asdict()
+
+
+@router.get("/status/match-locations")
+async def match_locations_status() -> dict:
+    """Reports the hit and miss counters and the size of the cache of v10 JSONPath match locations by schema shape.
+
+    Returns:
+        dict: A JSON object with the cache counters and size, or only "single_pass": false if the
+              v10 paths are evaluated one by one, without the single-pass matcher and its cache.
+              Example: {"single_pass": true, "hits": 40, "misses": 2, "hit_rate": 0.9524, "evictions": 0,
+                        "uncacheable": 0, "entries": 2, "max_entries": 64}
+    """
+    match_locations = V10_COMPILED_PATHS.match_locations
+    if match_locations is None:
+        return {"single_pass": False}
+    return {"single_pass": True, **match_locations.stats()._asdict()}
+
+
+@router.get("/status/path-stats")
+async def path_stats_status() -> dict:
+    """Reports the time spent on each v10 JSONPath expression by the conversions since the service started.
+
+    Returns:
+        dict: A JSON object with the totals for each path, slowest first.
+              Example: {"enabled": true, "conversions": 3, "single_pass": true, "walk_ms": 4.2,
+                        "paths": [{"path": "$..guidance.contents[*].description", "compile_ms": 31.5,
+                                   "find_ms": 0.0, "matches": 12, "process_ms": 1.8, "list_expansions": 12}]}
+    """
+    return path_stats.report(V10_COMPILED_PATHS)
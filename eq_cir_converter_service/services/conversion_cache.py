@@ -0,0 +1,198 @@
+"""This module caches converted schemas by the content of the request.
+
+The publishing pipeline posts the same questionnaire many times, for retries, previews and publishes.
+Converted schemas are kept in memory, compressed, keyed by a hash of the versions and the canonical
+JSON of the input schema, and evicted least recently used first once the cache is over its byte budget.
+
+The key also covers the JSONPath expressions and the source of the converter code, so a change to
+either gives new keys, and the entries converted by the old code are dropped.
+"""
+
+import hashlib
+import json
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from importlib import resources
+from typing import NamedTuple
+
+from structlog import get_logger
+
+from eq_cir_converter_service.config import settings
+from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.types.custom_types import Schema
+
+logger = get_logger()
+
+# The packages whose source decides the converted schema
+CONVERTER_PACKAGES = ("eq_cir_converter_service.converters", "eq_cir_converter_service.services.schema")
+
+
+@lru_cache(maxsize=8)
+def converter_fingerprint(paths: tuple[str, ...]) -> str:
+    """Returns a hash of the JSONPath expressions and the source of the converter code.
+
+    Parameters:
+    - paths: The JSONPath expressions used for the conversion.
+
+    Returns:
+    - str: The hex digest of the hash.
+    """
+    fingerprint = hashlib.sha256()
+    for package in CONVERTER_PACKAGES:
+        for module in sorted(resources.files(package).iterdir(), key=lambda module: module.name):
+            if module.name.endswith(".py"):
+                fingerprint.update(module.name.encode())
+                fingerprint.update(module.read_bytes())
+    fingerprint.update(json.dumps(paths).encode())
+    return fingerprint.hexdigest()
+
+
+class ConversionCacheStats(NamedTuple):
+    """A snapshot of the conversion cache.
+
+    Attributes:
+    - hits: The number of conversions served from the cache.
+    - misses: The number of conversions not found in the cache.
+    - evictions: The number of entries removed to keep the cache within its byte budget.
+    - invalidations: The number of entries removed because the converter changed.
+    - entries: The number of converted schemas in the cache.
+    - size_bytes: The compressed size of the converted schemas in the cache.
+    - max_bytes: The byte budget of the cache.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+
+class ConversionCache:
+    """A least recently used cache of compressed converted schemas with a byte budget."""
+
+    def __init__(self, *, max_bytes: int) -> None:
+        """Creates an empty cache.
+
+        Parameters:
+        - max_bytes: The total compressed size of the cached schemas, or 0 to disable the cache.
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = ""
+        self._size_bytes = 0
+        self._counters: Counter[str] = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether converted schemas are cached."""
+        return self.max_bytes > 0
+
+    def make_key(
+        self,
+        *,
+        current_version: str,
+        target_version: str,
+        schema: Schema,
+        response_format: str = "schema",
+    ) -> str:
+        """Returns the cache key for converting the schema between the versions.
+
+        The schema is hashed as canonical JSON, so the same questionnaire gives the same key
+        whatever the whitespace or key order of the request body.
+
+        Parameters:
+        - current_version: The current version of the schema.
+        - target_version: The target version of the schema.
+        - schema: The schema to convert.
+        - response_format: The format of the converted schema, as the schema or as a JSON Patch.
+
+        Returns:
+        - str: The cache key.
+        """
+        fingerprint = converter_fingerprint(schema_processor.V10_COMPILED_PATHS.paths)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._invalidate(fingerprint)
+
+        key = hashlib.sha256(fingerprint.encode())
+        key.update(json.dumps([current_version, target_version, response_format]).encode())
+        key.update(json.dumps(schema, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode())
+        return key.hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        """Returns the converted schema for the key as JSON bytes, or None if it is not cached.
+
+        Parameters:
+        - key: The cache key.
+
+        Returns:
+        - bytes | None: The converted schema, or None.
+        """
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+        return zlib.decompress(compressed)
+
+    def put(self, key: str, converted_json: bytes) -> None:
+        """Caches the converted schema, evicting the least recently used schemas if over the byte budget.
+
+        Parameters:
+        - key: The cache key.
+        - converted_json: The converted schema as JSON bytes.
+        """
+        compressed = zlib.compress(converted_json)
+        if len(compressed) > self.max_bytes:
+            logger.debug("Converted schema is larger than the cache", size_bytes=len(compressed))
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= len(previous)
+            self._entries[key] = compressed
+            self._size_bytes += len(compressed)
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= len(evicted)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Removes every converted schema and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._counters.clear()
+
+    def stats(self) -> ConversionCacheStats:
+        """Returns the cache counters and size."""
+        with self._lock:
+            return ConversionCacheStats(
+                hits=self._counters["hits"],
+                misses=self._counters["misses"],
+                evictions=self._counters["evictions"],
+                invalidations=self._counters["invalidations"],
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def _invalidate(self, fingerprint: str) -> None:
+        """Drops the schemas converted by a different converter. Called with the lock held."""
+        if self._entries:
+            logger.info("Converter changed, clearing the conversion cache", entries=len(self._entries))
+        self._counters["invalidations"] += len(self._entries)
+        self._entries.clear()
+        self._size_bytes = 0
+        self._fingerprint = fingerprint
+
+
+conversion_cache = ConversionCache(max_bytes=settings.CONVERSION_CACHE_MAX_BYTES)
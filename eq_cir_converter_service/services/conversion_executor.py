@@ -0,0 +1,122 @@
+"""This module runs CPU-bound conversions on a bounded pool of worker threads.
+
+Converting a schema is CPU-bound, so running it directly in an async endpoint blocks the event
+loop, and with it the /status health check and every other request on the worker. The executor
+moves conversions onto a fixed number of threads and limits how many can wait for one.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple, ParamSpec, TypeVar
+
+from structlog import get_logger
+
+from eq_cir_converter_service.config import settings
+
+logger = get_logger()
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class ConversionQueueFullError(Exception):
+    """Raised when a conversion is submitted while the queue is already full."""
+
+
+class ConversionStats(NamedTuple):
+    """A snapshot of the conversions in the executor.
+
+    Attributes:
+    - running: The number of conversions being run by a worker.
+    - queued: The number of conversions waiting for a worker.
+    - max_workers: The number of conversions that can run at the same time.
+    - queue_limit: The number of conversions that can wait for a worker.
+    """
+
+    running: int
+    queued: int
+    max_workers: int
+    queue_limit: int
+
+
+class ConversionExecutor:
+    """Runs conversions on a bounded pool of worker threads with a bounded queue."""
+
+    def __init__(self, *, max_workers: int, queue_limit: int) -> None:
+        """Creates the executor. Worker threads are started as conversions are submitted.
+
+        Parameters:
+        - max_workers: The number of conversions that can run at the same time.
+        - queue_limit: The number of conversions that can wait for a worker.
+        """
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="conversion")
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queued = 0
+
+    async def run(self, function: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Runs the function on a worker thread and waits for its result without blocking the event loop.
+
+        Parameters:
+        - function: The function to run.
+        - args: The positional arguments for the function.
+        - kwargs: The keyword arguments for the function.
+
+        Returns:
+        - The result of the function.
+
+        Raises:
+        - ConversionQueueFullError: If the queue is full.
+        """
+        with self._lock:
+            if self._queued >= self.queue_limit:
+                raise ConversionQueueFullError
+            self._queued += 1
+
+        # Run with a copy of the context so the structlog context variables are kept in the worker
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, functools.partial(self._run_worker, function, *args, **kwargs))
+        future.add_done_callback(self._release_cancelled)
+
+        logger.debug("Conversion submitted", **self.stats()._asdict())
+
+        return await asyncio.wrap_future(future)
+
+    def _run_worker(self, function: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Runs the function on the worker thread, counting it as running rather than queued."""
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return function(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _release_cancelled(self, future: Future) -> None:
+        """Removes a conversion from the queue if it was cancelled before a worker picked it up."""
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def stats(self) -> ConversionStats:
+        """Returns how many conversions are running and how many are waiting for a worker."""
+        with self._lock:
+            return ConversionStats(
+                running=self._running,
+                queued=self._queued,
+                max_workers=self.max_workers,
+                queue_limit=self.queue_limit,
+            )
+
+
+conversion_executor = ConversionExecutor(
+    max_workers=settings.CONVERSION_MAX_WORKERS,
+    queue_limit=settings.CONVERSION_QUEUE_LIMIT,
+)
@@ -0,0 +1,249 @@
+"""This module runs schema conversions as jobs, so a client does not wait for a large schema on one request.
+
+A job is added to a bounded in-memory queue and its id returned straight away. A fixed number of
+job runners take jobs from the queue and convert them on the conversion executor with the same
+schema processor as POST /schema, so the result is the same as a synchronous conversion. A job that
+finds the conversion queue full waits for room in it, rather than failing, as the job queue is what
+limits the jobs accepted. Finished jobs, and their results, are kept for a retention period and then
+removed, oldest first, sooner if their results are over a byte budget.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from fastapi import status
+from structlog import get_logger
+
+from eq_cir_converter_service.config import settings
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.services import metrics
+from eq_cir_converter_service.services.conversion_executor import ConversionQueueFullError, conversion_executor
+from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.types.custom_types import Schema
+
+logger = get_logger()
+
+# How long, in seconds, a job runner waits before trying the conversion queue again when it is full
+QUEUE_FULL_RETRY_SECONDS = 0.05
+
+# The statuses of a job
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the job queue is already full."""
+
+
+class JobError(NamedTuple):
+    """The error a job failed with.
+
+    Attributes:
+    - status_code: The status code the error would have as a response to POST /schema.
+    - message: The description of the error.
+    """
+
+    status_code: int
+    message: str
+
+
+@dataclass
+class ConversionJob:
+    """A schema conversion submitted as a job.
+
+    Attributes:
+    - job_id: The id of the job.
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - status: Whether the job is queued, running, succeeded or failed.
+    - result: The converted schema as JSON bytes if the job succeeded, or the error if it failed.
+    - finished_at: The monotonic time the job finished, used to remove it after the retention period.
+    """
+
+    job_id: str
+    current_version: str
+    target_version: str
+    status: str = QUEUED
+    result: bytes | JobError | None = None
+    finished_at: float | None = None
+
+    def summary(self) -> dict:
+        """Returns the status of the job, without its result.
+
+        Returns:
+        - dict: The id, versions and status of the job, and the error if it failed.
+        """
+        summary: dict = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "current_version": self.current_version,
+            "target_version": self.target_version,
+        }
+        if isinstance(self.result, JobError):
+            summary["error"] = {"status_code": self.result.status_code, "message": self.result.message}
+        return summary
+
+
+class ConversionJobQueue:  # pylint: disable=too-many-instance-attributes
+    """Runs conversion jobs from a bounded queue on a fixed number of job runners."""
+
+    def __init__(self, *, runners: int, queue_limit: int, result_ttl_seconds: int, result_max_bytes: int) -> None:
+        """Creates the job queue. The job runners are started with the application.
+
+        Parameters:
+        - runners: The number of jobs that can run at the same time.
+        - queue_limit: The number of jobs that can wait for a runner.
+        - result_ttl_seconds: How long a finished job, and its result, is kept.
+        - result_max_bytes: The total size of the results of the finished jobs kept.
+        """
+        self.runners = runners
+        self.queue_limit = queue_limit
+        self.result_ttl_seconds = result_ttl_seconds
+        self.result_max_bytes = result_max_bytes
+        self._jobs: dict[str, ConversionJob] = {}
+        # The finished jobs, oldest first, so expired jobs can be removed from the front
+        self._finished: OrderedDict[str, float] = OrderedDict()
+        self._result_bytes = 0
+        self._queue: asyncio.Queue[tuple[ConversionJob, Schema]] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Starts the job runners on the running event loop."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_limit)
+        self._tasks = [
+            asyncio.create_task(self._run_jobs(self._queue), name=f"conversion-job-{index}")
+            for index in range(self.runners)
+        ]
+        logger.info("Conversion job runners started", runners=self.runners, queue_limit=self.queue_limit)
+
+    async def shutdown(self) -> None:
+        """Stops the job runners. Queued and running jobs are abandoned."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        logger.info("Conversion job runners stopped")
+
+    def submit(self, *, current_version: str, target_version: str, schema: Schema) -> ConversionJob:
+        """Adds a conversion to the job queue.
+
+        Parameters:
+        - current_version: The current version of the schema.
+        - target_version: The target version of the schema.
+        - schema: The schema to convert.
+
+        Returns:
+        - ConversionJob: The queued job.
+
+        Raises:
+        - JobQueueFullError: If the queue is full.
+        - RuntimeError: If the job runners have not been started.
+        """
+        if self._queue is None:
+            message = "The conversion job runners have not been started"
+            raise RuntimeError(message)
+
+        self._remove_expired()
+        job = ConversionJob(job_id=uuid.uuid4().hex, current_version=current_version, target_version=target_version)
+        try:
+            self._queue.put_nowait((job, schema))
+        except asyncio.QueueFull as exc:
+            raise JobQueueFullError from exc
+        self._jobs[job.job_id] = job
+        logger.info("Conversion job queued", job_id=job.job_id, queued=self._queue.qsize())
+        return job
+
+    def get(self, job_id: str) -> ConversionJob | None:
+        """Returns the job with the id, or None if there is no such job or it has expired.
+
+        Parameters:
+        - job_id: The id of the job.
+
+        Returns:
+        - ConversionJob | None: The job, or None.
+        """
+        self._remove_expired()
+        return self._jobs.get(job_id)
+
+    async def _run_jobs(self, queue: asyncio.Queue[tuple[ConversionJob, Schema]]) -> None:
+        """Runs jobs from the queue, one at a time, until cancelled."""
+        while True:
+            job, schema = await queue.get()
+            try:
+                await self._run_job(job, schema)
+            finally:
+                queue.task_done()
+
+    async def _run_job(self, job: ConversionJob, schema: Schema) -> None:
+        """Converts the schema of the job and records the result."""
+        logger.info("Conversion job started", job_id=job.job_id)
+        job.status = RUNNING
+        try:
+            job.result = await self._convert(job, schema)
+            job.status = SUCCEEDED
+        except Exception:  # pylint: disable=broad-exception-caught
+            # A job runner has to carry on with the next job whatever the error
+            logger.exception("An exception occurred while processing the schema", job_id=job.job_id)
+            job.result = JobError(
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                exception_messages.EXCEPTION_500_SCHEMA_PROCESSING,
+            )
+            job.status = FAILED
+
+        if isinstance(job.result, JobError):
+            metrics.record_error(job.result.status_code, job.result.message)
+        job.finished_at = time.monotonic()
+        self._finished[job.job_id] = job.finished_at
+        if isinstance(job.result, bytes):
+            self._result_bytes += len(job.result)
+        logger.info("Conversion job finished", job_id=job.job_id, status=job.status)
+        self._remove_expired()
+
+    @staticmethod
+    async def _convert(job: ConversionJob, schema: Schema) -> bytes:
+        """Converts the schema of the job on the conversion executor, waiting while the conversion queue is full."""
+        waiting = False
+        while True:
+            try:
+                return await conversion_executor.run(
+                    schema_processor.process_schema_json,
+                    current_version=job.current_version,
+                    target_version=job.target_version,
+                    input_schema=schema,
+                )
+            except ConversionQueueFullError:
+                if not waiting:
+                    logger.info("The conversion queue is full, waiting", job_id=job.job_id)
+                    waiting = True
+                await asyncio.sleep(QUEUE_FULL_RETRY_SECONDS)
+
+    def _remove_expired(self) -> None:
+        """Removes the finished jobs that are older than the retention period, or over the byte budget of results."""
+        expired_before = time.monotonic() - self.result_ttl_seconds
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            # The newest result is kept even if it is over the byte budget on its own
+            over_budget = self._result_bytes > self.result_max_bytes and len(self._finished) > 1
+            if finished_at > expired_before and not over_budget:
+                break
+            del self._finished[job_id]
+            job = self._jobs.pop(job_id, None)
+            if job is not None and isinstance(job.result, bytes):
+                self._result_bytes -= len(job.result)
+
+
+conversion_jobs = ConversionJobQueue(
+    runners=settings.CONVERSION_JOB_RUNNERS,
+    queue_limit=settings.CONVERSION_JOB_QUEUE_LIMIT,
+    result_ttl_seconds=settings.CONVERSION_JOB_RESULT_TTL_SECONDS,
+    result_max_bytes=settings.CONVERSION_JOB_RESULT_MAX_BYTES,
+)
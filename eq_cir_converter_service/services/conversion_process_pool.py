@@ -0,0 +1,284 @@
+"""This module converts large schemas in a pool of worker processes.
+
+Conversion is pure Python, so conversions running on the worker threads share one interpreter lock
+and one core. A large schema is instead handed to a worker process as the JSON bytes of the request
+body, and the converted schema comes back as the JSON bytes of the response, so neither side pickles
+a deeply nested dictionary. Small schemas are cheaper to convert in-process than to hand over.
+
+A schema with many sections can also be split by section across the worker processes, when each
+section converts on its own. The sections are handed over in runs of about the same size, while the
+other members of the schema are converted once in-process, and the converted JSON of each is joined
+into the same bytes as converting the whole schema in one go.
+"""
+
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import cast
+
+from structlog import get_logger
+
+from eq_cir_converter_service.config import settings
+from eq_cir_converter_service.config.logging_config import setup_logging
+from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.types.custom_types import Schema
+from eq_cir_converter_service.utils.helper_utils import dump_json
+
+logger = get_logger()
+
+
+def initialise_worker() -> None:
+    """Sets up logging in a worker process.
+
+    The worker imports this module, and with it the schema processor, before the initialiser runs,
+    so the JSONPath expressions are compiled when the worker starts rather than on its first conversion.
+    """
+    setup_logging()
+    logger.info("Conversion worker process started", path_count=len(schema_processor.V10_COMPILED_PATHS.paths))
+
+
+def process_schema_json(
+    *,
+    current_version: str,
+    target_version: str,
+    schema_json: bytes,
+    response_format: str = "schema",
+) -> bytes:
+    """Processes the schema given as JSON bytes and returns the processed schema as JSON bytes.
+
+    The processed schema is serialised the same way as a FastAPI JSON response, so it can be sent as is.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema_json: The schema to process, as JSON bytes.
+    - response_format: "schema" for the processed schema, or "patch" for the JSON Patch operations that give it.
+
+    Returns:
+    - bytes: The processed schema, or the patch, as JSON bytes.
+    """
+    process = schema_processor.process_schema_patch if response_format == "patch" else schema_processor.process_schema
+    output = process(
+        current_version=current_version,
+        target_version=target_version,
+        input_schema=json.loads(schema_json),
+    )
+    return dump_json(output)
+
+
+def process_sections_json(*, current_version: str, target_version: str, part_json: bytes) -> bytes:
+    """Processes the part of a schema holding a run of its sections, and returns the processed sections as JSON bytes.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - part_json: The part of the schema, with only its sections member, as JSON bytes.
+
+    Returns:
+    - bytes: The processed sections, as a JSON array.
+    """
+    output = schema_processor.process_schema_part(
+        current_version=current_version,
+        target_version=target_version,
+        schema_part=json.loads(part_json),
+    )
+    return dump_json(output[schema_processor.SECTIONS_KEY])
+
+
+def split_by_size(items: list[bytes], chunk_count: int) -> list[list[bytes]]:
+    """Splits serialised items into at most the given number of runs of consecutive items, of about the same size.
+
+    Parameters:
+    - items: The items, as JSON bytes.
+    - chunk_count: The largest number of runs.
+
+    Returns:
+    - list: The runs of items, in order.
+    """
+    chunk_bytes = sum(len(item) for item in items) / chunk_count
+    chunks: list[list[bytes]] = []
+    chunk: list[bytes] = []
+    total_bytes = 0
+    for item in items:
+        chunk.append(item)
+        total_bytes += len(item)
+        # Each run ends once the items so far reach its share of the total size
+        if total_bytes >= chunk_bytes * (len(chunks) + 1) and len(chunks) < chunk_count - 1:
+            chunks.append(chunk)
+            chunk = []
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def join_members(schema: Schema, member_jsons: dict[str, bytes]) -> bytes:
+    """Joins the JSON of each member of a schema into the JSON of the schema, with the members in the same order."""
+    return b"{" + b",".join(dump_json(key) + b":" + member_jsons[key] for key in schema) + b"}"
+
+
+class ConversionProcessPool:
+    """A pool of pre-warmed worker processes for converting schemas above a size threshold."""
+
+    def __init__(self, *, pool_size: int, threshold_bytes: int, parallel_min_sections: int = 0) -> None:
+        """Creates the pool. The worker processes are not started until `start` is called.
+
+        Parameters:
+        - pool_size: The number of worker processes, or 0 to convert every schema in-process.
+        - threshold_bytes: The size of the request body from which a schema is converted in a worker process.
+        - parallel_min_sections: The number of sections from which a schema is split by section across the
+          worker processes, or 0 to convert each schema in a single worker process.
+        """
+        self.pool_size = pool_size
+        self.threshold_bytes = threshold_bytes
+        self.parallel_min_sections = parallel_min_sections
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        """Starts the worker processes and waits until each has compiled the JSONPath expressions."""
+        if self.pool_size <= 0 or self._executor is not None:
+            return
+
+        # Worker processes are spawned rather than forked, as the application already runs threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.pool_size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=initialise_worker,
+        )
+        # Each submission starts a new worker while the others are still busy starting up
+        wait([self._executor.submit(int) for _ in range(self.pool_size)])
+
+        logger.info("Conversion process pool started", pool_size=self.pool_size, threshold_bytes=self.threshold_bytes)
+
+    def shutdown(self) -> None:
+        """Stops the worker processes once they have finished their conversions."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            logger.info("Conversion process pool stopped")
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker processes have been started."""
+        return self._executor is not None
+
+    def accepts(self, size_bytes: int) -> bool:
+        """Returns whether a schema of the given size is converted in a worker process.
+
+        Parameters:
+        - size_bytes: The size of the schema as JSON bytes.
+
+        Returns:
+        - bool: True if the pool is running and the schema is at or above the size threshold.
+        """
+        return self.running and size_bytes >= self.threshold_bytes
+
+    def process_schema_json(
+        self,
+        *,
+        current_version: str,
+        target_version: str,
+        schema_json: bytes,
+        response_format: str = "schema",
+    ) -> bytes:
+        """Processes the schema in a worker process and waits for the result.
+
+        Parameters:
+        - current_version: The current version of the schema.
+        - target_version: The target version of the schema.
+        - schema_json: The schema to process, as JSON bytes.
+        - response_format: "schema" for the processed schema, or "patch" for the JSON Patch operations that give it.
+
+        Returns:
+        - bytes: The processed schema, or the patch, as JSON bytes.
+
+        Raises:
+        - RuntimeError: If the pool has not been started.
+        """
+        if self._executor is None:
+            message = "The conversion process pool has not been started"
+            raise RuntimeError(message)
+
+        logger.debug("Converting schema in a worker process", schema_bytes=len(schema_json))
+
+        future = self._executor.submit(
+            process_schema_json,
+            current_version=current_version,
+            target_version=target_version,
+            schema_json=schema_json,
+            response_format=response_format,
+        )
+        return future.result()
+
+    def splits_by_section(self, *, current_version: str, target_version: str, schema: Schema) -> bool:
+        """Returns whether a schema accepted by the pool is split by section across the worker processes.
+
+        Parameters:
+        - current_version: The current version of the schema.
+        - target_version: The target version of the schema.
+        - schema: The schema to convert.
+
+        Returns:
+        - bool: True if the schema has at least the minimum number of sections, and the conversion
+          between the versions converts each section on its own.
+        """
+        sections = schema.get(schema_processor.SECTIONS_KEY)
+        if self.parallel_min_sections <= 0 or not isinstance(sections, list):
+            return False
+        if len(sections) < self.parallel_min_sections:
+            return False
+        plan = schema_processor.converter_registry.plan(current_version, target_version)
+        return bool(plan.stages) and plan.converts_items_separately(schema_processor.SECTIONS_KEY)
+
+    def process_schema_by_section(self, *, current_version: str, target_version: str, schema: Schema) -> bytes:
+        """Processes the sections of the schema across the worker processes, and the other members in-process.
+
+        The sections are handed over in one run of consecutive sections for each worker process, while
+        the other members, with the root-level paths, are converted once here.
+
+        Parameters:
+        - current_version: The current version of the schema.
+        - target_version: The target version of the schema.
+        - schema: The schema to process, whose sections are a list.
+
+        Returns:
+        - bytes: The processed schema, serialised to the same JSON bytes as processing it in one go.
+
+        Raises:
+        - RuntimeError: If the pool has not been started.
+        """
+        if self._executor is None:
+            message = "The conversion process pool has not been started"
+            raise RuntimeError(message)
+
+        sections_key = schema_processor.SECTIONS_KEY
+        sections = cast(list, schema[sections_key])
+        chunks = split_by_size([dump_json(section) for section in sections], self.pool_size)
+        logger.debug("Converting schema sections in worker processes", sections=len(sections), runs=len(chunks))
+        futures = [
+            self._executor.submit(
+                process_sections_json,
+                current_version=current_version,
+                target_version=target_version,
+                part_json=b"{" + dump_json(sections_key) + b":[" + b",".join(chunk) + b"]}",
+            )
+            for chunk in chunks
+        ]
+
+        # The other members are converted while the worker processes convert the sections
+        output_root = schema_processor.process_schema_part(
+            current_version=current_version,
+            target_version=target_version,
+            schema_part={key: value for key, value in schema.items() if key != sections_key},
+        )
+        member_jsons = {key: dump_json(value) for key, value in output_root.items()}
+        # Each run of sections is a JSON array, joined into one array without its brackets
+        sections_jsons = (future.result()[1:-1] for future in futures)
+        member_jsons[sections_key] = b"[" + b",".join(filter(None, sections_jsons)) + b"]"
+        return join_members(schema, member_jsons)
+
+
+conversion_process_pool = ConversionProcessPool(
+    pool_size=settings.CONVERSION_PROCESS_POOL_SIZE,
+    threshold_bytes=settings.CONVERSION_PROCESS_THRESHOLD_BYTES,
+    parallel_min_sections=settings.CONVERSION_PARALLEL_MIN_SECTIONS,
+)
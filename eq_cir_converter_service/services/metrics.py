@@ -0,0 +1,353 @@
+"""This module keeps the service metrics in memory and renders them in the Prometheus text exposition format.
+
+The metrics are served by GET /metrics for a Prometheus server, or any compatible agent, to scrape.
+Recording an observation takes a lock and a dictionary lookup, with a binary search of the bucket
+bounds for a histogram, so the metrics stay enabled under load.
+
+Conversions run in the conversion process pool are timed by the worker process, so their conversion
+phase is not recorded, but their requests are.
+"""
+
+import inspect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.services import server_timing
+from eq_cir_converter_service.services.conversion_executor import conversion_executor
+
+# The media type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# The bucket bounds for durations in seconds, from 1 ms to 1 minute
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# The bucket bounds for sizes in bytes, from 1 KiB to 64 MiB in powers of 4
+SIZE_BUCKETS = tuple(float(1024 * 4**power) for power in range(9))
+
+# The target versions the service converts to, used as label values; any other target version is labelled "other"
+CONVERTED_TARGET_VERSIONS = frozenset({"10.0.0"})
+
+
+def format_value(value: float) -> str:
+    """Formats a sample value or bucket bound as Prometheus expects."""
+    if math.isinf(value):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def escape_label_value(value: str) -> str:
+    """Escapes the backslashes, double quotes and line feeds in a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Formats label names and values as a Prometheus label set, escaping the values."""
+    if not names:
+        return ""
+    pairs = (f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values, strict=True))
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric(ABC):
+    """A metric with a set of labels, holding a value for each distinct set of label values."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        """Creates the metric.
+
+        Parameters:
+        - name: The name of the metric.
+        - documentation: The description of the metric.
+        - labelnames: The names of the labels of the metric.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        """Returns the lines of the metric in the text exposition format."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self.samples(),
+        ]
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Returns the sample lines of the metric."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes every recorded value."""
+
+
+class Counter(Metric):
+    """A count that only goes up, such as the number of errors."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        """Creates the counter, with no values until it is first incremented."""
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increments the count for the label values."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        """Returns a sample line for each set of label values."""
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+
+    def clear(self) -> None:
+        """Removes every count."""
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Metric):
+    """A value that goes up and down, such as the number of requests in flight.
+
+    A gauge with a function reads its value from the function when the metrics are rendered, so
+    nothing is recorded until then.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float] | None = None) -> None:
+        """Creates the gauge, with a value of zero.
+
+        Parameters:
+        - name: The name of the metric.
+        - documentation: The description of the metric.
+        - function: The function returning the value of the gauge, if it is not set directly.
+        """
+        super().__init__(name, documentation)
+        self._function = function
+        self._value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        """Increases the value."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Decreases the value."""
+        with self._lock:
+            self._value -= amount
+
+    def samples(self) -> Iterator[str]:
+        """Returns the sample line of the value."""
+        value = self._function() if self._function is not None else self._value
+        yield f"{self.name} {format_value(value)}"
+
+    def clear(self) -> None:
+        """Sets the value back to zero."""
+        with self._lock:
+            self._value = 0.0
+
+
+class Histogram(Metric):
+    """The distribution of observed values, such as request durations, counted into buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+    ) -> None:
+        """Creates the histogram, with no values until the first observation.
+
+        Parameters:
+        - name: The name of the metric.
+        - documentation: The description of the metric.
+        - labelnames: The names of the labels of the metric.
+        - buckets: The upper bounds of the buckets, in increasing order. A +Inf bucket is added.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # The count in each bucket, not cumulative, followed by the sum of the observations
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Records an observation for the label values."""
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(labels)
+            if values is None:
+                values = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            values[position] += 1
+            values[-1] += value
+
+    def samples(self) -> Iterator[str]:
+        """Returns the cumulative bucket counts, the sum and the count for each set of label values."""
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._values.items()]
+        bucket_labelnames = (*self.labelnames, "le")
+        for labels, values in series:
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), values, strict=False):
+                cumulative += count
+                bucket_labels = format_labels(bucket_labelnames, (*labels, format_value(bound)))
+                yield f"{self.name}_bucket{bucket_labels} {format_value(cumulative)}"
+            label_set = format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_set} {format_value(values[-1])}"
+            yield f"{self.name}_count{label_set} {format_value(cumulative)}"
+
+    def clear(self) -> None:
+        """Removes every observation."""
+        with self._lock:
+            self._values.clear()
+
+
+def error_message_templates() -> dict[str, str]:
+    """Returns the label for each exception message, so errors can be counted by message.
+
+    Messages built by a function, such as the invalid version message, are labelled with the names
+    of the function parameters in braces, so the number of labels stays bounded.
+
+    Returns:
+    - dict: The label of each constant message, and of the text before and after each parameter of a function.
+    """
+    templates = {}
+    for name, value in vars(exception_messages).items():
+        if name.startswith("EXCEPTION_") and isinstance(value, str):
+            templates[value] = value
+        elif name.startswith("exception_") and inspect.isfunction(value):
+            parameters = inspect.signature(value).parameters
+            marker = "\0"
+            prefix, _, suffix = value(*(marker for _ in parameters)).partition(marker)
+            templates[f"{prefix}\0{suffix}"] = value(*(f"{{{parameter}}}" for parameter in parameters))
+    return templates
+
+
+ERROR_MESSAGE_TEMPLATES = error_message_templates()
+
+
+def error_message_label(message: str) -> str:
+    """Returns the label for an error message, or "other" if it is not one of the exception messages."""
+    label = ERROR_MESSAGE_TEMPLATES.get(message)
+    if label is not None:
+        return label
+    for template, template_label in ERROR_MESSAGE_TEMPLATES.items():
+        prefix, separator, suffix = template.partition("\0")
+        if separator and message.startswith(prefix) and message.endswith(suffix):
+            return template_label
+    return "other"
+
+
+def target_version_label(target_version: str | None) -> str:
+    """Returns the label for a target version, keeping the number of label values bounded."""
+    if target_version is None:
+        return ""
+    return target_version if target_version in CONVERTED_TARGET_VERSIONS else "other"
+
+
+requests_in_flight = Gauge("cir_converter_http_requests_in_flight", "The number of HTTP requests being handled.")
+
+request_duration_seconds = Histogram(
+    "cir_converter_http_request_duration_seconds",
+    "The time taken to handle HTTP requests, in seconds.",
+    ("method", "route", "status_code", "target_version"),
+)
+
+request_body_bytes = Histogram(
+    "cir_converter_http_request_body_bytes",
+    "The size of HTTP request bodies, in bytes.",
+    ("route",),
+    buckets=SIZE_BUCKETS,
+)
+
+response_body_bytes = Histogram(
+    "cir_converter_http_response_body_bytes",
+    "The size of HTTP response bodies, in bytes.",
+    ("route",),
+    buckets=SIZE_BUCKETS,
+)
+
+conversion_phase_seconds = Histogram(
+    "cir_converter_conversion_phase_duration_seconds",
+    "The time taken by each phase of schema conversions, in seconds.",
+    ("phase", "target_version"),
+)
+
+conversions_running = Gauge(
+    "cir_converter_conversions_running",
+    "The number of conversions being run by a worker.",
+    lambda: conversion_executor.stats().running,
+)
+
+conversions_queued = Gauge(
+    "cir_converter_conversions_queued",
+    "The number of conversions waiting for a worker.",
+    lambda: conversion_executor.stats().queued,
+)
+
+errors_total = Counter(
+    "cir_converter_errors_total",
+    "The number of errors returned, by status code and exception message.",
+    ("status_code", "message"),
+)
+
+METRICS: tuple[Metric, ...] = (
+    requests_in_flight,
+    request_duration_seconds,
+    request_body_bytes,
+    response_body_bytes,
+    conversion_phase_seconds,
+    conversions_running,
+    conversions_queued,
+    errors_total,
+)
+
+
+def record_error(status_code: int, message: str) -> None:
+    """Counts an error returned to a client.
+
+    Parameters:
+    - status_code: The status code of the error.
+    - message: The exception message of the error.
+    """
+    errors_total.inc(str(status_code), error_message_label(message))
+
+
+@contextmanager
+def timed_phase(phase: str, target_version: str) -> Iterator[None]:
+    """Records the time taken by a phase of a conversion, if the phase completes, and adds it to the Server-Timing.
+
+    Parameters:
+    - phase: The name of the phase.
+    - target_version: The target version of the conversion.
+    """
+    start = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - start
+    conversion_phase_seconds.observe(seconds, phase, target_version_label(target_version))
+    server_timing.add(phase, seconds)
+
+
+def render() -> bytes:
+    """Returns every metric in the Prometheus text exposition format."""
+    return ("\n".join(line for metric in METRICS for line in metric.render()) + "\n").encode("utf-8")
+
+
+def clear() -> None:
+    """Removes every recorded value, for tests."""
+    for metric in METRICS:
+        metric.clear()
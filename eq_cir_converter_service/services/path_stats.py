@@ -0,0 +1,97 @@
+"""This module aggregates the time spent on each JSONPath expression across conversions.
+
+Path statistics are off by default. When enabled, each conversion records the time spent finding
+and processing the matches of each expression, and the totals since the service started are
+reported by GET /status/path-stats, slowest expression first, to show where conversion time goes.
+
+Only conversions in the service process are recorded, not those run in the conversion process pool.
+"""
+
+import threading
+
+from eq_cir_converter_service.config import settings
+from eq_cir_converter_service.converters.compiled_paths import CompiledPaths
+from eq_cir_converter_service.converters.path_timings import PathTimings
+
+
+def milliseconds(seconds: float) -> float:
+    """Returns the time in milliseconds, rounded to microseconds."""
+    return round(seconds * 1000, 3)
+
+
+def totals_ms(path: dict) -> float:
+    """Returns the total time spent finding and processing the matches of a path, in milliseconds."""
+    return float(path["find_ms"] + path["process_ms"])
+
+
+class PathStats:
+    """The total time spent on each JSONPath expression, across every conversion recorded."""
+
+    def __init__(self, *, enabled: bool) -> None:
+        """Creates empty path statistics.
+
+        Parameters:
+        - enabled: Whether conversions record their path timings.
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conversions = 0
+        self._totals: PathTimings | None = None
+
+    def record(self, timings: PathTimings) -> None:
+        """Adds the path timings of a conversion to the totals.
+
+        Parameters:
+        - timings: The path timings of the conversion.
+        """
+        with self._lock:
+            if self._totals is None:
+                self._totals = PathTimings(len(timings.matches))
+            self._totals.add(timings)
+            self._conversions += 1
+
+    def clear(self) -> None:
+        """Removes every recorded conversion."""
+        with self._lock:
+            self._conversions = 0
+            self._totals = None
+
+    def report(self, compiled_paths: CompiledPaths) -> dict:
+        """Returns the totals for each JSONPath expression, slowest first.
+
+        Parameters:
+        - compiled_paths: The compiled paths the conversions used.
+
+        Returns:
+        - dict: Whether path statistics are enabled, the number of conversions recorded, the time
+          spent on the first walk of each schema, and the totals for each expression.
+        """
+        with self._lock:
+            conversions = self._conversions
+            totals = self._totals or PathTimings(len(compiled_paths.paths))
+            paths = [
+                {
+                    "path": path,
+                    "compile_ms": milliseconds(compile_seconds),
+                    "find_ms": milliseconds(totals.find_seconds[path_index]),
+                    "matches": totals.matches[path_index],
+                    "process_ms": milliseconds(totals.process_seconds[path_index]),
+                    "list_expansions": totals.list_expansions[path_index],
+                }
+                for path_index, (path, compile_seconds) in enumerate(
+                    zip(compiled_paths.paths, compiled_paths.path_compile_seconds, strict=True),
+                )
+            ]
+            walk_ms = milliseconds(totals.walk_seconds)
+
+        paths.sort(key=totals_ms, reverse=True)
+        return {
+            "enabled": self.enabled,
+            "conversions": conversions,
+            "single_pass": compiled_paths.matcher is not None,
+            "walk_ms": walk_ms,
+            "paths": paths,
+        }
+
+
+path_stats = PathStats(enabled=bool(settings.CONVERSION_PATH_STATS))
@@ -0,0 +1,164 @@
+"""This module reads a batch of schemas to convert, and writes the result of converting each of them.
+
+A batch is a JSON array, or newline-delimited JSON with one item per line, of objects with the
+current_version, target_version and schema of each schema to convert. Each item is checked on its
+own, so an invalid item is reported in its result without rejecting the rest of the batch.
+"""
+
+import json
+from typing import NamedTuple
+
+from fastapi import status
+from fastapi.exceptions import RequestValidationError
+
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.types.custom_types import Schema
+from eq_cir_converter_service.utils.helper_utils import dump_json, load_json
+
+# The media types of a batch sent, and returned, as newline-delimited JSON
+NDJSON_MEDIA_TYPES = frozenset({"application/x-ndjson", "application/ndjson", "application/jsonl"})
+
+
+class BatchItem(NamedTuple):
+    """A schema in the batch to convert.
+
+    Attributes:
+    - position: The position of the item in the batch.
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema: The schema to convert.
+    """
+
+    position: int
+    current_version: str
+    target_version: str
+    schema: Schema
+
+
+class BatchItemResult(NamedTuple):
+    """A schema in the batch that has been converted.
+
+    Attributes:
+    - position: The position of the item in the batch.
+    - converted_json: The converted schema, as JSON bytes.
+    """
+
+    position: int
+    converted_json: bytes
+
+
+class BatchItemError(NamedTuple):
+    """A schema in the batch that is invalid or could not be converted.
+
+    Attributes:
+    - position: The position of the item in the batch.
+    - status_code: The status code the error would have as a response to POST /schema.
+    - message: The description of the error.
+    """
+
+    position: int
+    status_code: int
+    message: str
+
+
+def load_batch(batch_json: bytes, *, ndjson: bool) -> list[BatchItem | BatchItemError]:
+    """Parses a batch request body into its items.
+
+    Parameters:
+    - batch_json: The request body.
+    - ndjson: Whether the body is newline-delimited JSON rather than a JSON array.
+
+    Returns:
+    - list: The items of the batch, with an error for each item that is invalid.
+
+    Raises:
+    - RequestValidationError: If the body is not a valid JSON array.
+    - HTTPException: If the body is not valid UTF-8.
+    """
+    if ndjson:
+        lines = [line for line in batch_json.splitlines() if line.strip()]
+        return [load_item(index, line) for index, line in enumerate(lines)]
+
+    batch = load_json(batch_json)
+    if not isinstance(batch, list):
+        raise RequestValidationError(
+            [{"type": "list_type", "loc": ("body",), "msg": "Input should be a valid list", "input": batch}],
+        )
+    return [read_item(index, item) for index, item in enumerate(batch)]
+
+
+def load_item(position: int, item_json: bytes) -> BatchItem | BatchItemError:
+    """Parses a line of a newline-delimited JSON batch into an item.
+
+    Parameters:
+    - position: The position of the item in the batch.
+    - item_json: The line of the batch.
+
+    Returns:
+    - BatchItem | BatchItemError: The item, or an error if it is invalid.
+    """
+    try:
+        item = json.loads(item_json)
+    except json.JSONDecodeError as exception:
+        return BatchItemError(
+            position,
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            exception_messages.exception_422_invalid_batch_json(str(exception)),
+        )
+    except UnicodeDecodeError:
+        return BatchItemError(
+            position,
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            exception_messages.exception_422_invalid_batch_json("invalid UTF-8"),
+        )
+    return read_item(position, item)
+
+
+def read_item(position: int, item: object) -> BatchItem | BatchItemError:
+    """Checks that a parsed item of the batch has the versions and schema to convert.
+
+    Parameters:
+    - position: The position of the item in the batch.
+    - item: The parsed item.
+
+    Returns:
+    - BatchItem | BatchItemError: The item, or an error if it is invalid.
+    """
+    if (
+        not isinstance(item, dict)
+        or not isinstance(item.get("current_version"), str)
+        or not isinstance(item.get("target_version"), str)
+        or not isinstance(item.get("schema"), dict)
+    ):
+        return BatchItemError(
+            position,
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            exception_messages.EXCEPTION_422_INVALID_BATCH_ITEM,
+        )
+    return BatchItem(position, item["current_version"], item["target_version"], item["schema"])
+
+
+def dump_results(results: list[BatchItemResult | BatchItemError], *, ndjson: bool) -> bytes:
+    """Serialises the results of the batch, in the order of the items.
+
+    The converted schemas are already serialised, so they are joined into the response as they are.
+
+    Parameters:
+    - results: The result of each item.
+    - ndjson: Whether to write newline-delimited JSON, with a line per result, rather than a JSON object.
+
+    Returns:
+    - bytes: The results as JSON bytes.
+    """
+    lines = []
+    for result in results:
+        if isinstance(result, BatchItemResult):
+            lines.append(b'{"index":%d,"status":"success","schema":%b}' % (result.position, result.converted_json))
+        else:
+            error = {"status_code": result.status_code, "message": result.message}
+            lines.append(b'{"index":%d,"status":"error",%b' % (result.position, dump_json(error)[1:]))
+
+    if ndjson:
+        return b"".join(line + b"\n" for line in lines)
+    failed = sum(isinstance(result, BatchItemError) for result in results)
+    return b'{"succeeded":%d,"failed":%d,"results":[%b]}' % (len(results) - failed, failed, b",".join(lines))
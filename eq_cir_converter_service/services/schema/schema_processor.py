@@ -1,19 +1,133 @@
 """This module converts the schema from the current to the target version."""
 
+import json
+from typing import cast
+
 from structlog import get_logger
 
-from eq_cir_converter_service.converters.v10 import convert_to_v10
+from eq_cir_converter_service.config import settings
+from eq_cir_converter_service.converters.compiled_paths import CompiledPaths, compile_paths
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.converters.registry import ConversionPlan, ConversionStep, ConverterRegistry
+from eq_cir_converter_service.converters.v10 import process_match
+from eq_cir_converter_service.services import metrics
+from eq_cir_converter_service.services.path_stats import path_stats
 from eq_cir_converter_service.services.schema.paths import (
     PATHS,
 )
+from eq_cir_converter_service.services.section_cache import request_section_counts, section_cache
 from eq_cir_converter_service.types.custom_types import Schema
+from eq_cir_converter_service.utils.helper_utils import dump_json
+from eq_cir_converter_service.utils.json_patch import Operation, make_patch
+from eq_cir_converter_service.utils.log_utils import SchemaSummary
 
 logger = get_logger()
 
+# Parse the v10 paths once at startup rather than on every request
+V10_COMPILED_PATHS = compile_paths(tuple(PATHS))
+
+# Whether each section can be converted on its own, with the same result as converting the whole schema
+V10_SECTIONS_CONVERT_SEPARATELY = (
+    V10_COMPILED_PATHS.matcher is not None and V10_COMPILED_PATHS.matcher.matches_within_items("sections")
+)
+
+
+# The top-level field whose items are converted, and cached, one at a time when a schema is reconverted incrementally
+SECTIONS_KEY = "sections"
+
+# The conversions between schema versions. Every version is converted to 10.0.0 by the v10 paths.
+converter_registry = ConverterRegistry(max_plans=settings.CONVERSION_PLAN_CACHE_SIZE)
+converter_registry.register(ConversionStep("v10", "*", "10.0.0", paths=tuple(PATHS), process=process_match))
+
+
+def record_path_timings(compiled_paths: CompiledPaths, timings: PathTimings) -> None:
+    """Records the time spent on each path of a conversion stage, if it has the v10 paths the statistics report on."""
+    if compiled_paths is V10_COMPILED_PATHS:
+        path_stats.record(timings)
+
+
+def convert_with_plan(plan: ConversionPlan, schema: Schema, *, in_place: bool = True) -> Schema:
+    """Converts the schema with a conversion plan, recording the time spent on each path if path statistics are enabled.
+
+    Parameters:
+    - plan: The plan from the current to the target version.
+    - schema: The schema, or part of a schema, to convert.
+    - in_place: Whether to convert the schema in place, or leave it unchanged.
+
+    Returns:
+    - dict: The converted schema.
+    """
+    return plan.apply(schema, in_place=in_place, record_timings=record_path_timings if path_stats.enabled else None)
+
+
+def convert_cached_part(plan: ConversionPlan, part: Schema) -> tuple[Schema, bool]:
+    """Converts a part of a schema with a conversion plan, reusing the converted part if it is in the section cache.
+
+    Parameters:
+    - plan: The plan from the current to the target version.
+    - part: The part of the schema to convert.
+
+    Returns:
+    - tuple: The converted part, and whether it was reused from the cache.
+    """
+    key = section_cache.make_key(
+        current_version=plan.current_version,
+        target_version=plan.target_version,
+        part_json=dump_json(part),
+    )
+    cached_json = section_cache.get(key)
+    if cached_json is not None:
+        return json.loads(cached_json), True
+
+    converted_part = convert_with_plan(plan, part)
+    section_cache.put(key, dump_json(converted_part))
+    return converted_part, False
+
+
+def convert_incrementally(plan: ConversionPlan, schema: Schema) -> Schema:
+    """Converts the schema part by part, converting only the parts that are not in the section cache.
+
+    The members of the schema other than the sections are converted together, so the root-level
+    paths, such as `$.title` and `$.submission.*`, are applied to them as usual, and each section is
+    converted on its own. The plan must convert each section the same way as within the whole schema.
+
+    Parameters:
+    - plan: The plan from the current to the target version.
+    - schema: The schema to convert, whose sections are a list.
+
+    Returns:
+    - dict: The converted schema, with its members in the same order.
+    """
+    root_part = {key: value for key, value in schema.items() if key != SECTIONS_KEY}
+    converted_root, _ = convert_cached_part(plan, root_part)
+
+    sections = cast(list, schema[SECTIONS_KEY])
+    converted_sections: list = []
+    reused = 0
+    for section in sections:
+        converted_part, part_reused = convert_cached_part(plan, {SECTIONS_KEY: [section]})
+        converted_sections.extend(cast(list, converted_part[SECTIONS_KEY]))
+        reused += part_reused
+    recomputed = len(sections) - reused
+    logger.debug("Schema reconverted incrementally", sections_reused=reused, sections_recomputed=recomputed)
+
+    section_counts = request_section_counts.get()
+    if section_counts is not None:
+        section_counts.converted = True
+        section_counts.reused += reused
+        section_counts.recomputed += recomputed
+
+    return {key: converted_sections if key == SECTIONS_KEY else converted_root[key] for key in schema}
+
 
 def process_schema(*, current_version: str, target_version: str, input_schema: Schema) -> Schema:
     """Processes the schema and converts from the current to the target version if required.
 
+    The conversion plan between the versions is resolved from the converter registry, and compiled
+    only the first time the versions are converted between. If the section cache is enabled and
+    each section converts on its own, only the sections that changed since they were last converted
+    are converted again.
+
     Parameters:
     - current_version: The current version of the schema.
     - target_version: The target version of the schema.
@@ -27,13 +141,21 @@ def process_schema(*, current_version: str, target_version: str, input_schema: S
     logger.debug("Current version:", current_version=current_version)
     logger.debug("Target version:", target_version=target_version)
 
-    logger.debug("Input schema:", input_schema=input_schema)
+    logger.debug("Input schema:", input_schema=SchemaSummary(input_schema))
 
-    if target_version == "10.0.0":
-        logger.debug("Converting schema to version 10.0.0...")
-        logger.debug("Extractable strings for conversion to version 10.0.0:", paths=PATHS)
+    plan = converter_registry.plan(current_version, target_version)
+    if plan.stages:
+        logger.debug("Converting schema...", steps=plan.step_names, stage_count=len(plan.stages))
 
-        output_schema = convert_to_v10(input_schema, PATHS)
+        with metrics.timed_phase("convert", target_version):
+            if (
+                section_cache.enabled
+                and isinstance(input_schema.get(SECTIONS_KEY), list)
+                and plan.converts_items_separately(SECTIONS_KEY)
+            ):
+                output_schema = convert_incrementally(plan, input_schema)
+            else:
+                output_schema = convert_with_plan(plan, input_schema)
 
         logger.info("Schema converted successfully")
 
@@ -41,6 +163,83 @@ def process_schema(*, current_version: str, target_version: str, input_schema: S
 
     logger.info("No conversions needed for target version, using input schema as is", target_version=target_version)
 
-    logger.debug("Output schema:", output_schema=input_schema)
+    logger.debug("Output schema:", output_schema=SchemaSummary(input_schema))
 
     return input_schema
+
+
+def process_schema_patch(*, current_version: str, target_version: str, input_schema: Schema) -> list[Operation]:
+    """Processes the schema and returns the JSON Patch operations that convert it to the target version.
+
+    The schema is converted without being changed, and the converted schema shares every unchanged
+    dictionary and list with it, so the patch is made by walking only the changed paths.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - input_schema: The schema to process.
+
+    Returns:
+    - list: The JSON Patch operations, which give the processed schema when applied to the input schema.
+    """
+    logger.debug("Processing the schema as a patch", current_version=current_version, target_version=target_version)
+
+    plan = converter_registry.plan(current_version, target_version)
+    if not plan.stages:
+        logger.info("No conversions needed for target version, using input schema as is", target_version=target_version)
+        return []
+
+    with metrics.timed_phase("convert", target_version):
+        output_schema = convert_with_plan(plan, input_schema, in_place=False)
+    with metrics.timed_phase("diff", target_version):
+        operations = make_patch(input_schema, output_schema)
+
+    logger.info("Schema converted successfully", patch_operations=len(operations))
+    return operations
+
+
+def process_schema_part(*, current_version: str, target_version: str, schema_part: Schema) -> Schema:
+    """Processes part of a schema and converts it from the current to the target version if required.
+
+    A part is one top-level member of the schema, or the sections member holding a single section
+    when `V10_SECTIONS_CONVERT_SEPARATELY` is set. Every match of the conversion paths lies within a
+    single part, so converting the parts one at a time gives the same result as converting the whole schema.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - schema_part: The part of the schema to process.
+
+    Returns:
+    - dict: The processed part of the schema.
+    """
+    logger.debug("Processing part of the schema", current_version=current_version, target_version=target_version)
+
+    return convert_with_plan(converter_registry.plan(current_version, target_version), schema_part)
+
+
+def process_schema_json(
+    *,
+    current_version: str,
+    target_version: str,
+    input_schema: Schema,
+    response_format: str = "schema",
+) -> bytes:
+    """Processes the schema and returns the processed schema serialised as JSON bytes.
+
+    The schema is serialised in the same call as it is converted, so both run on the conversion worker
+    thread and neither blocks the event loop.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - input_schema: The schema to process.
+    - response_format: "schema" for the processed schema, or "patch" for the JSON Patch operations that give it.
+
+    Returns:
+    - bytes: The processed schema, or the patch, as JSON bytes.
+    """
+    process = process_schema_patch if response_format == "patch" else process_schema
+    output = process(current_version=current_version, target_version=target_version, input_schema=input_schema)
+    with metrics.timed_phase("serialise", target_version):
+        return dump_json(output)
@@ -0,0 +1,122 @@
+"""This module converts a schema while it is being received, streaming the converted schema back.
+
+The request body is read chunk by chunk. Each top-level member of the schema, and each section,
+is converted as soon as it has been received, so only the largest of them is held in memory
+rather than the whole schema. The converted JSON is the same, byte for byte, as the converted
+schema returned by POST /schema.
+"""
+
+from collections.abc import AsyncIterator
+
+from structlog import get_logger
+
+from eq_cir_converter_service.services.conversion_executor import conversion_executor
+from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.utils.helper_utils import dump_json
+from eq_cir_converter_service.utils.json_stream import (
+    ArrayEnd,
+    ArrayItem,
+    ArrayStart,
+    JSONObjectReader,
+    JSONStreamEvent,
+    ObjectMember,
+)
+
+logger = get_logger()
+
+# The members whose items are converted one at a time
+SPLIT_KEYS = frozenset({"sections"}) if schema_processor.V10_SECTIONS_CONVERT_SEPARATELY else frozenset()
+
+
+async def read_schema_events(chunks: AsyncIterator[bytes]) -> AsyncIterator[JSONStreamEvent]:
+    """Reads a schema from chunks of JSON, yielding each member and section as soon as it is complete.
+
+    Parameters:
+    - chunks: The chunks of the request body.
+
+    Yields:
+    - JSONStreamEvent: The members of the schema, with the sections as separate items.
+
+    Raises:
+    - JSONStreamError: If the body is not a valid JSON object.
+    """
+    reader = JSONObjectReader(SPLIT_KEYS)
+    async for chunk in chunks:
+        for event in reader.feed(chunk):
+            yield event
+    reader.close()
+
+
+def convert_event_json(
+    *,
+    current_version: str,
+    target_version: str,
+    event: ObjectMember | ArrayItem,
+) -> bytes:
+    """Converts a member or section of the schema and serialises it, together on a conversion worker thread.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - event: The member of the schema, or a section.
+
+    Returns:
+    - bytes: The converted section as JSON, or the converted member as its JSON key and value.
+    """
+    value = [event.value] if isinstance(event, ArrayItem) else event.value
+    converted_part = schema_processor.process_schema_part(
+        current_version=current_version,
+        target_version=target_version,
+        schema_part={event.key: value},
+    )
+    converted_value = converted_part[event.key]
+    if isinstance(event, ArrayItem):
+        return dump_json(converted_value[0])  # type: ignore[index]
+    return dump_json(event.key) + b":" + dump_json(converted_value)
+
+
+async def stream_converted_schema(
+    *,
+    current_version: str,
+    target_version: str,
+    first_event: JSONStreamEvent,
+    events: AsyncIterator[JSONStreamEvent],
+) -> AsyncIterator[bytes]:
+    """Converts each member and section of the schema as it is read, yielding the converted schema as JSON.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+    - first_event: The first member of the schema, read before the response started.
+    - events: The rest of the schema.
+
+    Yields:
+    - bytes: The converted schema, as JSON serialised the same way as a FastAPI JSON response.
+    """
+    separator = b"{"
+    event: JSONStreamEvent | None = first_event
+    try:
+        while event is not None:
+            if isinstance(event, ArrayStart):
+                yield separator + dump_json(event.key) + b":["
+                separator = b""
+            elif isinstance(event, ArrayEnd):
+                yield b"]"
+                separator = b","
+            else:
+                converted_json = await conversion_executor.run(
+                    convert_event_json,
+                    current_version=current_version,
+                    target_version=target_version,
+                    event=event,
+                )
+                yield separator + converted_json
+                separator = b","
+            event = await anext(events, None)
+    except Exception:
+        # The response has started, so the client only sees the converted schema end early
+        logger.exception("An exception occurred while streaming the converted schema")
+        raise
+
+    yield b"}"
+    logger.info("Schema streamed successfully")
@@ -0,0 +1,165 @@
+"""This module caches converted schema parts by their content, so a schema is reconverted incrementally.
+
+Authors edit one section of a questionnaire at a time, and each preview posts the whole questionnaire.
+A schema is converted in parts: its members other than the sections together, and each section on
+its own. Each part is hashed, with the versions, as compact JSON, and its converted JSON is kept in
+memory, so only the parts that changed since the questionnaire was last converted are converted again.
+The least recently used parts are evicted once the cache is over its byte budget.
+
+The number of sections reused and recomputed for a request is counted in a context variable, which
+is copied to the conversion worker threads, so the endpoint can report them in response headers.
+"""
+
+import hashlib
+import json
+import threading
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import NamedTuple
+
+from eq_cir_converter_service.config import settings
+
+
+class SectionCounts:  # pylint: disable=too-few-public-methods
+    """The number of sections of a request reused from the section cache and converted again."""
+
+    __slots__ = ("converted", "recomputed", "reused")
+
+    def __init__(self) -> None:
+        """Starts the counts at zero, for a request whose schema has not been converted section by section."""
+        self.converted = False
+        self.reused = 0
+        self.recomputed = 0
+
+
+class SectionCacheStats(NamedTuple):
+    """A snapshot of the section cache.
+
+    Attributes:
+    - hits: The number of schema parts reused from the cache.
+    - misses: The number of schema parts converted because they were not in the cache.
+    - evictions: The number of parts removed to keep the cache within its byte budget.
+    - entries: The number of converted parts in the cache.
+    - size_bytes: The size of the converted parts in the cache.
+    - max_bytes: The byte budget of the cache.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+
+class SectionCache:
+    """A least recently used cache of the converted JSON of schema parts, with a byte budget."""
+
+    def __init__(self, *, max_bytes: int) -> None:
+        """Creates an empty cache.
+
+        Parameters:
+        - max_bytes: The total size of the cached parts, or 0 to disable the cache.
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[bytes, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size_bytes = 0
+        self._counters: Counter[str] = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether schemas are converted part by part, reusing the converted parts."""
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(*, current_version: str, target_version: str, part_json: bytes) -> bytes:
+        """Returns the cache key for converting a part of a schema between the versions.
+
+        The key order of the part is kept in its JSON, as the converted part keeps it too.
+
+        Parameters:
+        - current_version: The current version of the schema.
+        - target_version: The target version of the schema.
+        - part_json: The part of the schema as compact JSON.
+
+        Returns:
+        - bytes: The cache key.
+        """
+        key = hashlib.blake2b(json.dumps([current_version, target_version]).encode(), digest_size=16)
+        key.update(part_json)
+        return key.digest()
+
+    def get(self, key: bytes) -> bytes | None:
+        """Returns the converted part for the key as JSON bytes, or None if it is not cached.
+
+        Parameters:
+        - key: The cache key.
+
+        Returns:
+        - bytes | None: The converted part, or None.
+        """
+        with self._lock:
+            converted_json = self._entries.get(key)
+            if converted_json is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+        return converted_json
+
+    def put(self, key: bytes, converted_json: bytes) -> None:
+        """Caches the converted part, evicting the least recently used parts if over the byte budget.
+
+        Parameters:
+        - key: The cache key.
+        - converted_json: The converted part as JSON bytes.
+        """
+        if len(converted_json) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= len(previous)
+            self._entries[key] = converted_json
+            self._size_bytes += len(converted_json)
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= len(evicted)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Removes every converted part and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._counters.clear()
+
+    def stats(self) -> SectionCacheStats:
+        """Returns the cache counters and size."""
+        with self._lock:
+            return SectionCacheStats(
+                hits=self._counters["hits"],
+                misses=self._counters["misses"],
+                evictions=self._counters["evictions"],
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+
+section_cache = SectionCache(max_bytes=settings.CONVERSION_SECTION_CACHE_MAX_BYTES)
+
+request_section_counts: ContextVar[SectionCounts | None] = ContextVar("request_section_counts", default=None)
+
+
+def count_sections() -> SectionCounts:
+    """Starts counting the sections reused and recomputed for the current request.
+
+    Returns:
+    - SectionCounts: The counts, updated as the schema of the request is converted.
+    """
+    section_counts = SectionCounts()
+    request_section_counts.set(section_counts)
+    return section_counts
@@ -0,0 +1,94 @@
+"""This module times the phases of a request for its Server-Timing response header.
+
+When the header is enabled, the server timing middleware starts the timings of each request in a
+context variable, and the phases of the request add their durations to it as they complete. The
+context variable is copied to the conversion worker threads, so phases run there are timed too.
+When the header is disabled, the context variable is never set and timing a phase only reads it.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class ServerTiming:
+    """The durations of the phases of a request, in the order they were first recorded."""
+
+    __slots__ = ("_lock", "durations", "mark", "start")
+
+    def __init__(self) -> None:
+        """Starts timing the request."""
+        self.start = self.mark = time.perf_counter()
+        self.durations: dict[str, float] = {}
+        # Phases of a batch request can complete on several worker threads at once
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        """Adds to the duration of a phase.
+
+        Parameters:
+        - name: The name of the phase.
+        - seconds: The time the phase took.
+        """
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def lap(self, name: str) -> None:
+        """Records the time since the last mark as a phase, and moves the mark to now.
+
+        Parameters:
+        - name: The name of the phase that ended now.
+        """
+        now = time.perf_counter()
+        self.add(name, now - self.mark)
+        self.mark = now
+
+    def header_value(self) -> str:
+        """Returns the value of the Server-Timing header, with each phase and the total in milliseconds."""
+        with self._lock:
+            durations = [*self.durations.items(), ("total", time.perf_counter() - self.start)]
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in durations)
+
+
+request_server_timing: ContextVar[ServerTiming | None] = ContextVar("request_server_timing", default=None)
+
+
+def add(name: str, seconds: float) -> None:
+    """Adds to the duration of a phase of the current request, if its phases are being timed.
+
+    Parameters:
+    - name: The name of the phase.
+    - seconds: The time the phase took.
+    """
+    server_timing = request_server_timing.get()
+    if server_timing is not None:
+        server_timing.add(name, seconds)
+
+
+def lap(name: str) -> None:
+    """Records the time since the last mark as a phase of the current request, if its phases are being timed.
+
+    Parameters:
+    - name: The name of the phase that ended now.
+    """
+    server_timing = request_server_timing.get()
+    if server_timing is not None:
+        server_timing.lap(name)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Times a phase of the current request, if its phases are being timed and the phase completes.
+
+    Parameters:
+    - name: The name of the phase.
+    """
+    server_timing = request_server_timing.get()
+    if server_timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    yield
+    server_timing.add(name, time.perf_counter() - start)
@@ -1,10 +1,14 @@
 """Utility functions."""
 
+import json
+
 from fastapi import HTTPException, status
+from fastapi.exceptions import RequestValidationError
 from semver import VersionInfo
 from structlog import get_logger
 
 from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.types.custom_types import Schema
 
 logger = get_logger()
 
@@ -27,3 +31,99 @@ def validate_version(version: str, version_type: str) -> None:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"status": "error", "message": exception_messages.exception_400_invalid_version(version_type)},
         ) from exception
+
+
+def validate_versions(current_version: str, target_version: str) -> None:
+    """Validates the current and target version.
+
+    Parameters:
+    - current_version: The current version of the schema.
+    - target_version: The target version of the schema.
+
+    Raises:
+    - HTTPException: If either version is invalid, or they are the same.
+    """
+    logger.debug("Validating the current and target version...")
+    validate_version(current_version, "current")
+    validate_version(target_version, "target")
+
+    if current_version == target_version:
+        logger.debug("The current and target schema versions are the same")
+        # Ideally, the caller must not send to the converter service with the same versions.
+        # Hence it is the best approach to give an error response.
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"status": "error", "message": exception_messages.EXCEPTION_400_MATCHING_SCHEMA_VERSIONS},
+        )
+
+
+def dump_json(schema: object) -> bytes:
+    """Serialises the schema, or part of it, to JSON bytes in the same way as a FastAPI JSON response.
+
+    Parameters:
+    - schema: The schema, or part of it, to serialise.
+
+    Returns:
+    - bytes: The schema as compact UTF-8 JSON.
+    """
+    return json.dumps(schema, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def load_json(request_json: bytes) -> object:
+    """Parses a request body, rejecting invalid JSON as FastAPI does for a JSON body.
+
+    Parameters:
+    - request_json: The request body.
+
+    Returns:
+    - object: The parsed body.
+
+    Raises:
+    - RequestValidationError: If the body is missing or is not valid JSON.
+    - HTTPException: If the body is not valid UTF-8.
+    """
+    try:
+        body = json.loads(request_json) if request_json else None
+    except json.JSONDecodeError as exception:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", exception.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": exception.msg},
+                },
+            ],
+            body=exception.doc,
+        ) from exception
+    except UnicodeDecodeError as exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="There was an error parsing the body",
+        ) from exception
+
+    if body is None:
+        raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+    return body
+
+
+def load_schema_json(schema_json: bytes) -> Schema:
+    """Parses a request body into a schema, rejecting invalid input as FastAPI does for a `Schema` body.
+
+    Parameters:
+    - schema_json: The request body.
+
+    Returns:
+    - dict: The schema.
+
+    Raises:
+    - RequestValidationError: If the body is missing, is not valid JSON or is not a JSON object.
+    - HTTPException: If the body is not valid UTF-8.
+    """
+    schema = load_json(schema_json)
+    if not isinstance(schema, dict):
+        raise RequestValidationError(
+            [{"type": "dict_type", "loc": ("body",), "msg": "Input should be a valid dictionary", "input": schema}],
+        )
+    return schema
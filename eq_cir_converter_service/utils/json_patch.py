@@ -0,0 +1,102 @@
+"""JSON Patch (RFC 6902) operations between two JSON documents.
+
+A patch is made by walking the source and target documents together. A dictionary or list that is
+the same object in both is skipped without being walked, so a target that shares its unchanged
+subtrees with the source, such as the output of a conversion that leaves its input unchanged, is
+diffed in time proportional to the changes rather than to the size of the documents.
+
+Lists are aligned on their unchanged items, so an item replaced by several items, such as a string
+split into paragraphs, becomes a replace of the item followed by an add for each further item.
+"""
+
+from difflib import SequenceMatcher
+
+Operation = dict[str, object]
+
+
+def escape_pointer_token(key: str | int) -> str:
+    """Escapes a dictionary key or list index for a JSON pointer."""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def make_patch(source: object, target: object) -> list[Operation]:
+    """Returns the JSON Patch operations that change the source document into the target document.
+
+    Parameters:
+    - source: The document before the changes.
+    - target: The document after the changes.
+
+    Returns:
+    - list: The add, remove and replace operations, to be applied in order.
+    """
+    operations: list[Operation] = []
+    diff_values(source, target, "", operations)
+    return operations
+
+
+def diff_values(source: object, target: object, path: str, operations: list[Operation]) -> None:
+    """Adds the operations that change a value of the source into the value of the target at the same path."""
+    if source is target:
+        return
+    if isinstance(source, dict) and isinstance(target, dict):
+        diff_dicts(source, target, path, operations)
+    elif isinstance(source, list) and isinstance(target, list):
+        diff_lists(source, target, path, operations)
+    elif type(source) is not type(target) or source != target:
+        operations.append({"op": "replace", "path": path, "value": target})
+
+
+def diff_dicts(source: dict, target: dict, path: str, operations: list[Operation]) -> None:
+    """Adds the operations that change a dictionary of the source into the dictionary of the target."""
+    operations.extend(
+        {"op": "remove", "path": f"{path}/{escape_pointer_token(key)}"} for key in source if key not in target
+    )
+    for key, value in target.items():
+        if key in source:
+            diff_values(source[key], value, f"{path}/{escape_pointer_token(key)}", operations)
+        else:
+            operations.append({"op": "add", "path": f"{path}/{escape_pointer_token(key)}", "value": value})
+
+
+def alignment_key(value: object) -> object:
+    """Returns the key a list item is aligned on: the object itself for a dictionary or list, otherwise its value."""
+    if isinstance(value, dict | list):
+        return ("object", id(value))
+    return (type(value).__name__, value)
+
+
+def diff_lists(source: list, target: list, path: str, operations: list[Operation]) -> None:
+    """Adds the operations that change a list of the source into the list of the target.
+
+    Lists of the same length are compared item by item. Otherwise the unchanged items are aligned,
+    and each run of changed items is diffed item by item, with the items added or removed after it.
+    """
+    if len(source) == len(target):
+        for index, (source_item, target_item) in enumerate(zip(source, target, strict=True)):
+            diff_values(source_item, target_item, f"{path}/{index}", operations)
+        return
+
+    source_keys = [alignment_key(item) for item in source]
+    matcher = SequenceMatcher(None, source_keys, [alignment_key(item) for item in target], autojunk=False)
+    # The items before each run have already been changed into the target items, so the indexes are those of the target
+    for tag, source_start, source_end, target_start, target_end in matcher.get_opcodes():
+        if tag != "equal":
+            diff_list_run(
+                source[source_start:source_end],
+                target[target_start:target_end],
+                target_start,
+                path,
+                operations,
+            )
+
+
+def diff_list_run(source_items: list, target_items: list, start: int, path: str, operations: list[Operation]) -> None:
+    """Adds the operations that change a run of items of a list, from an index of the target, into the target items."""
+    paired = min(len(source_items), len(target_items))
+    for offset in range(paired):
+        diff_values(source_items[offset], target_items[offset], f"{path}/{start + offset}", operations)
+    operations.extend(
+        {"op": "add", "path": f"{path}/{start + offset}", "value": target_items[offset]}
+        for offset in range(paired, len(target_items))
+    )
+    operations.extend({"op": "remove", "path": f"{path}/{start + paired}"} for _ in range(paired, len(source_items)))
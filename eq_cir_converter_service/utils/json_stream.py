@@ -0,0 +1,254 @@
+"""Incremental reader for a JSON object received in chunks.
+
+The reader splits a JSON object into its members as soon as each one has been received, and can
+split chosen array members further into their items, so a large document can be processed one
+part at a time without holding all of it. Each part is located by a tokenizer that skips over
+strings and counts brackets, and then parsed with the standard library json module.
+"""
+
+import json
+import re
+from typing import NamedTuple
+
+# JSON whitespace
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+
+# A string, with the closing quote missing if it has not all been received, or a bracket
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*(?P<closed>")?|[\[\]{}]', re.DOTALL)
+
+# The characters of a number, true, false or null
+_SCALAR = re.compile(rb"[^ \t\n\r,\]}\[{\"]*")
+
+# Buffered bytes already read are only dropped once there are this many, to avoid copying on every chunk
+_COMPACT_BYTES = 64 * 1024
+
+
+class JSONStreamError(ValueError):
+    """Raised when the document is not valid JSON, or is not a JSON object."""
+
+    def __init__(self, message: str, position: int) -> None:
+        """Creates the error.
+
+        Parameters:
+        - message: The description of the error.
+        - position: The position in the document, in bytes, at which the error was found.
+        """
+        super().__init__(f"{message}: byte {position}")
+        self.message = message
+        self.position = position
+
+
+class ObjectMember(NamedTuple):
+    """A member of the object, with its value."""
+
+    key: str
+    value: object
+
+
+class ArrayStart(NamedTuple):
+    """The start of a member of the object whose array value is read item by item."""
+
+    key: str
+
+
+class ArrayItem(NamedTuple):
+    """An item of an array value that is read item by item."""
+
+    key: str
+    value: object
+
+
+class ArrayEnd(NamedTuple):
+    """The end of a member of the object whose array value is read item by item."""
+
+    key: str
+
+
+JSONStreamEvent = ObjectMember | ArrayStart | ArrayItem | ArrayEnd
+
+# The parts of the document the reader expects next
+_OBJECT = "object"
+_FIRST_KEY = "first key"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_MEMBER_END = "member end"
+_FIRST_ITEM = "first item"
+_ITEM = "item"
+_ITEM_END = "item end"
+_DONE = "done"
+
+# The punctuation expected next, and what the reader expects after it
+_PUNCTUATION = {
+    (_OBJECT, "{"): _FIRST_KEY,
+    (_FIRST_KEY, "}"): _DONE,
+    (_MEMBER_END, "}"): _DONE,
+    (_MEMBER_END, ","): _KEY,
+    (_COLON, ":"): _VALUE,
+    (_FIRST_ITEM, "]"): _MEMBER_END,
+    (_ITEM_END, "]"): _MEMBER_END,
+    (_ITEM_END, ","): _ITEM,
+}
+
+
+class JSONObjectReader:
+    """Reads a JSON object from chunks of bytes, returning each member as soon as it is complete."""
+
+    def __init__(self, split_keys: frozenset[str] = frozenset()) -> None:
+        """Creates a reader for a new document.
+
+        Parameters:
+        - split_keys: The keys of the members whose array values are read item by item.
+        """
+        self.split_keys = split_keys
+        self._buffer = bytearray()
+        self._offset = 0
+        self._position = 0
+        self._expecting = _OBJECT
+        # The keys of the members read so far, the last being the member being read
+        self._keys: list[str] = []
+        # The position reached and bracket depth in a partly received array or object value
+        self._scan = (0, 0)
+
+    @property
+    def _key(self) -> str:
+        """The key of the member being read."""
+        return self._keys[-1]
+
+    def feed(self, chunk: bytes) -> list[JSONStreamEvent]:
+        """Adds the next chunk of the document and returns the members and items it completes.
+
+        Parameters:
+        - chunk: The next bytes of the document.
+
+        Returns:
+        - list: The events for the members and items completed by the chunk, in document order.
+
+        Raises:
+        - JSONStreamError: If the document is not a valid JSON object.
+        """
+        if self._position >= _COMPACT_BYTES:
+            del self._buffer[: self._position]
+            self._offset += self._position
+            self._scan = (self._scan[0] - self._position, self._scan[1])
+            self._position = 0
+        self._buffer += chunk
+
+        events: list[JSONStreamEvent] = []
+        while self._read_next(events):
+            pass
+        return events
+
+    def close(self) -> None:
+        """Checks that the whole document has been read.
+
+        Raises:
+        - JSONStreamError: If the document ended before the object was complete.
+        """
+        if self._expecting != _DONE:
+            message = f"Expecting {self._expecting}"
+            raise self._error(message, len(self._buffer))
+
+    def _read_next(self, events: list[JSONStreamEvent]) -> bool:
+        """Reads the next part of the document the reader expects, returning False if more bytes are needed."""
+        position = _WHITESPACE.match(self._buffer, self._position).end()  # type: ignore[union-attr]
+        self._position = position
+        if position == len(self._buffer):
+            return False
+        character = chr(self._buffer[position])
+
+        expecting = _PUNCTUATION.get((self._expecting, character))
+        if expecting is not None:
+            if character == "]":
+                events.append(ArrayEnd(self._key))
+            self._advance(position + 1, expecting)
+            return True
+        if self._expecting in (_FIRST_KEY, _KEY):
+            return self._read_key(character, position)
+        if self._expecting == _VALUE and character == "[" and self._key in self.split_keys:
+            events.append(ArrayStart(self._key))
+            self._advance(position + 1, _FIRST_ITEM)
+            return True
+        if self._expecting in (_VALUE, _FIRST_ITEM, _ITEM):
+            return self._read_value(position, events)
+        message = "Extra data" if self._expecting == _DONE else f"Expecting {self._expecting}"
+        raise self._error(message, position)
+
+    def _read_value(self, position: int, events: list[JSONStreamEvent]) -> bool:
+        """Reads a member value or array item, returning False if more bytes are needed."""
+        value_end = self._scan_value(position)
+        if value_end is None:
+            return False
+        value = self._parse(position, value_end)
+        if self._expecting == _VALUE:
+            events.append(ObjectMember(self._key, value))
+            self._advance(value_end, _MEMBER_END)
+        else:
+            events.append(ArrayItem(self._key, value))
+            self._advance(value_end, _ITEM_END)
+        return True
+
+    def _read_key(self, character: str, position: int) -> bool:
+        """Reads the key of the next member, returning False if more bytes are needed."""
+        if character != '"':
+            message = f"Expecting {self._expecting}"
+            raise self._error(message, position)
+        token = _TOKEN.match(self._buffer, position)
+        if token is None or token.group("closed") is None:
+            return False
+        key = self._parse(position, token.end())
+        if key in self._keys:
+            # A repeated key would replace a member that has already been returned
+            message = "Duplicate key"
+            raise self._error(message, position)
+        self._keys.append(str(key))
+        self._advance(token.end(), _COLON)
+        return True
+
+    def _scan_value(self, position: int) -> int | None:
+        """Returns the end of the value starting at the position, or None if it has not all been received."""
+        buffer = self._buffer
+        if buffer[position] not in b"[{":
+            if buffer[position] == ord('"'):
+                token = _TOKEN.match(buffer, position)
+                return token.end() if token is not None and token.group("closed") is not None else None
+            # A scalar ends at the next delimiter, which has to be received to know the scalar is complete
+            end = _SCALAR.match(buffer, position).end()  # type: ignore[union-attr]
+            return end if end < len(buffer) else None
+
+        scan_position, depth = self._scan
+        if scan_position <= position:
+            scan_position, depth = position, 0
+        for token in _TOKEN.finditer(buffer, scan_position):
+            bracket = buffer[token.start()]
+            if bracket == ord('"'):
+                if token.group("closed") is None:
+                    self._scan = (token.start(), depth)
+                    return None
+            elif bracket in b"[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return token.end()
+        self._scan = (len(buffer), depth)
+        return None
+
+    def _parse(self, start: int, end: int) -> object:
+        """Parses the JSON value between the positions in the buffer."""
+        try:
+            return json.loads(self._buffer[start:end])
+        except json.JSONDecodeError as exception:
+            raise self._error(exception.msg, start + exception.pos) from exception
+        except UnicodeDecodeError as exception:
+            message = "Invalid UTF-8"
+            raise self._error(message, start) from exception
+
+    def _advance(self, position: int, expecting: str) -> None:
+        """Moves past the part of the document that has been read."""
+        self._position = position
+        self._expecting = expecting
+
+    def _error(self, message: str, position: int) -> JSONStreamError:
+        """Returns the error to raise for the position in the buffer."""
+        return JSONStreamError(message, self._offset + position)
@@ -0,0 +1,51 @@
+"""Utilities for logging schemas."""
+
+import hashlib
+import json
+
+from eq_cir_converter_service.types.custom_types import Schema
+
+
+class SchemaSummary:
+    """A log value that summarises a schema instead of logging the whole of it.
+
+    The summary is only built when a log entry is rendered, so a debug log call that is filtered
+    out by the log level does not serialise the schema. Whatever the size of the schema, the summary
+    is its size in bytes, the number of sections and blocks, and a short hash of its content.
+    """
+
+    __slots__ = ("_schema",)
+
+    def __init__(self, schema: Schema) -> None:
+        """Wraps the schema to summarise.
+
+        Parameters:
+        - schema: The schema to summarise when the log entry is rendered.
+        """
+        self._schema = schema
+
+    def __structlog__(self) -> dict:
+        """Returns the summary of the schema, used by the JSON log renderer.
+
+        Returns:
+        - dict: The size in bytes, section and block counts, and hash of the schema.
+        """
+        schema_json = json.dumps(self._schema, ensure_ascii=False, separators=(",", ":"), default=repr).encode("utf-8")
+        sections = self._schema.get("sections")
+        sections = sections if isinstance(sections, list) else []
+        return {
+            "bytes": len(schema_json),
+            "sections": len(sections),
+            "blocks": sum(
+                len(group.get("blocks") or [])
+                for section in sections
+                if isinstance(section, dict)
+                for group in section.get("groups") or []
+                if isinstance(group, dict)
+            ),
+            "sha256": hashlib.sha256(schema_json).hexdigest()[:12],
+        }
+
+    def __repr__(self) -> str:
+        """Returns the summary of the schema, used by the console log renderer."""
+        return " ".join(f"{name}={value}" for name, value in self.__structlog__().items())
@@ -0,0 +1,91 @@
+"""Benchmark of the bandwidth saved and CPU spent by compressing request and response bodies.
+
+For the integration fixture schema, as the request body, and its converted schema, as the response
+body, it compresses the body with gzip and deflate at each compression level, and reports the
+compressed size, the share of bytes saved, and the median time to compress and decompress it. The
+schema can be repeated in a larger questionnaire with `--sections`, as real questionnaires are
+larger and more repetitive than the fixture.
+
+Run with `make benchmark-compression`. The results are written as JSON to the `--output` file, or to stdout.
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import sys
+import time
+import zlib
+from collections.abc import Callable
+from functools import partial
+
+from eq_cir_converter_service.middleware.content_encoding_middleware import CONTENT_CODING_WBITS
+from eq_cir_converter_service.utils.helper_utils import dump_json
+
+INPUT_SCHEMA_PATH = "tests/integration/v10_conversion/input_schema.json"
+OUTPUT_SCHEMA_PATH = "tests/integration/v10_conversion/output_schema.json"
+
+
+def load_body(path: str, section_count: int) -> bytes:
+    """Returns a fixture schema as compact JSON, with its sections repeated the given number of times."""
+    with open(path, encoding="utf-8") as f:
+        schema = json.load(f)
+    schema["sections"] = [copy.deepcopy(section) for _ in range(section_count) for section in schema["sections"]]
+    return dump_json(schema)
+
+
+def median_ms(function: Callable[[], object], repeat: int) -> float:
+    """Returns the median time, in milliseconds, taken by the function."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def compress(body: bytes, content_coding: str, level: int) -> bytes:
+    """Compresses a body in one go, as the content encoding middleware does for a response that is not streamed."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, CONTENT_CODING_WBITS[content_coding])
+    return compressor.compress(body) + compressor.flush()
+
+
+def benchmark_body(body: bytes, levels: list[int], repeat: int) -> list[dict]:
+    """Returns the compressed size and timings of the body for each content coding and level."""
+    results = []
+    for content_coding, wbits in CONTENT_CODING_WBITS.items():
+        for level in levels:
+            compressed = compress(body, content_coding, level)
+            results.append(
+                {
+                    "content_coding": content_coding,
+                    "level": level,
+                    "compressed_bytes": len(compressed),
+                    "saved": round(1 - len(compressed) / len(body), 4),
+                    "compress_ms": round(median_ms(partial(compress, body, content_coding, level), repeat), 3),
+                    "decompress_ms": round(median_ms(partial(zlib.decompress, compressed, wbits), repeat), 3),
+                },
+            )
+    return results
+
+
+def main() -> None:
+    """Runs the benchmark and writes the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sections", type=int, default=1, help="The number of times to repeat the fixture sections")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 3, 6, 9])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"), default=sys.stdout)
+    args = parser.parse_args()
+
+    results = {}
+    for name, path in (("request", INPUT_SCHEMA_PATH), ("response", OUTPUT_SCHEMA_PATH)):
+        body = load_body(path, args.sections)
+        results[name] = {"bytes": len(body), "results": benchmark_body(body, args.levels, args.repeat)}
+
+    json.dump({"sections": args.sections, "repeat": args.repeat, **results}, args.output, indent=2)
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
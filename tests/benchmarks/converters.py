@@ -0,0 +1,216 @@
+"""Micro-benchmarks of the v10 converter functions on a synthetic questionnaire.
+
+Each function is timed call by call on fresh copies of its input, so the in-place conversion of one
+call does not change the input of the next, and copying is not timed. Each result has the number
+of calls per second, the mean and 95th percentile time per call, and, from a separate call traced
+with tracemalloc, the number of memory blocks allocated and still held when it returns and the
+peak memory allocated during it.
+
+The memo of sanitised HTML and the cache of match locations are emptied before each call, and the
+emptying is not timed, so every call walks the schema and sanitises its strings as it would for a
+questionnaire the service has not seen. With `--warm` the caches are kept between calls instead, so
+the calls after the first time the converters with them already filled.
+
+Run with `make benchmark-converters`. The size and amount of HTML of the questionnaire can be set
+with the options below. The results are written as JSON to the `--output` file, or to stdout.
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import NamedTuple
+
+from eq_cir_converter_service.config.logging_config import setup_logging
+from eq_cir_converter_service.converters import v10
+from eq_cir_converter_service.services.schema.schema_processor import V10_COMPILED_PATHS
+from tests.benchmarks.questionnaire import QuestionnaireConfig, QuestionnaireGenerator, generate_questionnaire
+
+# The number of placeholders, each in its own paragraph, in the guidance of the many placeholders benchmark
+MANY_PLACEHOLDERS = 60
+
+
+class BenchmarkCase(NamedTuple):
+    """A function to benchmark, with its input.
+
+    Attributes:
+    - name: The name of the benchmark.
+    - function: The function to call.
+    - argument: The argument to call it with. A fresh copy is passed to each call.
+    """
+
+    name: str
+    function: Callable[[object], object]
+    argument: object
+
+
+def benchmark_cases(questionnaire: dict) -> list[BenchmarkCase]:
+    """Returns the functions to benchmark, with inputs taken from the questionnaire.
+
+    Parameters:
+    - questionnaire: The synthetic questionnaire.
+
+    Returns:
+    - list: The benchmark cases.
+    """
+    question = questionnaire["sections"][0]["groups"][0]["blocks"][0]["question"]
+    guidance = question["guidance"]
+    texts = [
+        text
+        for section in questionnaire["sections"]
+        for group in section["groups"]
+        for text in [section["title"], group["title"]]
+    ]
+    html_text = "".join(f"<p><b>{text}</b><br></p>" for text in texts)
+    # Guidance with a paragraph for each of many piped values, as in long guidance blocks
+    many_placeholders = QuestionnaireGenerator(
+        QuestionnaireConfig(placeholders=MANY_PLACEHOLDERS, html_density=1.0),
+    ).placeholder_text("piped")
+
+    return [
+        BenchmarkCase(
+            "convert_to_v10",
+            lambda schema: v10.convert_to_v10(schema, V10_COMPILED_PATHS),  # type: ignore[arg-type]
+            questionnaire,
+        ),
+        BenchmarkCase(
+            "convert_to_v10_shared",
+            lambda schema: v10.convert_to_v10(schema, V10_COMPILED_PATHS, in_place=False),  # type: ignore[arg-type]
+            questionnaire,
+        ),
+        BenchmarkCase("process_item", v10.process_item, guidance),  # type: ignore[arg-type]
+        BenchmarkCase(
+            "process_list",
+            v10.process_list,  # type: ignore[arg-type]
+            question["description"] + [option["label"] for option in question["answers"][0]["options"]],
+        ),
+        BenchmarkCase(
+            "split_paragraphs_with_placeholders",
+            v10.split_paragraphs_with_placeholders,  # type: ignore[arg-type]
+            guidance["contents"][0]["description"],
+        ),
+        BenchmarkCase(
+            "split_paragraphs_with_many_placeholders",
+            v10.split_paragraphs_with_placeholders,  # type: ignore[arg-type]
+            many_placeholders,
+        ),
+        BenchmarkCase("get_sanitised_text", v10.get_sanitised_text, html_text),  # type: ignore[arg-type]
+    ]
+
+
+def clear_caches() -> None:
+    """Empties the caches the converters keep between calls, so the next call converts from scratch."""
+    v10.sanitised_html_memo.clear()
+    if V10_COMPILED_PATHS.match_locations is not None:
+        V10_COMPILED_PATHS.match_locations.clear()
+
+
+def run_case(case: BenchmarkCase, iterations: int, *, warm: bool = False) -> dict:
+    """Times the function of the benchmark case and measures its allocations.
+
+    Parameters:
+    - case: The benchmark case.
+    - iterations: The number of timed calls.
+    - warm: Whether to keep the caches of the converters between calls, rather than empty them before each call.
+
+    Returns:
+    - dict: The results of the benchmark case.
+    """
+    copies = [copy.deepcopy(case.argument) for _ in range(iterations + 2)]
+
+    case.function(copies.pop())
+    timings = []
+    for argument in copies[:iterations]:
+        if not warm:
+            clear_caches()
+        start = time.perf_counter_ns()
+        case.function(argument)
+        timings.append(time.perf_counter_ns() - start)
+
+    argument = copies[iterations]
+    if not warm:
+        clear_caches()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = case.function(argument)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    # The snapshots themselves are not allocations of the function
+    exclude_tracemalloc = [tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)]
+    after = after.filter_traces(exclude_tracemalloc)
+    before = before.filter_traces(exclude_tracemalloc)
+
+    mean_ns = statistics.fmean(timings)
+    return {
+        "name": case.name,
+        "iterations": iterations,
+        "ops_per_sec": round(1e9 / mean_ns, 1),
+        "mean_us": round(mean_ns / 1000, 3),
+        "p95_us": round(statistics.quantiles(timings, n=20)[-1] / 1000, 3) if iterations > 1 else None,
+        "allocated_blocks": sum(stat.count_diff for stat in after.compare_to(before, "filename")),
+        "peak_allocated_bytes": peak_bytes,
+    }
+
+
+def main() -> None:
+    """Runs the benchmarks and writes the results as JSON."""
+    defaults = QuestionnaireConfig()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=defaults.sections)
+    parser.add_argument("--blocks", type=int, default=defaults.blocks, help="Question blocks in each section")
+    parser.add_argument("--answers", type=int, default=defaults.answers, help="Answers to each question")
+    parser.add_argument("--options", type=int, default=defaults.options, help="Options of each answer")
+    parser.add_argument("--placeholders", type=int, default=defaults.placeholders, help="Placeholders in guidance")
+    parser.add_argument(
+        "--html-density",
+        type=float,
+        default=defaults.html_density,
+        help="Fraction of fields with HTML",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--only", nargs="+", help="Names of the benchmarks to run")
+    parser.add_argument("--warm", action="store_true", help="Keep the caches of the converters between calls")
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"), default=sys.stdout)
+    args = parser.parse_args()
+
+    # Logs from the converters would otherwise be timed too
+    setup_logging()
+
+    config = QuestionnaireConfig(
+        sections=args.sections,
+        blocks=args.blocks,
+        answers=args.answers,
+        options=args.options,
+        placeholders=args.placeholders,
+        html_density=args.html_density,
+        seed=args.seed,
+    )
+    questionnaire = generate_questionnaire(config)
+    cases = [case for case in benchmark_cases(questionnaire) if not args.only or case.name in args.only]
+
+    results = [run_case(case, args.iterations, warm=args.warm) for case in cases]
+
+    json.dump(
+        {
+            "questionnaire": config._asdict(),
+            "questionnaire_bytes": len(json.dumps(questionnaire).encode("utf-8")),
+            "python": sys.version.split()[0],
+            "caches": "warm" if args.warm else "cold",
+            "results": results,
+        },
+        args.output,
+        indent=2,
+    )
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
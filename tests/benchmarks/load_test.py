@@ -0,0 +1,293 @@
+"""End-to-end HTTP load test of POST /schema, measuring the /status latency at the same time.
+
+The app is started with uvicorn in a separate process, as it runs in Cloud Run, and driven by a
+number of concurrent clients that each post one schema after another for the duration of the test.
+Each schema is picked at random from a mix of small, typical and huge schemas. Meanwhile a separate
+client calls GET /status at a fixed interval, as the Cloud Run health check does, so the report
+shows when conversion work delays the health check.
+
+The report has the throughput, the error rate, the p50, p95 and p99 latency of POST /schema overall
+and for each schema size, and the p50, p95 and p99 latency of GET /status.
+
+Run with `make load-test`. The conversion cache is disabled in the app unless `--cache` is given,
+so every request is converted. The results are written as JSON to the `--output` file, or to stdout.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import httpx
+
+from tests.benchmarks.schemas import scaled_schema
+
+QUERY = "current_version=9.0.0&target_version=10.0.0"
+
+# The sizes of schema in the mix, by the number of sections of the integration test schema
+SCHEMA_SECTIONS = {"small": 0, "typical": 1, "huge": 400}
+
+
+def percentiles(timings: list[float]) -> dict:
+    """Returns the p50, p95, p99 and maximum of the timings in milliseconds.
+
+    Parameters:
+    - timings: The timings in seconds.
+
+    Returns:
+    - dict: The percentiles, or None for each if there are fewer than two timings.
+    """
+    if len(timings) < 2:
+        return {"count": len(timings), "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    cut_points = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "count": len(timings),
+        "p50_ms": round(cut_points[49] * 1000, 3),
+        "p95_ms": round(cut_points[94] * 1000, 3),
+        "p99_ms": round(cut_points[98] * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+    }
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    """Parses the schema mix, given as comma separated size=weight pairs such as "small=60,typical=35,huge=5"."""
+    weights = {}
+    for pair in mix.split(","):
+        size, _, weight = pair.partition("=")
+        if size not in SCHEMA_SECTIONS:
+            message = f"Unknown schema size {size!r}, expected one of {', '.join(SCHEMA_SECTIONS)}"
+            raise argparse.ArgumentTypeError(message)
+        weights[size] = int(weight)
+    return weights
+
+
+def free_port() -> int:
+    """Returns a TCP port that is free on the local machine."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_app(*, cache: bool, server_env: list[str], server_log: str) -> Iterator[str]:
+    """Starts the app with uvicorn in a separate process, waits for it to answer GET /status, and stops it on exit.
+
+    Parameters:
+    - cache: Whether to keep the conversion cache enabled.
+    - server_env: Extra environment variables for the app, as KEY=VALUE.
+    - server_log: The file to write the output of the app to.
+
+    Yields:
+    - str: The URL of the app.
+    """
+    env = dict(os.environ)
+    if not cache:
+        env["CONVERSION_CACHE_MAX_BYTES"] = "0"
+    env.update(variable.split("=", 1) for variable in server_env)  # type: ignore[misc]
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with (
+        open(server_log, "ab") as log,
+        subprocess.Popen(  # noqa: S603
+            [sys.executable, "-m", "uvicorn", "eq_cir_converter_service.main:app", "--port", str(port)],
+            env=env,
+            stdout=log,
+            stderr=log,
+        ) as process,
+    ):
+        try:
+            wait_for_app(process, base_url, server_log)
+            yield base_url
+        finally:
+            process.terminate()
+
+
+def wait_for_app(process: subprocess.Popen, base_url: str, server_log: str) -> None:
+    """Waits up to a minute for the app to answer GET /status.
+
+    Parameters:
+    - process: The app process.
+    - base_url: The URL of the app.
+    - server_log: The file the output of the app is written to.
+
+    Raises:
+    - RuntimeError: If the app exits or does not answer in time.
+    """
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            message = f"The app exited with code {process.returncode}, see {server_log}"
+            raise RuntimeError(message)
+        try:
+            httpx.get(f"{base_url}/status", timeout=1).raise_for_status()
+        except httpx.HTTPError:
+            time.sleep(0.2)
+        else:
+            return
+    message = "The app did not start within 60 seconds"
+    raise RuntimeError(message)
+
+
+class LoadTest:
+    """Posts schemas from concurrent clients while timing GET /status."""
+
+    def __init__(self, base_url: str, schemas: dict[str, bytes], weights: dict[str, int], seed: int) -> None:
+        """Creates the load test.
+
+        Parameters:
+        - base_url: The URL of the app.
+        - schemas: The JSON of the schema of each size.
+        - weights: The relative number of requests for each size of schema.
+        - seed: The seed for picking the schemas, so the mix is reproducible.
+        """
+        self.base_url = base_url
+        self.schemas = schemas
+        self.weights = weights
+        self._random = random.Random(seed)  # noqa: S311 - reproducible mix, not security
+        self.timings: dict[str, list[float]] = {size: [] for size in weights}
+        self.status_timings: list[float] = []
+        self.errors: Counter[str] = Counter()
+
+    async def post_schemas(self, client: httpx.AsyncClient, deadline: float) -> None:
+        """Posts schemas one after another until the deadline."""
+        sizes = list(self.weights)
+        weights = list(self.weights.values())
+        while time.monotonic() < deadline:
+            size = self._random.choices(sizes, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    f"/schema?{QUERY}",
+                    content=self.schemas[size],
+                    headers={"Content-Type": "application/json"},
+                )
+            except httpx.HTTPError as exception:
+                self.errors[type(exception).__name__] += 1
+                continue
+            elapsed = time.perf_counter() - start
+            if response.is_success:
+                self.timings[size].append(elapsed)
+            else:
+                self.errors[str(response.status_code)] += 1
+
+    async def check_status(self, client: httpx.AsyncClient, deadline: float, interval: float) -> None:
+        """Calls GET /status at the interval until the deadline."""
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get("/status")
+                response.raise_for_status()
+            except httpx.HTTPError as exception:
+                self.errors[f"status {type(exception).__name__}"] += 1
+            else:
+                self.status_timings.append(time.perf_counter() - start)
+            await asyncio.sleep(interval)
+
+    async def run(self, *, concurrency: int, duration: float, status_interval: float, timeout: float) -> float:
+        """Runs the load test and returns the time it took.
+
+        Parameters:
+        - concurrency: The number of clients posting schemas at the same time.
+        - duration: How long to post schemas for, in seconds.
+        - status_interval: The time between calls to GET /status, in seconds.
+        - timeout: The timeout of each request, in seconds.
+
+        Returns:
+        - float: The time taken, in seconds, including the requests still running at the deadline.
+        """
+        limits = httpx.Limits(max_connections=concurrency)
+        start = time.perf_counter()
+        deadline = time.monotonic() + duration
+        async with (
+            httpx.AsyncClient(base_url=self.base_url, timeout=timeout, limits=limits) as client,
+            # The health check has its own connection, so it does not wait for a free connection
+            httpx.AsyncClient(base_url=self.base_url, timeout=timeout) as status_client,
+        ):
+            await asyncio.gather(
+                self.check_status(status_client, deadline, status_interval),
+                *(self.post_schemas(client, deadline) for _ in range(concurrency)),
+            )
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> dict:
+        """Returns the results of the load test.
+
+        Parameters:
+        - elapsed: The time the load test took, in seconds.
+
+        Returns:
+        - dict: The throughput, error rate and latencies.
+        """
+        succeeded = sum(len(timings) for timings in self.timings.values())
+        failed = sum(count for error, count in self.errors.items() if not error.startswith("status "))
+        requests = succeeded + failed
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 3),
+            "error_rate": round(failed / requests, 4) if requests else None,
+            "errors": dict(self.errors),
+            "schema_latency": percentiles([timing for timings in self.timings.values() for timing in timings]),
+            "schema_latency_by_size": {size: percentiles(timings) for size, timings in self.timings.items()},
+            "status_latency": percentiles(self.status_timings),
+        }
+
+
+def main() -> None:
+    """Runs the load test against the app started with uvicorn and writes the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients posting schemas at the same time")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to post schemas for")
+    parser.add_argument("--mix", type=parse_mix, default="small=60,typical=35,huge=5", help="Weight of each size")
+    parser.add_argument("--huge-sections", type=int, default=SCHEMA_SECTIONS["huge"], help="Sections in a huge schema")
+    parser.add_argument("--status-interval", type=float, default=0.25, help="Seconds between GET /status calls")
+    parser.add_argument("--timeout", type=float, default=60, help="Timeout of each request in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="Keep the conversion cache enabled")
+    parser.add_argument("--server-env", action="append", default=[], help="Environment variable for the app")
+    parser.add_argument("--server-log", default=os.devnull, help="File to write the output of the app to")
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"), default=sys.stdout)
+    args = parser.parse_args()
+
+    sections = {**SCHEMA_SECTIONS, "huge": args.huge_sections}
+    schemas = {size: json.dumps(scaled_schema(sections[size])).encode("utf-8") for size in args.mix}
+
+    with running_app(cache=args.cache, server_env=args.server_env, server_log=args.server_log) as base_url:
+        load_test = LoadTest(base_url, schemas, args.mix, args.seed)
+        elapsed = asyncio.run(
+            load_test.run(
+                concurrency=args.concurrency,
+                duration=args.duration,
+                status_interval=args.status_interval,
+                timeout=args.timeout,
+            ),
+        )
+
+    json.dump(
+        {
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "mix": args.mix,
+            "schema_bytes": {size: len(schema) for size, schema in schemas.items()},
+            "cache": args.cache,
+            "server_env": args.server_env,
+            **load_test.report(elapsed),
+        },
+        args.output,
+        indent=2,
+    )
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
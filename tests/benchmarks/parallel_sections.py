@@ -0,0 +1,120 @@
+"""Benchmark of converting a schema split by section across the worker processes against converting it in one go.
+
+For a synthetic questionnaire with many sections, it times converting and serialising the schema
+in-process, then split by section across process pools of each size, and reports the speedup of
+each pool size over the in-process conversion. The output of every split conversion is checked
+to be the same JSON bytes as the in-process conversion.
+
+The speedup is bounded by the number of cores, so pool sizes above `os.cpu_count()` are only useful
+to show where it levels off. Run with `make benchmark-parallel-sections`. The results are written as
+JSON to the `--output` file, or to stdout, where they follow the application logs.
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+
+from eq_cir_converter_service.config.logging_config import setup_logging
+from eq_cir_converter_service.services.conversion_process_pool import ConversionProcessPool
+from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.services.section_cache import section_cache
+from eq_cir_converter_service.utils.helper_utils import dump_json
+from tests.benchmarks.questionnaire import QuestionnaireConfig, generate_questionnaire
+
+CURRENT_VERSION = "9.0.0"
+TARGET_VERSION = "10.0.0"
+
+
+def convert_in_process(schema: dict) -> bytes:
+    """Converts a schema in one go, in-process, and serialises it as the endpoint does."""
+    output_schema = schema_processor.process_schema(
+        current_version=CURRENT_VERSION,
+        target_version=TARGET_VERSION,
+        input_schema=schema,
+    )
+    return dump_json(output_schema)
+
+
+def median_ms(timings: list[float]) -> float:
+    """Returns the median of the timings, in milliseconds."""
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def default_pool_sizes() -> list[int]:
+    """Returns the powers of two up to the number of cores, and the number of cores itself."""
+    cpu_count = os.cpu_count() or 1
+    pool_sizes = [2**power for power in range(cpu_count.bit_length()) if 2**power <= cpu_count]
+    return sorted({*pool_sizes, cpu_count})
+
+
+def main() -> None:
+    """Runs the benchmark and writes the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sections", type=int, default=64)
+    parser.add_argument("--blocks", type=int, default=25, help="Question blocks in each section")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=default_pool_sizes())
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"), default=sys.stdout)
+    args = parser.parse_args()
+
+    # Log as the application does, so both modes pay the same logging cost
+    setup_logging()
+    # Each repeat converts every section, as a schema posted for the first time is
+    section_cache.max_bytes = 0
+
+    schema = generate_questionnaire(QuestionnaireConfig(sections=args.sections, blocks=args.blocks))
+    in_process = []
+    for _ in range(args.repeat):
+        input_schema = copy.deepcopy(schema)
+        start = time.perf_counter()
+        expected_json = convert_in_process(input_schema)
+        in_process.append(time.perf_counter() - start)
+
+    results = []
+    for pool_size in args.pool_sizes:
+        pool = ConversionProcessPool(pool_size=pool_size, threshold_bytes=0, parallel_min_sections=1)
+        pool.start()
+        timings = []
+        try:
+            for _ in range(args.repeat):
+                input_schema = copy.deepcopy(schema)
+                start = time.perf_counter()
+                output_json = pool.process_schema_by_section(
+                    current_version=CURRENT_VERSION,
+                    target_version=TARGET_VERSION,
+                    schema=input_schema,
+                )
+                timings.append(time.perf_counter() - start)
+                if output_json != expected_json:
+                    message = f"The schema split by section across {pool_size} processes converted differently"
+                    raise AssertionError(message)
+        finally:
+            pool.shutdown()
+        results.append(
+            {
+                "pool_size": pool_size,
+                "split_ms": median_ms(timings),
+                "speedup": round(statistics.median(in_process) / statistics.median(timings), 2),
+            },
+        )
+
+    json.dump(
+        {
+            "cpu_count": os.cpu_count(),
+            "sections": args.sections,
+            "schema_bytes": len(dump_json(schema)),
+            "in_process_ms": median_ms(in_process),
+            "results": results,
+        },
+        args.output,
+        indent=2,
+    )
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
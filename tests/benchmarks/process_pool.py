@@ -0,0 +1,112 @@
+"""Benchmark of converting schemas in-process against converting them in the process pool.
+
+For each schema size it times the conversion of a batch of schemas, run concurrently on the
+conversion worker threads, first in-process and then handed to the worker processes as JSON bytes.
+The crossover is the smallest size at which the process pool is faster, which is a starting
+point for `CONVERSION_PROCESS_THRESHOLD_BYTES` on the machine the benchmark runs on.
+
+Run with `make benchmark-process-pool`. The results are written as JSON to the `--output` file,
+or to stdout, where they follow the application logs.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.responses import JSONResponse
+
+from eq_cir_converter_service.config.logging_config import setup_logging
+from eq_cir_converter_service.services.conversion_process_pool import ConversionProcessPool
+from eq_cir_converter_service.services.schema import schema_processor
+from tests.benchmarks.schemas import scaled_schema
+
+CURRENT_VERSION = "9.0.0"
+TARGET_VERSION = "10.0.0"
+
+
+def convert_in_process(schema_json: bytes) -> bytes:
+    """Converts a schema the way the endpoint does below the threshold: parse, convert and render the response."""
+    output_schema = schema_processor.process_schema(
+        current_version=CURRENT_VERSION,
+        target_version=TARGET_VERSION,
+        input_schema=json.loads(schema_json),
+    )
+    return JSONResponse(output_schema).body
+
+
+def time_batch(convert: Callable[[bytes], object], schema_json: bytes, concurrency: int) -> float:
+    """Returns the wall-clock time taken to convert `concurrency` copies of the schema at the same time."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(convert, [schema_json] * concurrency))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Runs the benchmark and writes the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sections", type=int, nargs="+", default=[1, 5, 20, 80, 320])
+    parser.add_argument("--pool-size", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"), default=sys.stdout)
+    args = parser.parse_args()
+
+    # Log as the application does, so both modes pay the same logging cost
+    setup_logging()
+
+    pool = ConversionProcessPool(pool_size=args.pool_size, threshold_bytes=0)
+    pool.start()
+
+    def convert_in_worker_process(schema_json: bytes) -> bytes:
+        """Converts a schema the way the endpoint does above the threshold.
+
+        FastAPI still parses the request body to validate it before the raw body is handed over.
+        """
+        json.loads(schema_json)
+        return pool.process_schema_json(
+            current_version=CURRENT_VERSION,
+            target_version=TARGET_VERSION,
+            schema_json=schema_json,
+        )
+
+    results = []
+    try:
+        for section_count in args.sections:
+            schema_json = json.dumps(scaled_schema(section_count)).encode("utf-8")
+            in_process = [time_batch(convert_in_process, schema_json, args.pool_size) for _ in range(args.repeat)]
+            process_pool = [
+                time_batch(convert_in_worker_process, schema_json, args.pool_size) for _ in range(args.repeat)
+            ]
+            results.append(
+                {
+                    "sections": section_count,
+                    "schema_bytes": len(schema_json),
+                    "in_process_ms": round(statistics.median(in_process) * 1000, 3),
+                    "process_pool_ms": round(statistics.median(process_pool) * 1000, 3),
+                },
+            )
+    finally:
+        pool.shutdown()
+
+    # The crossover is where the process pool becomes faster and stays faster for every larger schema
+    crossover = None
+    for result in reversed(results):
+        if result["process_pool_ms"] >= result["in_process_ms"]:
+            break
+        crossover = result["schema_bytes"]
+
+    json.dump(
+        {"pool_size": args.pool_size, "concurrency": args.pool_size, "crossover_bytes": crossover, "results": results},
+        args.output,
+        indent=2,
+    )
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Synthetic questionnaires for the converter benchmarks, with a configurable size and amount of HTML.
+
+The questionnaire is built from the fields the v10 JSONPath expressions match, so every text field
+is converted: section, block and question titles, question descriptions, answer labels and
+descriptions, option labels and descriptions, and guidance text objects with placeholders. The
+same configuration and seed always give the same questionnaire.
+"""
+
+import random
+from typing import NamedTuple
+
+WORDS = ("please", "tell", "us", "about", "your", "business", "turnover", "employees", "exports", "stock", "changes")
+
+
+class QuestionnaireConfig(NamedTuple):
+    """The size and content of a synthetic questionnaire.
+
+    Attributes:
+    - sections: The number of sections.
+    - blocks: The number of question blocks in each section.
+    - answers: The number of answers to each question.
+    - options: The number of options of each answer.
+    - placeholders: The number of placeholders in the guidance text of each question.
+    - html_density: The fraction, from 0 to 1, of text fields that contain HTML.
+    - seed: The seed for the random text, so the questionnaire is reproducible.
+    """
+
+    sections: int = 4
+    blocks: int = 10
+    answers: int = 2
+    options: int = 4
+    placeholders: int = 2
+    html_density: float = 0.5
+    seed: int = 0
+
+
+class QuestionnaireGenerator:
+    """Builds the fields of a synthetic questionnaire."""
+
+    def __init__(self, config: QuestionnaireConfig) -> None:
+        """Creates a generator for the configuration.
+
+        Parameters:
+        - config: The size and content of the questionnaire.
+        """
+        self.config = config
+        self._random = random.Random(config.seed)  # noqa: S311 - reproducible text, not security
+
+    def words(self, count: int) -> str:
+        """Returns a sentence of random words."""
+        return " ".join(self._random.choice(WORDS) for _ in range(count)).capitalize()
+
+    def text(self, *, paragraphs: int = 1) -> str:
+        """Returns a text field, marked up with HTML for the configured fraction of fields.
+
+        Parameters:
+        - paragraphs: The number of paragraphs in a field with HTML.
+
+        Returns:
+        - str: The text.
+        """
+        if self._random.random() >= self.config.html_density:
+            return self.words(8)
+        if paragraphs == 1:
+            return f"<b>{self.words(3)}</b> {self.words(6)}<br>"
+        return "".join(f"<p>{self.words(4)} <b>{self.words(2)}</b></p>" for _ in range(paragraphs))
+
+    def placeholder_text(self, question_id: str) -> dict:
+        """Returns a guidance text object with the configured number of placeholders, over several paragraphs."""
+        names = [f"{question_id}_value_{index}" for index in range(self.config.placeholders)]
+        paragraphs = [f"<p>{self.words(5)} {{{name}}} <b>{self.words(2)}</b></p>" for name in names]
+        paragraphs.append(f"<p>{self.words(6)}</p>")
+        return {
+            "text": "".join(paragraphs),
+            "placeholders": [
+                {"placeholder": name, "value": {"source": "answers", "identifier": f"{name}_answer"}} for name in names
+            ],
+        }
+
+    def answer(self, answer_id: str) -> dict:
+        """Returns a radio answer with the configured number of options."""
+        return {
+            "id": answer_id,
+            "type": "Radio",
+            "mandatory": True,
+            "label": self.text(),
+            "description": self.text(),
+            "options": [
+                {"label": self.text(), "value": f"{answer_id}-{index}", "description": self.text()}
+                for index in range(self.config.options)
+            ],
+        }
+
+    def block(self, block_id: str) -> dict:
+        """Returns a question block with the configured number of answers."""
+        question_id = f"question-{block_id}"
+        return {
+            "id": block_id,
+            "type": "Question",
+            "page_title": self.words(4),
+            "question": {
+                "id": question_id,
+                "type": "General",
+                "title": self.text(),
+                "description": [self.text(), self.text(paragraphs=3)],
+                "guidance": {
+                    "contents": [
+                        {"title": self.text(), "description": self.placeholder_text(question_id.replace("-", "_"))},
+                    ],
+                },
+                "answers": [self.answer(f"answer-{block_id}-{index}") for index in range(self.config.answers)],
+            },
+        }
+
+    def section(self, section_id: str) -> dict:
+        """Returns a section with one group of the configured number of blocks."""
+        return {
+            "id": section_id,
+            "title": self.text(),
+            "groups": [
+                {
+                    "id": f"group-{section_id}",
+                    "title": self.text(),
+                    "blocks": [self.block(f"block-{section_id}-{index}") for index in range(self.config.blocks)],
+                },
+            ],
+        }
+
+    def questionnaire(self) -> dict:
+        """Returns the questionnaire."""
+        return {
+            "mime_type": "application/json/ons/eq",
+            "language": "en",
+            "schema_version": "0.0.1",
+            "data_version": "0.0.3",
+            "survey_id": "999",
+            "form_type": "0001",
+            "title": self.text(),
+            "sections": [self.section(f"section-{index}") for index in range(self.config.sections)],
+            "submission": {"button": self.words(2), "title": self.text(), "guidance": self.text(paragraphs=2)},
+        }
+
+
+def generate_questionnaire(config: QuestionnaireConfig) -> dict:
+    """Returns a synthetic questionnaire of the configured size and amount of HTML.
+
+    Parameters:
+    - config: The size and content of the questionnaire.
+
+    Returns:
+    - dict: The questionnaire.
+    """
+    return QuestionnaireGenerator(config).questionnaire()
@@ -0,0 +1,70 @@
+"""Benchmark of POST /schema against POST /schema/raw.
+
+For each schema size it times requests to both endpoints through the ASGI app, with the conversion
+cache disabled, and reports the median time per request and the difference between them.
+
+Run with `make benchmark-raw-body`. The results are written as JSON to the `--output` file, or to stdout.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from eq_cir_converter_service.main import app
+from eq_cir_converter_service.services.conversion_cache import conversion_cache
+from tests.benchmarks.schemas import scaled_schema
+
+QUERY = "current_version=9.0.0&target_version=10.0.0"
+
+
+def time_request(client: TestClient, endpoint: str, schema_json: bytes) -> float:
+    """Returns the time taken to post the schema to the endpoint."""
+    start = time.perf_counter()
+    response = client.post(f"{endpoint}?{QUERY}", content=schema_json, headers={"Content-Type": "application/json"})
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    return elapsed
+
+
+def main() -> None:
+    """Runs the benchmark and writes the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sections", type=int, nargs="+", default=[1, 20, 80, 320])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"), default=sys.stdout)
+    args = parser.parse_args()
+
+    # Every request is converted, so the endpoints are compared on the full request
+    conversion_cache.max_bytes = 0
+    client = TestClient(app)
+
+    results = []
+    for section_count in args.sections:
+        schema_json = json.dumps(scaled_schema(section_count)).encode("utf-8")
+        timings: dict[str, list[float]] = {"/schema": [], "/schema/raw": []}
+        for _ in range(args.repeat):
+            for endpoint, endpoint_timings in timings.items():
+                endpoint_timings.append(time_request(client, endpoint, schema_json))
+
+        schema_ms = statistics.median(timings["/schema"]) * 1000
+        raw_ms = statistics.median(timings["/schema/raw"]) * 1000
+        results.append(
+            {
+                "sections": section_count,
+                "schema_bytes": len(schema_json),
+                "schema_ms": round(schema_ms, 3),
+                "raw_ms": round(raw_ms, 3),
+                "saved_ms": round(schema_ms - raw_ms, 3),
+            },
+        )
+
+    json.dump({"repeat": args.repeat, "results": results}, args.output, indent=2)
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
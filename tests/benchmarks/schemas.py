@@ -0,0 +1,27 @@
+"""Schemas of different sizes for the benchmarks, built from the integration test schema."""
+
+import copy
+import json
+
+INPUT_SCHEMA_PATH = "tests/integration/v10_conversion/input_schema.json"
+
+
+def scaled_schema(section_count: int) -> dict:
+    """Returns the integration test schema with its section repeated to the given number of sections.
+
+    Parameters:
+    - section_count: The number of sections in the schema.
+
+    Returns:
+    - dict: The schema.
+    """
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        schema = json.load(f)
+
+    section = schema["sections"][0]
+    schema["sections"] = []
+    for index in range(section_count):
+        repeated_section = copy.deepcopy(section)
+        repeated_section["id"] = f"{section['id']}-{index}"
+        schema["sections"].append(repeated_section)
+    return schema
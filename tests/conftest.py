@@ -1,11 +1,67 @@
 """Configuration for unit tests."""
 
 from collections.abc import Generator
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 
 import eq_cir_converter_service.main as app
+from eq_cir_converter_service.services import metrics
+from eq_cir_converter_service.services.conversion_cache import conversion_cache
+from eq_cir_converter_service.services.schema.schema_processor import V10_COMPILED_PATHS
+from eq_cir_converter_service.services.section_cache import section_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_conversion_cache() -> Generator[None, None, None]:
+    """Starts each test with an empty conversion cache, so a schema posted by another test is converted again."""
+    conversion_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def empty_section_cache() -> Generator[None, None, None]:
+    """Starts each test with an empty section cache, so the sections posted by another test are converted again."""
+    section_cache.clear()
+    yield
+
+
+@pytest.fixture
+def conversion_cache_enabled() -> Generator[None, None, None]:
+    """Enables the conversion cache, which is disabled by default, for the test."""
+    with patch.object(conversion_cache, "max_bytes", 1024 * 1024):
+        yield
+
+
+@pytest.fixture
+def section_cache_enabled() -> Generator[None, None, None]:
+    """Enables the section cache, which is disabled by default, for the test."""
+    with patch.object(section_cache, "max_bytes", 1024 * 1024):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def empty_match_locations() -> Generator[None, None, None]:
+    """Starts each test with no cached match locations, so the v10 paths walk every schema matched by another test."""
+    if V10_COMPILED_PATHS.match_locations is not None:
+        V10_COMPILED_PATHS.match_locations.clear()
+    yield
+
+
+@pytest.fixture
+def match_location_cache_enabled() -> Generator[None, None, None]:
+    """Enables the cache of v10 match locations, which is disabled by default, for the test."""
+    assert V10_COMPILED_PATHS.match_locations is not None
+    with patch.object(V10_COMPILED_PATHS.match_locations, "max_entries", 64):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def empty_metrics() -> Generator[None, None, None]:
+    """Starts each test with no recorded metrics, so the metrics of another test are not counted."""
+    metrics.clear()
+    yield
 
 
 @pytest.fixture
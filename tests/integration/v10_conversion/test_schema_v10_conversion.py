@@ -2,14 +2,16 @@
 
 import json
 
+import pytest
 from fastapi.testclient import TestClient
 
 DEFAULT_CURRENT_VERSION = "9.0.0"
 DEFAULT_TARGET_VERSION = "10.0.0"
 
 
-def test_schema_transformation_matches_expected_output(test_client: TestClient):
-    """Test that the schema transformation endpoint returns the expected output."""
+@pytest.mark.parametrize("endpoint", ["/schema", "/schema/raw", "/schema/stream"])
+def test_schema_transformation_matches_expected_output(test_client: TestClient, endpoint: str):
+    """Test that the schema transformation endpoints return the expected output."""
     # Define the input and output file paths
     input_file_path = "tests/integration/v10_conversion/input_schema.json"
     output_file_path = "tests/integration/v10_conversion/output_schema.json"
@@ -24,7 +26,7 @@ def test_schema_transformation_matches_expected_output(test_client: TestClient):
 
     # Make POST request to the transformation endpoint
     response = test_client.post(
-        f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+        f"{endpoint}?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
         json=input_schema,
     )
 
@@ -0,0 +1,53 @@
+"""Applies JSON Patch (RFC 6902) operations, to check a patch made by the service reproduces its target."""
+
+from typing import cast
+
+from eq_cir_converter_service.utils.json_patch import Operation
+
+
+def unescape_pointer_token(token: str) -> str:
+    """Reverses the escaping of a JSON pointer token."""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def apply_patch(document: object, operations: list[Operation]) -> object:
+    """Applies the add, remove and replace operations of a JSON Patch to a document, changing it in place.
+
+    Only the operations made by `make_patch` are supported.
+
+    Parameters:
+    - document: The document to change.
+    - operations: The operations, applied in order.
+
+    Returns:
+    - object: The changed document, which is a new value if the whole document was replaced.
+
+    Raises:
+    - ValueError: If an operation is not supported.
+    """
+    for operation in operations:
+        op, path = operation["op"], str(operation["path"])
+        if path == "":
+            if op != "replace":
+                message = f"Unsupported JSON Patch operation on the whole document: {op}"
+                raise ValueError(message)
+            document = operation["value"]
+            continue
+
+        *parent_tokens, last_token = (unescape_pointer_token(token) for token in path.split("/")[1:])
+        parent = document
+        for token in parent_tokens:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]  # type: ignore[index]
+        container = cast(dict | list, parent)
+        key: str | int = int(last_token) if isinstance(container, list) else last_token
+
+        if op == "add" and isinstance(container, list):
+            container.insert(int(key), operation["value"])
+        elif op in {"add", "replace"}:
+            container[key] = operation["value"]  # type: ignore[index]
+        elif op == "remove":
+            del container[key]  # type: ignore[arg-type]
+        else:
+            message = f"Unsupported JSON Patch operation: {op}"
+            raise ValueError(message)
+    return document
@@ -0,0 +1,61 @@
+"""Tests for the logging configuration."""
+
+import json
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+
+from eq_cir_converter_service.config.logging_config import setup_logging
+from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.utils.log_utils import SchemaSummary
+
+INPUT_SCHEMA_PATH = "tests/integration/v10_conversion/input_schema.json"
+
+
+@pytest.fixture(name="input_schema")
+def fixture_input_schema() -> dict:
+    """The integration test input schema."""
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def restore_logging(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    """Sets up logging at the default level again after the test."""
+    yield
+    monkeypatch.delenv("LOG_LEVEL", raising=False)
+    setup_logging()
+
+
+@pytest.mark.usefixtures("restore_logging")
+def test_schema_is_not_serialised_at_info_level(monkeypatch, caplog, input_schema):
+    """Test that the debug log calls do not serialise or summarise the schema when logging at INFO."""
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    setup_logging()
+
+    with (
+        patch.object(SchemaSummary, "__structlog__") as mock_structlog,
+        patch.object(SchemaSummary, "__repr__") as mock_repr,
+        caplog.at_level("DEBUG"),
+    ):
+        schema_processor.process_schema(current_version="9.0.0", target_version="10.0.0", input_schema=input_schema)
+
+    mock_structlog.assert_not_called()
+    mock_repr.assert_not_called()
+    assert "Schema converted successfully" in caplog.text
+    assert "Input schema:" not in caplog.text
+
+
+@pytest.mark.usefixtures("restore_logging")
+def test_schema_is_summarised_at_debug_level(monkeypatch, caplog, input_schema):
+    """Test that the debug log calls log a summary of the schema when logging at DEBUG."""
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    setup_logging()
+
+    with caplog.at_level("DEBUG"):
+        schema_processor.process_schema(current_version="9.0.0", target_version="10.0.1", input_schema=input_schema)
+
+    assert "Input schema:" in caplog.text
+    assert "sections=1 blocks=" in caplog.text
+    assert input_schema["title"] not in caplog.text
@@ -0,0 +1,23 @@
+"""Tests for the application settings."""
+
+import pytest
+
+from eq_cir_converter_service.config.settings import get_int_env
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, 4),
+        ("", 4),
+        ("8", 8),
+    ],
+)
+def test_get_int_env(monkeypatch, value, expected):
+    """Test that an integer environment variable is read, falling back to the default when unset."""
+    if value is None:
+        monkeypatch.delenv("TEST_SETTING", raising=False)
+    else:
+        monkeypatch.setenv("TEST_SETTING", value)
+
+    assert get_int_env("TEST_SETTING", 4) == expected
@@ -0,0 +1,35 @@
+"""Tests for the compiled JSONPath expressions."""
+
+from unittest.mock import patch
+
+from eq_cir_converter_service.converters.compiled_paths import CompiledPaths, compile_paths
+from eq_cir_converter_service.converters.v10 import convert_to_v10
+
+
+def test_compile_paths_parses_each_path():
+    """Test that every path is parsed, in order, and the compile time is recorded."""
+    compiled = compile_paths(("$.title", "$..question.title"))
+
+    assert isinstance(compiled, CompiledPaths)
+    assert compiled.paths == ("$.title", "$..question.title")
+    assert [str(expression) for expression in compiled.expressions] == ["$.title", "$..question.title"]
+    assert compiled.compile_seconds >= 0
+    assert len(compiled.path_compile_seconds) == 2
+    assert sum(compiled.path_compile_seconds) <= compiled.compile_seconds
+
+
+def test_compile_paths_is_cached_by_path_list():
+    """Test that the same path list is only compiled once."""
+    assert compile_paths(("$.legal_basis",)) is compile_paths(("$.legal_basis",))
+    assert compile_paths(("$.legal_basis",)) is not compile_paths(("$.title",))
+
+
+def test_convert_to_v10_with_compiled_paths_does_not_parse():
+    """Test that converting with compiled paths does not parse any JSONPath expressions."""
+    compiled = compile_paths(("$.title",))
+
+    with patch("eq_cir_converter_service.converters.compiled_paths.parse") as mock_parse:
+        result = convert_to_v10({"title": "<p>Survey</p>"}, compiled)
+
+    mock_parse.assert_not_called()
+    assert result == {"title": "Survey"}
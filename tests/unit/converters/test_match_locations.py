@@ -0,0 +1,147 @@
+"""Tests for the cache of match locations by schema shape."""
+
+import copy
+import json
+from unittest.mock import patch
+
+import pytest
+from jsonpath_ng.ext import parse
+
+from eq_cir_converter_service.converters.compiled_paths import compile_paths
+from eq_cir_converter_service.converters.match_locations import (
+    MatchLocationCache,
+    MatchLocationStats,
+    schema_shape,
+)
+from eq_cir_converter_service.converters.path_matcher import PathMatcher
+from eq_cir_converter_service.converters.v10 import convert_to_v10
+from eq_cir_converter_service.services.schema.paths import PATHS
+
+INPUT_SCHEMA_PATH = "tests/integration/v10_conversion/input_schema.json"
+OUTPUT_SCHEMA_PATH = "tests/integration/v10_conversion/output_schema.json"
+
+
+def make_cache(paths: tuple[str, ...], max_entries: int = 4) -> MatchLocationCache:
+    """Returns an empty cache for a matcher of the paths."""
+    return MatchLocationCache(PathMatcher(tuple(parse(path) for path in paths)), max_entries=max_entries)
+
+
+def test_shape_ignores_text_but_not_structure():
+    """Test that schemas with the same structure and different text have the same shape."""
+    schema = {"title": "Survey", "sections": [{"id": "s1", "blocks": [1, None]}]}
+
+    assert (
+        schema_shape(schema)[0] == schema_shape({"title": "Other", "sections": [{"id": "x", "blocks": [7, None]}]})[0]
+    )
+    assert schema_shape(schema)[1] == [
+        schema,
+        schema["sections"],
+        schema["sections"][0],
+        schema["sections"][0]["blocks"],
+    ]
+    for other in (
+        {"sections": [{"id": "s1", "blocks": [1, None]}], "title": "Survey"},
+        {"title": "Survey", "sections": [{"id": "s1", "blocks": [1]}]},
+        {"title": "", "sections": [{"id": "s1", "blocks": [1, None]}]},
+        {"title": "Survey", "sections": [{"id": "s1", "blocks": ["1", None]}]},
+        {"title": "Survey", "sections": [{"id": "s1", "blocks": [[1], None]}]},
+    ):
+        assert schema_shape(schema)[0] != schema_shape(other)[0], other
+
+
+def test_cached_matches_are_the_nodes_of_the_new_schema():
+    """Test that a schema with a known shape gets the matches the matcher finds in it, without matching."""
+    cache = make_cache(("$.title", "$..description[*]", "$.sections[*].title"))
+    first = {"title": "A", "sections": [{"title": "B", "description": ["C", "D"]}]}
+    second = {"title": "E", "sections": [{"title": "F", "description": ["G", "H"]}]}
+    cache.find(first)
+
+    with patch.object(PathMatcher, "find", autospec=True) as mock_find:
+        matches = cache.find(second)
+
+    mock_find.assert_not_called()
+    expected = cache.matcher.find(second)
+    assert [(match.path_index, match.key, match.order) for match in matches] == [
+        (match.path_index, match.key, match.order) for match in expected
+    ]
+    assert all(match.context is match_expected.context for match, match_expected in zip(matches, expected, strict=True))
+    assert cache.stats() == MatchLocationStats(
+        hits=1,
+        misses=1,
+        hit_rate=0.5,
+        evictions=0,
+        uncacheable=0,
+        entries=1,
+        max_entries=4,
+    )
+
+
+@pytest.mark.usefixtures("match_location_cache_enabled")
+def test_conversion_from_cached_locations_matches_expected_output():
+    """Test that the v10 conversion of a schema with a known shape, and different text, is unchanged."""
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        input_schema = json.load(f)
+    with open(OUTPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        expected_output = json.load(f)
+    compiled = compile_paths(tuple(PATHS))
+    assert compiled.match_locations is not None
+
+    convert_to_v10(copy.deepcopy(input_schema), compiled)
+    output = convert_to_v10(copy.deepcopy(input_schema), compiled)
+
+    assert output == expected_output
+    assert compiled.match_locations.stats().hits == 1
+
+
+def test_cache_evicts_least_recently_used_shape():
+    """Test that the cache keeps to its size by evicting the least recently used shape."""
+    cache = make_cache(("$..title",), max_entries=2)
+
+    for schema in ({"title": "a"}, {"title": "a", "b": 1}, {"title": "a"}, {"c": {"title": "a"}}, {"title": "b"}):
+        cache.find(schema)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (2, 3, 1, 2)
+
+
+def test_cache_does_not_keep_matches_outside_the_schema():
+    """Test that matches in a repeated container, or in a value wrapped as a list, are not cached."""
+    repeated = {"title": "a"}
+    cache = make_cache(("$..title", "$.id[*]"))
+
+    cache.find({"first": repeated, "second": repeated})
+    cache.find({"id": "wrapped"})
+
+    stats = cache.stats()
+    assert (stats.misses, stats.uncacheable, stats.entries) == (2, 2, 0)
+
+
+def test_cache_disabled_with_size_zero():
+    """Test that a cache with a size of 0 matches every schema and keeps nothing."""
+    cache = make_cache(("$.title",), max_entries=0)
+
+    with patch.object(PathMatcher, "find", autospec=True, return_value=[]) as mock_find:
+        cache.find({"title": "a"})
+        cache.find({"title": "a"})
+
+    assert mock_find.call_count == 2
+    assert cache.stats().entries == 0
+
+
+def test_cache_clear_removes_shapes_and_counters():
+    """Test that clearing the cache removes its shapes and resets its counters."""
+    cache = make_cache(("$.title",))
+    cache.find({"title": "a"})
+    cache.find({"title": "b"})
+
+    cache.clear()
+
+    assert cache.stats() == MatchLocationStats(
+        hits=0,
+        misses=0,
+        hit_rate=0.0,
+        evictions=0,
+        uncacheable=0,
+        entries=0,
+        max_entries=4,
+    )
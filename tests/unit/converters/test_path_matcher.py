@@ -0,0 +1,216 @@
+"""Tests for the single-pass JSONPath matcher."""
+
+import copy
+import dataclasses
+import json
+from unittest.mock import patch
+
+import pytest
+from jsonpath_ng.ext import parse
+
+from eq_cir_converter_service.converters.compiled_paths import compile_paths
+from eq_cir_converter_service.converters.path_matcher import PathMatcher, UnsupportedPathError, _Walk
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.converters.v10 import convert_to_v10
+from eq_cir_converter_service.services.schema.paths import PATHS
+
+INPUT_SCHEMA_PATH = "tests/integration/v10_conversion/input_schema.json"
+OUTPUT_SCHEMA_PATH = "tests/integration/v10_conversion/output_schema.json"
+
+
+def convert_with_both_engines(schema: dict, paths: list[str]) -> tuple[object, object]:
+    """Converts a copy of the schema with the single-pass matcher and with jsonpath-ng."""
+    compiled = compile_paths(tuple(paths))
+    assert compiled.matcher is not None
+    jsonpath_only = dataclasses.replace(compiled, matcher=None)
+
+    results = []
+    for compiled_paths in (compiled, jsonpath_only):
+        try:
+            results.append(convert_to_v10(copy.deepcopy(schema), compiled_paths))
+        except TypeError as exc:
+            results.append(type(exc))
+    return results[0], results[1]
+
+
+def count_values(value: object) -> int:
+    """Counts the dictionaries, lists and scalars in a value."""
+    if isinstance(value, dict):
+        return 1 + sum(count_values(child) for child in value.values())
+    if isinstance(value, list):
+        return 1 + sum(count_values(child) for child in value)
+    return 1
+
+
+def test_single_pass_matches_jsonpath_on_integration_schema():
+    """Test that the single-pass matcher gives the same output as jsonpath-ng for the v10 paths."""
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        input_schema = json.load(f)
+    with open(OUTPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        expected_output = json.load(f)
+
+    single_pass_output, jsonpath_output = convert_with_both_engines(input_schema, PATHS)
+
+    assert single_pass_output == jsonpath_output
+    assert single_pass_output == expected_output
+
+
+def test_single_pass_visits_each_value_at_most_once():
+    """Test that the matcher walks the schema once, whatever the number of paths."""
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        input_schema = json.load(f)
+    matcher = compile_paths(tuple(PATHS)).matcher
+    assert matcher is not None
+
+    with patch.object(_Walk, "visit", autospec=True, side_effect=_Walk.visit) as mock_visit:
+        matcher.find(input_schema)
+
+    assert mock_visit.call_count <= count_values(input_schema)
+
+
+def test_find_returns_matches_in_jsonpath_order():
+    """Test that nested matches for a `..` path are ordered by anchor, as jsonpath-ng orders them."""
+    data = {"a": [{"b": "1", "x": {"a": [{"b": "2"}]}}, {"b": "3"}]}
+    path = "$..a[*].b"
+    matcher = PathMatcher((parse(path),))
+
+    matched_values = [match.context[match.key] for match in matcher.find(data)]  # type: ignore[index]
+    jsonpath_values = [match.value for match in parse(path).find(data)]
+
+    assert matched_values == jsonpath_values == ["1", "3", "2"]
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "$.a[0]",
+        "$.a,b",
+        "$..a..b",
+        "$.a..b",
+        "@.a",
+        "$.a[1:]",
+        "a.$",
+        "$.a.($..b)",
+    ],
+)
+def test_unsupported_paths_are_rejected(path):
+    """Test that paths outside the supported subset are rejected."""
+    with pytest.raises(UnsupportedPathError):
+        PathMatcher((parse(path),))
+
+
+def test_unsupported_paths_fall_back_to_jsonpath():
+    """Test that a path list with an unsupported path is converted with jsonpath-ng."""
+    compiled = compile_paths(("$.title", "$.items[0]"))
+
+    assert compiled.matcher is None
+    assert convert_to_v10({"title": "<b>A</b>", "items": ["<p>x</p>", "<p>y</p>"]}, compiled) == {
+        "title": "<strong>A</strong>",
+        "items": ["x", "<p>y</p>"],
+    }
+
+
+@pytest.mark.parametrize(
+    "schema, paths",
+    [
+        # Splicing a list shifts the later items, which are then matched by their original index
+        ({"d": ["<p>a</p><p>b</p>", "<p>c</p><p>d</p>"]}, ["d[*]"]),
+        # `[*]` treats a dictionary, string or number as a single item list
+        ({"q": {"description": {"text": "<b>x</b>"}}}, ["$..q.description[*]"]),
+        ({"q": {"description": "<p>x</p><p>y</p>"}}, ["$..q.description[*]"]),
+        ({"q": {"answers": {"label": "<b>x</b>"}}}, ["$..answers[*].label"]),
+        ({"q": {"answers": 5}}, ["$..answers[*]"]),
+        ({"q": {"answers": 1.5}}, ["$..answers[*].label"]),
+        ({"items": [1.5]}, ["items[*][*]"]),
+        ({"q": {"answers": {}}, "r": {"answers": 0}}, ["$..answers[*]"]),
+        # `*` only matches the values of a dictionary
+        ({"m": {"a": "<b>x</b>", "b": ["<p>a</p><p>b</p>"]}, "n": ["<b>x</b>"]}, ["$.m.*", "$.n.*"]),
+        # An earlier path replaces a dictionary that holds a later path's match
+        ({"page_title": {"summary": {"item_label": [{"text": {"text": "<p>one</p>"}}]}}}, PATHS),
+        ({"title": {"page_title": {"groups": {"description": [{"label": "<p><p>q</p>"}]}}}}, PATHS),
+        ({"messages": {"instruction": [{"title": [{"page_title": [None], "questions": "<p>one</p>"}]}]}}, PATHS),
+        # An earlier path splices a list that a later path matches by index
+        ({"a": ["<p>x</p><p>y</p>", "<b>z</b>"]}, ["$.a[*]", "$..a[*]"]),
+        ({"a": ["<p>x</p><p>y</p>", "<b>z</b>"]}, ["$.a[*]", "$..[*]"]),
+        # An earlier path replaces a value inside which a later `..` path matches
+        ({"a": {"b": {"c": "<p>x</p><p>y</p>"}}}, ["$.a", "$..b.c"]),
+        ({"a": {"b": {"c": "<p>x</p><p>y</p>"}}}, ["$.a", "$..*"]),
+        ({"a": {"b": "<p>x</p><p>y</p>"}}, ["$.a", "$..[*]"]),
+        ({"a": {"b": {"c": "<p>x</p><p>y</p>"}}}, ["$.a", "$.a.b.c"]),
+        ({"a": {"b": {"c": "<p>x</p><p>y</p>"}}, "x": [{"c": "<b>y</b>"}]}, ["$.a", "$..c"]),
+        ({"a": [["<p>x</p>"], "<b>y</b>"]}, ["$.a", "$..z"]),
+    ],
+)
+def test_single_pass_matches_jsonpath(schema, paths):
+    """Test that the single-pass matcher gives the same output as jsonpath-ng in awkward cases."""
+    single_pass_output, jsonpath_output = convert_with_both_engines(schema, paths)
+
+    assert single_pass_output == jsonpath_output
+
+
+@pytest.mark.parametrize(
+    "schema, expected_walks",
+    [
+        # Splitting strings into paragraphs changes nothing a later path can match
+        ({"sections": [{"title": "<p>a</p><p>b</p>", "question": {"description": ["<p>c</p><p>d</p>"]}}]}, 1),
+        # `$.title` rebuilds a dictionary holding a `..page_title` match
+        ({"title": {"page_title": {"text": "<p>a</p>"}}}, 2),
+    ],
+)
+def test_apply_walks_again_only_after_a_change_later_paths_depend_on(schema, expected_walks):
+    """Test that the schema is only walked again when processing a match changes what later paths match."""
+    with patch.object(PathMatcher, "find", autospec=True, side_effect=PathMatcher.find) as mock_find:
+        convert_to_v10(schema, compile_paths(tuple(PATHS)))
+
+    assert mock_find.call_count == expected_walks
+
+
+@pytest.mark.parametrize(
+    "paths, expected",
+    [
+        (PATHS, True),
+        (["$.sections[*].title", "$..blocks[*]", "$.title", "$.*.title"], True),
+        (["$.sections"], False),
+        (["$.sections[*]"], False),
+        (["$..sections"], False),
+        (["$..sections[*]"], False),
+        (["$.*"], False),
+        (["$..*"], False),
+        (["$..[*]"], False),
+    ],
+)
+def test_matches_within_items(paths, expected):
+    """Test that a list is only converted item by item when no path matches the list or an item as a whole."""
+    matcher = PathMatcher(tuple(parse(path) for path in paths))
+
+    assert matcher.matches_within_items("sections") is expected
+
+
+def test_apply_records_path_timings():
+    """Test that the first walk is timed on its own and a walk again is timed against the path that caused it."""
+    compiled = compile_paths(("$.title", "$..page_title"))
+    schema = {"title": {"page_title": {"text": "<p>a</p>"}}}
+    timings = PathTimings(2)
+
+    result = convert_to_v10(copy.deepcopy(schema), compiled, timings)
+
+    assert result == convert_to_v10(schema, compiled)
+    assert timings.matches == [1, 1]
+    assert timings.walk_seconds > 0
+    assert timings.find_seconds[0] > 0
+    assert timings.find_seconds[1] == 0
+
+
+def test_apply_without_matcher_records_path_timings():
+    """Test that each expression is timed separately when the expressions are evaluated one at a time."""
+    compiled = dataclasses.replace(compile_paths(("$.title", "$..description[*]")), matcher=None)
+    schema = {"title": "<p>Survey</p>", "question": {"description": ["<p>a</p><p>b</p>"]}}
+    timings = PathTimings(2)
+
+    result = convert_to_v10(schema, compiled, timings)
+
+    assert result == {"title": "Survey", "question": {"description": ["a", "b"]}}
+    assert timings.matches == [1, 1]
+    assert timings.list_expansions == [0, 1]
+    assert timings.walk_seconds == 0
+    assert all(seconds > 0 for seconds in timings.find_seconds)
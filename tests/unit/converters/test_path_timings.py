@@ -0,0 +1,39 @@
+"""Tests for the timings of each JSONPath expression in a conversion."""
+
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.converters.v10 import process_match
+
+
+def test_timed_records_matches_and_list_expansions():
+    """Test that a timed process counts the matches of each expression and the lists it expands."""
+    timings = PathTimings(2)
+    data = {"title": "<p>Survey</p>", "description": ["<p>a</p><p>b</p>", "<p>c</p>"]}
+
+    timings.timed(process_match, 0)(data, "title")
+    timings.timed(process_match, 1)(data["description"], 0)
+    timings.timed(process_match, 1)(data["description"], 2)
+
+    assert data == {"title": "Survey", "description": ["a", "b", "c"]}
+    assert timings.matches == [1, 2]
+    assert timings.list_expansions == [0, 1]
+    assert all(seconds > 0 for seconds in timings.process_seconds)
+
+
+def test_add_sums_the_timings_of_each_expression():
+    """Test that adding timings sums them expression by expression."""
+    totals = PathTimings(2)
+    timings = PathTimings(2)
+    timings.find_seconds = [0.5, 0.25]
+    timings.matches = [3, 1]
+    timings.process_seconds = [1.0, 2.0]
+    timings.list_expansions = [0, 1]
+    timings.walk_seconds = 0.75
+
+    totals.add(timings)
+    totals.add(timings)
+
+    assert totals.find_seconds == [1.0, 0.5]
+    assert totals.matches == [6, 2]
+    assert totals.process_seconds == [2.0, 4.0]
+    assert totals.list_expansions == [0, 2]
+    assert totals.walk_seconds == 1.5
@@ -0,0 +1,193 @@
+"""Tests for the converter registry and its conversion plans."""
+
+import copy
+from unittest.mock import patch
+
+import pytest
+
+from eq_cir_converter_service.converters.registry import (
+    ConversionStep,
+    ConverterRegistry,
+    compile_plan,
+    version_in_range,
+)
+
+
+def upper(context, key):
+    """Upper cases a matched string."""
+    context[key] = context[key].upper()
+
+
+def exclaim(context, key):
+    """Adds an exclamation mark to a matched string."""
+    context[key] = f"{context[key]}!"
+
+
+def add_v11_marker(schema):
+    """Marks a whole schema as converted to version 11."""
+    schema["converted"] = "11.0.0"
+    return schema
+
+
+V10_STEP = ConversionStep("v10", "<10.0.0", "10.0.0", paths=("$.title",), process=upper)
+V11_STEP = ConversionStep("v11", ">=10.0.0 <11.0.0", "11.0.0", paths=("$..question.title", "$.title"), process=exclaim)
+SCHEMA = {"title": "survey", "sections": [{"question": {"title": "name"}}]}
+
+
+def make_registry(*steps, max_plans=8):
+    """Returns a registry with the steps registered."""
+    registry = ConverterRegistry(max_plans=max_plans)
+    for step in steps:
+        registry.register(step)
+    return registry
+
+
+@pytest.mark.parametrize(
+    "version, version_range, expected",
+    [
+        ("9.0.0", "*", True),
+        ("9.0.0", "<10.0.0", True),
+        ("10.0.0", "<10.0.0", False),
+        ("10.1.0", ">=10.0.0 <11.0.0", True),
+        ("11.0.0", ">=10.0.0 <11.0.0", False),
+    ],
+)
+def test_version_in_range(version, version_range, expected):
+    """Test that a version must match every comparison of a range, and any version matches "*"."""
+    assert version_in_range(version, version_range) is expected
+
+
+def test_resolve_chains_steps_to_target_version():
+    """Test that the shortest chain of steps from the current version reaches the target version."""
+    registry = make_registry(V10_STEP, V11_STEP)
+
+    assert registry.resolve("9.0.0", "10.0.0") == (V10_STEP,)
+    assert registry.resolve("9.0.0", "11.0.0") == (V10_STEP, V11_STEP)
+    assert registry.resolve("10.2.0", "11.0.0") == (V11_STEP,)
+    assert registry.resolve("11.0.0", "10.0.0") == ()
+    assert registry.resolve("9.0.0", "12.0.0") == ()
+
+
+def test_resolve_prefers_direct_step():
+    """Test that a direct step is chosen over a longer chain to the same version."""
+    direct_step = ConversionStep("v9-to-v11", "<10.0.0", "11.0.0", convert=add_v11_marker)
+    registry = make_registry(V10_STEP, V11_STEP, direct_step)
+
+    assert registry.resolve("9.0.0", "11.0.0") == (direct_step,)
+
+
+def test_plan_fuses_consecutive_path_steps():
+    """Test that consecutive path steps are applied in one walk, with the result of applying them in turn."""
+    registry = make_registry(V10_STEP, V11_STEP)
+    plan = registry.plan("9.0.0", "11.0.0")
+
+    assert plan.step_names == ("v10", "v11")
+    assert len(plan.stages) == 1
+    compiled_paths = plan.stages[0].compiled_paths
+    assert compiled_paths.paths == ("$.title", "$..question.title", "$.title")
+
+    with patch.object(compiled_paths.matcher, "find", wraps=compiled_paths.matcher.find) as mock_find:
+        result = plan.apply(copy.deepcopy(SCHEMA), in_place=True)
+
+    mock_find.assert_called_once()
+    sequential = registry.plan("10.0.0", "11.0.0").apply(registry.plan("9.0.0", "10.0.0").apply(copy.deepcopy(SCHEMA)))
+    assert result == sequential == {"title": "SURVEY!", "sections": [{"question": {"title": "name!"}}]}
+
+
+def test_plan_function_step_separates_stages():
+    """Test that a function step is applied on its own, between the stages of the path steps around it."""
+    marker_step = ConversionStep("marker", ">=9.0.0 <9.5.0", "9.5.0", convert=add_v11_marker)
+    v10_step = ConversionStep("v10", ">=9.5.0 <10.0.0", "10.0.0", paths=("$.title",), process=upper)
+    v9_step = ConversionStep("v9", "<9.0.0", "9.0.0", paths=("$.title",), process=exclaim)
+    plan = make_registry(v9_step, marker_step, v10_step).plan("8.0.0", "10.0.0")
+
+    assert [stage.step_names for stage in plan.stages] == [("v9",), ("marker",), ("v10",)]
+    assert plan.apply({"title": "survey"}) == {"title": "SURVEY!", "converted": "11.0.0"}
+
+
+def test_plan_applied_without_changing_schema():
+    """Test that a plan applied not in place leaves the schema unchanged, for path and function steps."""
+    direct_step = ConversionStep("v9-to-v11", "<10.0.0", "11.0.0", convert=add_v11_marker)
+    for registry in (make_registry(V10_STEP, V11_STEP), make_registry(direct_step)):
+        schema = copy.deepcopy(SCHEMA)
+
+        result = registry.plan("9.0.0", "11.0.0").apply(schema, in_place=False)
+
+        assert schema == SCHEMA
+        assert result != SCHEMA
+
+
+def test_plan_without_steps_returns_schema():
+    """Test that the plan between versions with no chain of steps has no stages and returns the schema as it is."""
+    plan = make_registry(V10_STEP).plan("9.0.0", "2.0.0")
+
+    assert plan.stages == ()
+    assert plan.apply(SCHEMA) is SCHEMA
+
+
+def test_plan_falls_back_to_each_path_in_turn():
+    """Test that each path of a fused stage is processed by its own step when the matcher does not support a path."""
+    filtered_step = ConversionStep("filtered", "<10.0.0", "10.0.0", paths=("$.sections[0].title",), process=upper)
+    v11_step = V11_STEP._replace(paths=("$.sections[0].title",))
+    plan = make_registry(filtered_step, v11_step).plan("9.0.0", "11.0.0")
+
+    assert plan.stages[0].compiled_paths.matcher is None
+    assert plan.apply({"sections": [{"title": "name"}]}) == {"sections": [{"title": "NAME!"}]}
+
+
+def test_plan_records_timings_of_each_stage():
+    """Test that the time spent on each path of a stage is recorded, when a function to record it is given."""
+    recorded = []
+    plan = make_registry(V10_STEP, V11_STEP).plan("9.0.0", "11.0.0")
+
+    plan.apply(copy.deepcopy(SCHEMA), record_timings=lambda *timings: recorded.append(timings))
+
+    assert len(recorded) == 1
+    compiled_paths, timings = recorded[0]
+    assert compiled_paths is plan.stages[0].compiled_paths
+    assert timings.matches == [1, 1, 1]
+
+
+def test_plan_is_cached_until_a_step_is_registered():
+    """Test that a plan is compiled once per pair of versions, until another step is registered."""
+    registry = make_registry(V10_STEP)
+
+    with patch("eq_cir_converter_service.converters.registry.compile_plan", wraps=compile_plan) as mock_compile:
+        first_plan = registry.plan("9.0.0", "11.0.0")
+        assert registry.plan("9.0.0", "11.0.0") is first_plan
+        registry.register(V11_STEP)
+        second_plan = registry.plan("9.0.0", "11.0.0")
+
+    assert mock_compile.call_count == 2
+    assert first_plan.stages == ()
+    assert second_plan.step_names == ("v10", "v11")
+
+
+def test_plan_cache_evicts_least_recently_used():
+    """Test that the cache keeps at most its number of plans, removing the least recently used first."""
+    registry = make_registry(V10_STEP, max_plans=2)
+    first_plan = registry.plan("8.0.0", "10.0.0")
+    second_plan = registry.plan("9.0.0", "10.0.0")
+    assert registry.plan("8.0.0", "10.0.0") is first_plan
+
+    registry.plan("9.1.0", "10.0.0")
+
+    assert registry.plan("8.0.0", "10.0.0") is first_plan
+    assert registry.plan("9.0.0", "10.0.0") is not second_plan
+
+    registry.clear()
+    assert registry.plan("8.0.0", "10.0.0") is not first_plan
+
+
+@pytest.mark.parametrize(
+    "step",
+    [
+        ConversionStep("empty", "*", "10.0.0"),
+        ConversionStep("no paths", "*", "10.0.0", process=upper),
+        ConversionStep("both", "*", "10.0.0", paths=("$.title",), process=upper, convert=add_v11_marker),
+    ],
+)
+def test_register_rejects_invalid_steps(step):
+    """Test that a step must have either paths and a process, or a convert function."""
+    with pytest.raises(ValueError, match="must have either paths and a process, or a convert function"):
+        ConverterRegistry(max_plans=8).register(step)
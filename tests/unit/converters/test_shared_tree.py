@@ -0,0 +1,188 @@
+"""Tests for converting a schema without changing it, sharing the unchanged values."""
+
+import copy
+import dataclasses
+import json
+import tracemalloc
+
+import pytest
+
+from eq_cir_converter_service.converters.compiled_paths import compile_paths
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.converters.shared_tree import SharedTree
+from eq_cir_converter_service.converters.v10 import convert_to_v10, process_match
+from eq_cir_converter_service.services.schema.paths import PATHS
+
+INPUT_SCHEMA_PATH = "tests/integration/v10_conversion/input_schema.json"
+OUTPUT_SCHEMA_PATH = "tests/integration/v10_conversion/output_schema.json"
+
+
+def make_schema(unchanged_sections: int, changed_titles: int) -> dict:
+    """Returns a schema with changed messages at the top, and sections the paths do not match."""
+    return {
+        "title": "<p>Survey</p>",
+        "messages": {f"title{number}": f"<b>Title {number}</b>" for number in range(changed_titles)},
+        "sections": [
+            {"id": f"section{number}", "groups": [{"id": "group", "blocks": [{"id": "block", "type": "Question"}]}]}
+            for number in range(unchanged_sections)
+        ],
+    }
+
+
+def test_shared_conversion_matches_in_place_conversion_on_integration_schema():
+    """Test that converting without changing the schema gives the expected output and leaves the input unchanged."""
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        input_schema = json.load(f)
+    with open(OUTPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        expected_output = json.load(f)
+    original = copy.deepcopy(input_schema)
+
+    output = convert_to_v10(input_schema, compile_paths(tuple(PATHS)), in_place=False)
+
+    assert output == expected_output
+    assert input_schema == original
+
+
+@pytest.mark.parametrize(
+    "schema, paths",
+    [
+        # Splitting a list item into paragraphs, and converting the items after it at their old index
+        ({"list": ["<p>a</p><p>b</p>", "<p>c</p><p>d</p>", "e"]}, ["$.list[*]"]),
+        # A later path matching within a dictionary an earlier path rebuilt
+        ({"title": {"page_title": {"text": "<p>a</p>"}}}, ["$.title", "$..page_title"]),
+        # A text object wrapped in a list by `[*]`, changed in place
+        ({"question": {"description": {"text": "<b>a</b>", "placeholders": []}}}, ["$..description[*]"]),
+        # A value under a list whose earlier items were split, found by a later path
+        ({"list": ["<p>a</p><p>b</p>", {"title": "<b>c</b>"}]}, ["$.list[*]", "$.list[*].title"]),
+        # A dictionary replaced by an earlier path before a later path reaches a value within it
+        ({"a": {"title": "<b>x</b>", "b": {"title": "<b>y</b>"}}}, ["$.a", "$..b.title"]),
+        # Strings that do not change, which are not copied
+        ({"title": "Survey", "messages": {"error": "Enter a value"}}, ["$.title", "$.messages.*"]),
+    ],
+)
+def test_shared_conversion_matches_in_place_conversion(schema, paths):
+    """Test that converting without changing the schema gives the same output as converting it in place."""
+    compiled = compile_paths(tuple(paths))
+    original = copy.deepcopy(schema)
+
+    output = convert_to_v10(schema, compiled, in_place=False)
+
+    assert output == convert_to_v10(copy.deepcopy(schema), compiled)
+    assert schema == original
+
+
+def test_shared_conversion_shares_unchanged_values():
+    """Test that the converted schema shares every dictionary and list that is not changed with the input."""
+    schema = make_schema(unchanged_sections=3, changed_titles=1)
+
+    output = convert_to_v10(schema, compile_paths(tuple(PATHS)), in_place=False)
+
+    assert output is not schema
+    assert output["messages"] is not schema["messages"]
+    assert output["sections"] is schema["sections"]
+    assert (output["title"], output["messages"], schema["title"]) == (
+        "Survey",
+        {"title0": "<strong>Title 0</strong>"},
+        "<p>Survey</p>",
+    )
+
+
+def test_shared_conversion_copies_nothing_when_nothing_changes():
+    """Test that a schema the conversion does not change is returned as it is."""
+    schema = {"title": "Survey", "sections": [{"id": "section"}]}
+
+    tree = compile_paths(("$.title",)).matcher.apply_shared(schema, process_match)  # type: ignore[union-attr]
+
+    assert tree.root is schema
+    assert tree.copy_count == 0
+
+
+def test_shared_conversion_copies_scale_with_changed_values_not_schema_size():
+    """Test that the copies, and the memory they hold, grow with the number of changed values, not the schema size.
+
+    The whole schema is still walked to find the matches, so only the copying is proportional to the changes.
+    """
+    matcher = compile_paths(tuple(PATHS)).matcher
+    assert matcher is not None
+
+    def convert(schema: dict) -> tuple[int, int]:
+        """Returns the number of copies made converting the schema, and the memory the output holds beyond it."""
+        tracemalloc.start()
+        tree = matcher.apply_shared(schema, process_match)
+        copy_count, output = tree.copy_count, tree.root
+        # The parents recorded while walking the schema are freed with the tree, leaving only the copies
+        del tree
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert output is not schema
+        return copy_count, allocated
+
+    large_schema = make_schema(unchanged_sections=10_000, changed_titles=5)
+    # The matcher keeps the transitions between its states once it has met them, so it meets them all first
+    matcher.apply_shared(large_schema, process_match)
+    small_copies, small_memory = convert(make_schema(unchanged_sections=10, changed_titles=5))
+    large_copies, large_memory = convert(large_schema)
+    more_changed_copies, more_changed_memory = convert(make_schema(unchanged_sections=10, changed_titles=2_000))
+    # Converting the schema in place would need a copy of it first, to keep the input
+    tracemalloc.start()
+    deep_copy = copy.deepcopy(large_schema)
+    deep_copy_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert deep_copy == large_schema
+    assert [small_copies, large_copies, more_changed_copies] == [2, 2, 2]
+    assert large_memory < deep_copy_memory / 100
+    assert more_changed_memory > max(small_memory, large_memory) * 10
+
+
+def test_shared_conversion_records_path_timings():
+    """Test that path timings are recorded when converting without changing the schema."""
+    schema = {"title": "<p>Survey</p>", "list": ["<p>a</p><p>b</p>"]}
+    timings = PathTimings(2)
+
+    output = convert_to_v10(schema, compile_paths(("$.title", "$.list[*]")), timings, in_place=False)
+
+    assert output == {"title": "Survey", "list": ["a", "b"]}
+    assert timings.matches == [1, 1]
+    assert timings.list_expansions == [0, 1]
+
+
+def test_shared_conversion_without_matcher_copies_schema():
+    """Test that the schema is copied whole when the paths are evaluated one at a time."""
+    compiled = dataclasses.replace(compile_paths(("$.title",)), matcher=None)
+    schema = {"title": "<p>Survey</p>"}
+
+    output = convert_to_v10(schema, compiled, in_place=False)
+
+    assert output == {"title": "Survey"}
+    assert schema == {"title": "<p>Survey</p>"}
+
+
+def test_own_links_copy_into_parent_that_has_moved_or_dropped_the_value():
+    """Test that a copy is linked in place of its value after the list holding it is spliced, or not at all."""
+    moved, dropped, replaced = {"id": "moved"}, {"id": "dropped"}, {"id": "replaced"}
+    root = {"list": [moved, dropped], "map": {"value": replaced}}
+    tree = SharedTree(root)
+    tree.parents.update(
+        {
+            id(root["list"]): (root, "list", root["list"]),
+            id(root["map"]): (root, "map", root["map"]),
+            id(moved): (root["list"], 0, moved),
+            id(dropped): (root["list"], 1, dropped),
+            id(replaced): (root["map"], "value", replaced),
+        },
+    )
+    owned_list = tree.own(root["list"])
+    owned_list[0:2] = ["a", "b", moved]
+    owned_map = tree.own(root["map"])
+    owned_map["value"] = "new"
+
+    moved_copy = tree.own(moved)
+    dropped_copy = tree.own(dropped)
+    replaced_copy = tree.own(replaced)
+
+    assert tree.root["list"] == ["a", "b", moved_copy]
+    assert tree.root["list"][2] is moved_copy
+    assert (dropped_copy, replaced_copy) == (dropped, replaced)
+    assert tree.root["map"] == {"value": "new"}
+    assert root == {"list": [moved, dropped], "map": {"value": replaced}}
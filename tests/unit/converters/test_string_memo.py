@@ -0,0 +1,91 @@
+"""Tests for the string memo."""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+from eq_cir_converter_service.converters.string_memo import StringMemo, StringMemoStats
+
+
+def split_words(text: str) -> str | list[str]:
+    """Returns the words of the text as a list, or the text if it is a single word."""
+    words = text.split()
+    return words if len(words) > 1 else text
+
+
+def test_memo_transforms_each_string_once_and_counts_hits():
+    """Test that a string is transformed once and then returned from the memo."""
+    transform = Mock(side_effect=split_words)
+    memo = StringMemo(transform, max_entries=4)
+
+    assert memo("Yes") == "Yes"
+    assert memo("Yes") == "Yes"
+    assert memo("No") == "No"
+
+    assert transform.call_count == 2
+    assert memo.stats() == StringMemoStats(hits=1, misses=2, hit_rate=0.3333, evictions=0, entries=2, max_entries=4)
+
+
+def test_memo_returns_a_new_list_each_time():
+    """Test that changing a returned list changes neither the memo nor the lists returned later."""
+    memo = StringMemo(split_words, max_entries=4)
+
+    first = memo("standard guidance text")
+    first[0:1] = ["changed", "by", "a", "splice"]
+    second = memo("standard guidance text")
+    second.clear()
+
+    assert memo("standard guidance text") == ["standard", "guidance", "text"]
+
+
+def test_memo_evicts_least_recently_used_string():
+    """Test that the memo keeps to its size by evicting the least recently used string."""
+    transform = Mock(side_effect=split_words)
+    memo = StringMemo(transform, max_entries=2)
+
+    memo("a")
+    memo("b")
+    memo("a")
+    memo("c")
+    memo("a")
+    memo("b")
+
+    assert [call.args[0] for call in transform.call_args_list] == ["a", "b", "c", "b"]
+    stats = memo.stats()
+    assert (stats.evictions, stats.entries) == (2, 2)
+
+
+def test_memo_disabled_with_size_zero():
+    """Test that a memo with a size of 0 transforms every string and keeps nothing."""
+    transform = Mock(side_effect=split_words)
+    memo = StringMemo(transform, max_entries=0)
+
+    memo("Yes")
+    memo("Yes")
+
+    assert transform.call_count == 2
+    assert memo.stats() == StringMemoStats(hits=0, misses=0, hit_rate=0.0, evictions=0, entries=0, max_entries=0)
+
+
+def test_memo_clear_removes_entries_and_counters():
+    """Test that clearing the memo removes its entries and resets its counters."""
+    memo = StringMemo(split_words, max_entries=2)
+    memo("a")
+    memo("a")
+
+    memo.clear()
+
+    assert memo.stats() == StringMemoStats(hits=0, misses=0, hit_rate=0.0, evictions=0, entries=0, max_entries=2)
+
+
+def test_memo_is_shared_by_threads():
+    """Test that threads using the memo at once get the right results and keep it within its size."""
+    memo = StringMemo(split_words, max_entries=16)
+    texts = [f"text {number % 32}" for number in range(2000)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(memo, texts))
+
+    assert results == [text.split() for text in texts]
+    stats = memo.stats()
+    assert stats.hits + stats.misses == len(texts)
+    assert stats.entries == 16
@@ -1,18 +1,22 @@
 """Tests for helper utilities."""
 
+import random
 from collections.abc import Mapping
 from typing import Any, cast
 
 import pytest
 
 from eq_cir_converter_service.converters.v10 import (
+    REGEX_PARAGRAPH_SPLIT,
     convert_to_v10,
     extract_placeholder_names_from_text_field,
     get_sanitised_text,
+    get_sanitised_text_chained,
     process_item,
     process_list,
     process_placeholder,
     process_string,
+    sanitise_html,
     split_paragraphs_into_list,
     split_paragraphs_with_placeholders,
 )
@@ -325,6 +329,78 @@ def test_clean_html_tags(input_html, expected):
     assert get_sanitised_text(input_html) == expected
 
 
+# Fragments of HTML tags, whitespace and text, so random strings of them are full of awkward tags
+HTML_FRAGMENTS = (
+    "<",
+    ">",
+    "/",
+    "p",
+    "P",
+    "b",
+    "B",
+    "r",
+    "br",
+    " ",
+    "\t",
+    "\n",
+    "x",
+    "{a}",
+    "<p>",
+    "</p>",
+    "<b>",
+    "</B>",
+)
+HTML_FRAGMENTS += ("<br>", "</br>", "< b >", "< / b>")
+
+
+def random_html(seed: int, count: int) -> list[str]:
+    """Returns random strings of fragments of HTML tags, the same for the same seed."""
+    generator = random.Random(seed)  # noqa: S311 - reproducible test data, not security
+    return ["".join(generator.choices(HTML_FRAGMENTS, k=generator.randint(0, 16))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sanitised_text_is_the_same_as_chained_substitutions(seed):
+    """Test that cleaning any text gives the same result as one substitution for each kind of tag in turn."""
+    for text in random_html(seed, 5000):
+        assert get_sanitised_text(text) == get_sanitised_text_chained(text), text
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sanitise_html_is_the_same_as_splitting_then_cleaning(seed):
+    """Test that splitting any text into cleaned paragraphs gives the same result as splitting it then cleaning."""
+    for text in random_html(seed, 5000):
+        if REGEX_PARAGRAPH_SPLIT.search(text):
+            expected: str | list[str] = [get_sanitised_text_chained(p) for p in split_paragraphs_into_list(text)]
+        else:
+            expected = get_sanitised_text_chained(text)
+        assert sanitise_html(text) == expected, text
+
+
+@pytest.mark.parametrize(
+    "input_html,expected",
+    [
+        # A <p> tag made by removing a <br> tag is removed too
+        ("<<br>p>x", "x"),
+        ("<p<br>>x<</br>/p>", "x"),
+        # A <br> tag made by removing a <br> tag, or a <b> tag made by removing a <p> tag, is kept
+        ("<<br>br>x", "<br>x"),
+        ("<<p>b>x", "<b>x"),
+        ("<<p>p>x", "<p>x"),
+    ],
+)
+def test_clean_html_tags_joined_by_removing_tags(input_html, expected):
+    """Test that tags made by joining the text either side of a removed tag are cleaned as by chained substitutions."""
+    assert get_sanitised_text(input_html) == expected == get_sanitised_text_chained(input_html)
+
+
+@pytest.mark.parametrize("text", ["Plain text", "{placeholder} text", ""])
+def test_clean_html_tags_returns_text_without_tags_unchanged(text):
+    """Test that text without any tags is returned as it is, without being copied."""
+    assert get_sanitised_text(text) is text
+    assert sanitise_html(text) is text
+
+
 @pytest.mark.parametrize(
     "paragraphs_string,expected",
     [
@@ -482,6 +558,25 @@ def test_split_text_with_placeholders_no_placeholders():
     assert result == ["Hello world"]
 
 
+def test_split_text_with_placeholders_last_definition_wins():
+    """Test that a placeholder defined more than once uses its last definition, once for each time it is used."""
+    first = {"placeholder": "name", "value": {"source": "metadata", "identifier": "FIRST"}}
+    last = {"placeholder": "name", "value": {"source": "metadata", "identifier": "LAST"}}
+    input_object = {
+        "text": "<p>{name} and {name}</p><p>{missing}</p>",
+        "placeholders": [first, {"value": {}}, last],
+    }
+    result = split_paragraphs_with_placeholders(input_object)
+    assert result == [{"text": "{name} and {name}", "placeholders": [last, last]}, "{missing}"]
+
+
+def test_split_text_with_placeholders_no_paragraphs():
+    """Test splitting text without any paragraphs."""
+    input_object = {"text": "<b>Hello</b> world", "placeholders": []}
+    result = split_paragraphs_with_placeholders(input_object)
+    assert not result
+
+
 def test_process_list_non_expandable_dict():
     """Test processing a list with a non-expandable dictionary."""
     data = [{"meta": "plain text"}]
@@ -543,3 +638,19 @@ def test_process_strings_in_complex_objects():
         "empty_list_text": "There are no items",
     }
     assert process_item(input_data) == expected
+
+
+def test_memoised_paragraphs_are_not_changed_by_a_conversion():
+    """Test that splicing memoised paragraphs into a schema list, and changing the list, does not change the memo."""
+    text = "<p>Legal text</p><p>More legal text</p>"
+    schema = {"contents": [{"list": [text]}, {"list": [text]}]}
+
+    converted = convert_to_v10(schema, ["$.contents[*].list[*]"])
+    converted["contents"][0]["list"].clear()
+
+    assert sanitise_html(text) == ["Legal text", "More legal text"]
+    assert sanitise_html(text) is not sanitise_html(text)
+    assert converted["contents"][1]["list"] == ["Legal text", "More legal text"]
+    assert convert_to_v10({"contents": [{"list": [text]}]}, ["$.contents[*].list[*]"]) == {
+        "contents": [{"list": ["Legal text", "More legal text"]}],
+    }
@@ -0,0 +1,271 @@
+"""Tests for the content encoding middleware."""
+
+import asyncio
+import gzip
+import json
+import zlib
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.middleware.content_encoding_middleware import (
+    ContentEncodingMiddleware,
+    RequestDecoder,
+    ResponseEncoder,
+    accepted_content_coding,
+)
+from eq_cir_converter_service.middleware.metrics_middleware import MetricsMiddleware
+from eq_cir_converter_service.routers import schema_router
+from eq_cir_converter_service.services import metrics
+
+QUERY = "current_version=9.0.0&target_version=10.0.0"
+
+# A schema big enough for its converted schema to be compressed
+SCHEMA = {"title": "<p>Survey</p>", "sections": [{"title": f"<b>Section {index}</b>"} for index in range(100)]}
+CONVERTED_SCHEMA = {
+    "title": "Survey",
+    "sections": [{"title": f"<strong>Section {index}</strong>"} for index in range(100)],
+}
+
+
+def make_app(
+    *,
+    max_request_bytes: int = 1024 * 1024,
+    min_response_bytes: int = 1024,
+    level: int = 6,
+    thread_min_bytes: int = 16 * 1024,
+) -> FastAPI:
+    """Returns an app with the schema router behind the content encoding and metrics middleware."""
+    app = FastAPI()
+    app.add_middleware(
+        ContentEncodingMiddleware,
+        max_request_bytes=max_request_bytes,
+        min_response_bytes=min_response_bytes,
+        level=level,
+        thread_min_bytes=thread_min_bytes,
+    )
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(schema_router.router)
+
+    @app.get("/encoded")
+    async def get_encoded() -> Response:
+        return Response(gzip.compress(b"x" * 2048), headers={"Content-Encoding": "gzip"})
+
+    return app
+
+
+def compress(body: bytes, content_coding: str) -> bytes:
+    """Compresses a body with gzip or deflate, as an HTTP client does."""
+    return gzip.compress(body) if content_coding == "gzip" else zlib.compress(body)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected_content_coding",
+    [
+        ("gzip, deflate", "gzip"),
+        ("deflate", "deflate"),
+        ("gzip;q=0.5, deflate", "deflate"),
+        ("GZIP ; q=1.0", "gzip"),
+        ("*", "gzip"),
+        ("*, gzip;q=0", "deflate"),
+        ("gzip;q=0, deflate;q=0", None),
+        ("gzip;q=x", None),
+        ("gzip;level=1", "gzip"),
+        ("br, identity", None),
+        ("", None),
+    ],
+)
+def test_accepted_content_coding(accept_encoding, expected_content_coding):
+    """Test that the content coding the client prefers is chosen from gzip and deflate."""
+    assert accepted_content_coding(accept_encoding) == expected_content_coding
+
+
+@pytest.mark.parametrize("endpoint", ["/schema", "/schema/raw", "/schema/stream"])
+@pytest.mark.parametrize("content_coding", ["gzip", "deflate"])
+def test_compressed_request_body_is_decompressed(endpoint, content_coding):
+    """Test that a gzip or deflate request body is converted as if it had been sent uncompressed."""
+    response = TestClient(make_app()).post(
+        f"{endpoint}?{QUERY}",
+        content=compress(json.dumps(SCHEMA).encode(), content_coding),
+        headers={"Content-Type": "application/json", "Content-Encoding": content_coding},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == CONVERTED_SCHEMA
+
+
+def test_compressed_request_body_is_decompressed_in_chunks():
+    """Test that a compressed request body is decompressed as each chunk is received, and recorded by route."""
+    body = gzip.compress(json.dumps(SCHEMA).encode())
+    chunks = [body[start : start + 16] for start in range(0, len(body), 16)]
+
+    response = TestClient(make_app()).post(
+        f"/schema/raw?{QUERY}",
+        content=iter(chunks),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.json() == CONVERTED_SCHEMA
+    # The metrics middleware sees the route, and the size of the body as it was sent
+    assert f'cir_converter_http_request_body_bytes_sum{{route="/schema/raw"}} {len(body)}' in metrics.render().decode()
+
+
+@pytest.mark.parametrize("endpoint", ["/schema", "/schema/raw"])
+def test_request_body_over_decompressed_limit_is_rejected(endpoint):
+    """Test that a body that decompresses to more than the limit, as a zip bomb does, is rejected."""
+    body = json.dumps({"title": " " * 100_000}).encode()
+
+    response = TestClient(make_app(max_request_bytes=len(body) - 1)).post(
+        f"{endpoint}?{QUERY}",
+        content=gzip.compress(body),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 413
+    assert response.json()["detail"]["message"] == exception_messages.EXCEPTION_413_DECOMPRESSED_BODY_TOO_LARGE
+
+
+def test_request_body_at_decompressed_limit_is_accepted():
+    """Test that a body that decompresses to exactly the limit is accepted."""
+    body = json.dumps({"title": " " * 100_000}).encode()
+
+    response = TestClient(make_app(max_request_bytes=len(body))).post(
+        f"/schema/raw?{QUERY}",
+        content=gzip.compress(body),
+        headers={"Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"title": "Survey"}',
+        gzip.compress(b'{"title": "Survey"}')[:-4],
+        gzip.compress(b'{"title": "Survey"}') + b"trailing",
+    ],
+    ids=["not compressed", "truncated", "trailing data"],
+)
+def test_invalid_compressed_request_body_is_rejected(body):
+    """Test that a body that is not valid for its content coding is rejected."""
+    response = TestClient(make_app()).post(f"/schema/raw?{QUERY}", content=body, headers={"Content-Encoding": "gzip"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["message"] == exception_messages.EXCEPTION_400_INVALID_CONTENT_ENCODING
+
+
+def test_unsupported_request_content_encoding_is_rejected():
+    """Test that a body with a content coding other than gzip or deflate is rejected."""
+    response = TestClient(make_app()).post(
+        f"/schema/raw?{QUERY}",
+        content=b'{"title": "Survey"}',
+        headers={"Content-Encoding": "br"},
+    )
+
+    assert response.status_code == 415
+    assert response.json()["detail"]["message"] == exception_messages.EXCEPTION_415_UNSUPPORTED_CONTENT_ENCODING
+
+
+def test_identity_request_body_is_not_decompressed():
+    """Test that a body with the identity content coding is read as it is."""
+    response = TestClient(make_app()).post(
+        f"/schema/raw?{QUERY}",
+        content=b'{"title": "<p>Survey</p>"}',
+        headers={"Content-Encoding": "identity"},
+    )
+
+    assert response.json() == {"title": "Survey"}
+
+
+@pytest.mark.parametrize("content_coding", ["gzip", "deflate"])
+def test_response_body_is_compressed(content_coding):
+    """Test that a response body at or above the threshold is compressed with the content coding the client accepts."""
+    response = TestClient(make_app()).post(
+        f"/schema/raw?{QUERY}",
+        json=SCHEMA,
+        headers={"Accept-Encoding": content_coding},
+    )
+
+    assert response.headers["content-encoding"] == content_coding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(CONVERTED_SCHEMA, separators=(",", ":")))
+    assert response.json() == CONVERTED_SCHEMA
+
+
+@pytest.mark.parametrize(
+    "app_options, accept_encoding",
+    [
+        ({"min_response_bytes": 1024 * 1024}, "gzip"),
+        ({}, "identity"),
+        ({"level": 0}, "gzip"),
+    ],
+    ids=["below threshold", "not accepted", "compression disabled"],
+)
+def test_response_body_is_not_compressed(app_options, accept_encoding):
+    """Test that a response body is sent as it is when it is too small, not accepted or compression is disabled."""
+    response = TestClient(make_app(**app_options)).post(
+        f"/schema/raw?{QUERY}",
+        json=SCHEMA,
+        headers={"Accept-Encoding": accept_encoding},
+    )
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == CONVERTED_SCHEMA
+
+
+def test_encoded_response_body_is_not_compressed_again():
+    """Test that a response body that already has a content coding is sent as it is."""
+    response = TestClient(make_app()).get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"x" * 2048
+
+
+def test_streamed_response_body_is_compressed_as_it_is_sent():
+    """Test that a streamed response is compressed chunk by chunk, whatever the size of its first chunk."""
+    response = TestClient(make_app(min_response_bytes=1024 * 1024)).post(
+        f"/schema/stream?{QUERY}",
+        json=SCHEMA,
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.json() == CONVERTED_SCHEMA
+
+
+@pytest.mark.parametrize("thread_min_bytes, expected_thread_calls", [(0, ["decode", "_compress"]), (1024 * 1024, [])])
+def test_large_bodies_are_decompressed_and_compressed_off_the_event_loop(thread_min_bytes, expected_thread_calls):
+    """Test that the request and response bodies from the size threshold are handled on a worker thread."""
+    with patch(
+        "eq_cir_converter_service.middleware.content_encoding_middleware.asyncio.to_thread",
+        side_effect=asyncio.to_thread,
+    ) as mock_to_thread:
+        response = TestClient(make_app(thread_min_bytes=thread_min_bytes)).post(
+            f"/schema/raw?{QUERY}",
+            content=gzip.compress(json.dumps(SCHEMA).encode()),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip", "Accept-Encoding": "gzip"},
+        )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == CONVERTED_SCHEMA
+    assert [call.args[0].__name__ for call in mock_to_thread.call_args_list] == expected_thread_calls
+
+
+def test_messages_without_a_body_are_passed_on():
+    """Test that messages other than parts of the request or response body are passed on unchanged."""
+    disconnect = {"type": "http.disconnect"}
+    assert RequestDecoder("gzip", 1024).decode(disconnect) is disconnect
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    trailers = {"type": "http.response.trailers", "headers": [], "more_trailers": False}
+    asyncio.run(ResponseEncoder(send, "gzip", min_bytes=0, level=6, thread_min_bytes=0).send(trailers))
+    assert sent == [trailers]
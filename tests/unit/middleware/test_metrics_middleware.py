@@ -0,0 +1,52 @@
+"""Tests for the metrics middleware and exception handlers."""
+
+from eq_cir_converter_service.services import metrics
+
+QUERY = "current_version=9.0.0&target_version=10.0.0"
+
+
+def metric_lines(test_client) -> list[str]:
+    """Returns the lines of the metrics served by GET /metrics."""
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    return response.text.splitlines()
+
+
+def test_request_duration_and_sizes_are_recorded(test_client):
+    """Test that a conversion request is recorded by route and target version, with its body sizes."""
+    response = test_client.post(f"/schema/raw?{QUERY}", json={"title": "<p>Survey</p>"})
+    assert response.status_code == 200
+
+    lines = metric_lines(test_client)
+
+    labels = 'method="POST",route="/schema/raw",status_code="200",target_version="10.0.0"'
+    assert f"cir_converter_http_request_duration_seconds_count{{{labels}}} 1" in lines
+    request_bytes = len(b'{"title":"<p>Survey</p>"}')
+    assert f'cir_converter_http_request_body_bytes_sum{{route="/schema/raw"}} {request_bytes}' in lines
+    assert f'cir_converter_http_response_body_bytes_sum{{route="/schema/raw"}} {len(response.content)}' in lines
+    assert 'cir_converter_conversion_phase_duration_seconds_count{phase="parse",target_version="10.0.0"} 1' in lines
+    assert 'cir_converter_conversion_phase_duration_seconds_count{phase="convert",target_version="10.0.0"} 1' in lines
+    assert 'cir_converter_conversion_phase_duration_seconds_count{phase="serialise",target_version="10.0.0"} 1' in lines
+    # The request for the metrics is the only one in flight while they are rendered
+    assert "cir_converter_http_requests_in_flight 1" in lines
+
+
+def test_errors_are_counted_by_message(test_client):
+    """Test that HTTP errors are counted by status code and exception message, and unmatched routes are labelled."""
+    test_client.post("/schema/raw?current_version=9.0.0&target_version=x", json={"title": "Survey"})
+    test_client.post(f"/schema/raw?{QUERY}", content=b"[]")
+    test_client.get("/unknown")
+
+    lines = metric_lines(test_client)
+
+    assert (
+        'cir_converter_errors_total{status_code="400",message="The {version_type} version must be in the format '
+        'x.y.z where x, y, z are numbers"} 1'
+    ) in lines
+    assert 'cir_converter_errors_total{status_code="422",message="other"} 1' in lines
+    assert 'cir_converter_errors_total{status_code="404",message="other"} 1' in lines
+    labels = 'method="GET",route="unmatched",status_code="404",target_version=""'
+    assert f"cir_converter_http_request_duration_seconds_count{{{labels}}} 1" in lines
+    labels = 'method="POST",route="/schema/raw",status_code="400",target_version="other"'
+    assert f"cir_converter_http_request_duration_seconds_count{{{labels}}} 1" in lines
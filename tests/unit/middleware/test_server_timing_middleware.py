@@ -0,0 +1,63 @@
+"""Tests for the Server-Timing middleware."""
+
+import re
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from eq_cir_converter_service.middleware.server_timing_middleware import ServerTimingMiddleware
+from eq_cir_converter_service.routers import schema_router
+
+app = FastAPI()
+app.add_middleware(ServerTimingMiddleware)
+app.include_router(schema_router.router)
+
+QUERY = "current_version=9.0.0&target_version=10.0.0"
+
+
+def server_timing_phases(header: str) -> list[str]:
+    """Returns the names of the phases in a Server-Timing header, checking each has a duration."""
+    metrics = header.split(", ")
+    assert all(re.fullmatch(r"[a-z]+;dur=\d+\.\d{3}", metric) for metric in metrics)
+    return [metric.partition(";")[0] for metric in metrics]
+
+
+def test_post_schema_has_server_timing_header():
+    """Test that POST /schema reports the duration of each phase of the request."""
+    with TestClient(app) as client:
+        response = client.post(f"/schema?{QUERY}", json={"title": "<p>Survey</p>"})
+
+    assert response.status_code == 200
+    assert server_timing_phases(response.headers["server-timing"]) == [
+        "read",
+        "parse",
+        "validate",
+        "convert",
+        "serialise",
+        "total",
+    ]
+
+
+def test_post_schema_in_worker_process_has_server_timing_header():
+    """Test that a schema converted in a worker process is reported as one convert phase."""
+    with (
+        patch.object(schema_router.conversion_process_pool, "accepts", return_value=True),
+        patch.object(
+            schema_router.conversion_process_pool,
+            "process_schema_json",
+            return_value=b'{"title":"Survey"}',
+        ),
+    ):
+        response = TestClient(app).post(f"/schema?{QUERY}", json={"title": "<p>Survey</p>"})
+
+    assert response.json() == {"title": "Survey"}
+    assert server_timing_phases(response.headers["server-timing"]) == ["read", "parse", "validate", "convert", "total"]
+
+
+def test_error_response_has_server_timing_header():
+    """Test that an error response reports the phases that completed."""
+    response = TestClient(app).post("/schema?current_version=9.0.0&target_version=x", json={"title": "Survey"})
+
+    assert response.status_code == 400
+    assert server_timing_phases(response.headers["server-timing"]) == ["read", "parse", "total"]
@@ -0,0 +1,175 @@
+"""This module contains the unit tests for the jobs router."""
+
+import threading
+import time
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+import eq_cir_converter_service.main as app
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.services.conversion_jobs import JobQueueFullError
+from eq_cir_converter_service.utils.helper_utils import load_schema_json
+
+DEFAULT_CURRENT_VERSION = "9.0.0"
+DEFAULT_TARGET_VERSION = "10.0.0"
+JOBS_URL = f"/jobs?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}"
+
+
+@pytest.fixture(name="jobs_client")
+def fixture_jobs_client() -> Generator[TestClient, None, None]:
+    """Client for hitting the jobs endpoints, with the job runners started."""
+    with TestClient(app.app) as client:
+        yield client
+
+
+def wait_for_job(client: TestClient, job_id: str) -> dict:
+    """Polls the status of the job until it has finished."""
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+
+
+def test_job_result_matches_post_schema(jobs_client: TestClient) -> None:
+    """Test that a job is accepted straight away and its result is the same as the response from POST /schema."""
+    schema = {"title": "<b>Title</b>", "sections": [{"id": "s1", "title": "<p>Section</p>"}]}
+
+    response = jobs_client.post(JOBS_URL, json=schema)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()["job_id"]
+    assert response.headers["location"] == f"/jobs/{job_id}"
+    assert response.json() == {
+        "job_id": job_id,
+        "status": "queued",
+        "current_version": DEFAULT_CURRENT_VERSION,
+        "target_version": DEFAULT_TARGET_VERSION,
+    }
+    assert wait_for_job(jobs_client, job_id)["status"] == "succeeded"
+
+    result_response = jobs_client.get(f"/jobs/{job_id}/result")
+
+    assert result_response.status_code == status.HTTP_200_OK
+    assert result_response.headers["content-type"] == "application/json"
+    assert result_response.content == jobs_client.post(JOBS_URL.replace("/jobs", "/schema"), json=schema).content
+
+
+def test_job_result_before_job_has_finished(jobs_client: TestClient) -> None:
+    """Test that the result of a job that is still running is not available yet."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def block(**kwargs: object) -> object:
+        started.set()
+        release.wait(5)
+        return kwargs["input_schema"]
+
+    with patch(
+        "eq_cir_converter_service.services.schema.schema_processor.process_schema",
+        side_effect=block,
+    ):
+        job_id = jobs_client.post(JOBS_URL, json={"title": "Title"}).json()["job_id"]
+        started.wait(5)
+        running_job = jobs_client.get(f"/jobs/{job_id}").json()
+        result_response = jobs_client.get(f"/jobs/{job_id}/result")
+        release.set()
+        wait_for_job(jobs_client, job_id)
+
+    assert running_job["status"] == "running"
+    assert result_response.status_code == status.HTTP_409_CONFLICT
+    assert result_response.json() == {
+        "detail": {"status": "error", "message": exception_messages.EXCEPTION_409_JOB_NOT_FINISHED},
+    }
+
+
+def test_failed_job_result(jobs_client: TestClient) -> None:
+    """Test that the result of a failed job is the error POST /schema would have given."""
+    with patch(
+        "eq_cir_converter_service.services.schema.schema_processor.process_schema",
+        side_effect=ValueError("Mocked error"),
+    ):
+        job_id = jobs_client.post(JOBS_URL, json={"title": "Title"}).json()["job_id"]
+        job = wait_for_job(jobs_client, job_id)
+
+    result_response = jobs_client.get(f"/jobs/{job_id}/result")
+
+    assert job["error"] == {"status_code": 500, "message": exception_messages.EXCEPTION_500_SCHEMA_PROCESSING}
+    assert result_response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert result_response.json() == {
+        "detail": {"status": "error", "message": exception_messages.EXCEPTION_500_SCHEMA_PROCESSING},
+    }
+
+
+@pytest.mark.parametrize("path", ["/jobs/unknown", "/jobs/unknown/result"])
+def test_unknown_job(jobs_client: TestClient, path: str) -> None:
+    """Test that a job that does not exist, or has expired, is not found."""
+    response = jobs_client.get(path)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {
+        "detail": {"status": "error", "message": exception_messages.EXCEPTION_404_JOB_NOT_FOUND},
+    }
+
+
+def test_post_job_queue_full(jobs_client: TestClient) -> None:
+    """Test that a job is rejected with a 429 when the job queue is full."""
+    with patch(
+        "eq_cir_converter_service.routers.jobs_router.conversion_jobs.submit",
+        side_effect=JobQueueFullError,
+    ):
+        response = jobs_client.post(JOBS_URL, json={"title": "Title"})
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json() == {
+        "detail": {"status": "error", "message": exception_messages.EXCEPTION_429_JOB_QUEUE_FULL},
+    }
+
+
+def test_post_job_parses_body_off_the_event_loop(jobs_client: TestClient) -> None:
+    """Test that the body of a job is parsed on a conversion worker thread, not on the event loop."""
+    parse_threads = []
+
+    def record_thread(schema_json: bytes) -> object:
+        parse_threads.append(threading.current_thread().name)
+        return load_schema_json(schema_json)
+
+    with patch(
+        "eq_cir_converter_service.routers.schema_router.load_schema_json",
+        side_effect=record_thread,
+    ):
+        response = jobs_client.post(JOBS_URL, content=b'{"title": "<b>Title</b>"}')
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert wait_for_job(jobs_client, response.json()["job_id"])["status"] == "succeeded"
+    assert len(parse_threads) == 1
+    assert parse_threads[0].startswith("conversion")
+
+
+@pytest.mark.parametrize(
+    "current_version, target_version, body, expected_status_code",
+    [
+        ("1", DEFAULT_TARGET_VERSION, b'{"title": "Title"}', status.HTTP_400_BAD_REQUEST),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_CURRENT_VERSION, b'{"title": "Title"}', status.HTTP_400_BAD_REQUEST),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b"{}", status.HTTP_400_BAD_REQUEST),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b"[]", status.HTTP_422_UNPROCESSABLE_CONTENT),
+    ],
+)
+def test_post_job_invalid_request(
+    jobs_client: TestClient,
+    current_version: str,
+    target_version: str,
+    body: bytes,
+    expected_status_code: int,
+) -> None:
+    """Test that an invalid job is rejected straight away with the same response as POST /schema."""
+    query = f"current_version={current_version}&target_version={target_version}"
+
+    response = jobs_client.post(f"/jobs?{query}", content=body)
+
+    assert response.status_code == expected_status_code
+    assert response.content == jobs_client.post(f"/schema?{query}", content=body).content
@@ -0,0 +1,22 @@
+"""This module contains the unit tests for the /metrics router."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from eq_cir_converter_service.routers.metrics_router import router
+from eq_cir_converter_service.services import metrics
+
+app = FastAPI()
+app.include_router(router)
+
+client = TestClient(app)
+
+
+def test_metrics_endpoint():
+    """Test the GET /metrics endpoint serves the metrics in the Prometheus text exposition format."""
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert response.text == metrics.render().decode()
+    assert "# TYPE cir_converter_http_request_duration_seconds histogram" in response.text
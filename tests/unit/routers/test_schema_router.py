@@ -1,12 +1,22 @@
 """This module contains the unit tests for the schema router."""
 
-from unittest.mock import patch
+import json
+import threading
+import time
+from collections.abc import Callable
+from unittest.mock import PropertyMock, patch
 
 import pytest
 from fastapi import HTTPException, status
 from fastapi.testclient import TestClient
 
 from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.services.conversion_cache import conversion_cache
+from eq_cir_converter_service.services.conversion_executor import ConversionQueueFullError
+from eq_cir_converter_service.services.conversion_process_pool import conversion_process_pool, process_schema_json
+from eq_cir_converter_service.services.section_cache import section_cache
+from eq_cir_converter_service.utils.helper_utils import load_schema_json, validate_version
+from tests.json_patch import apply_patch
 
 DEFAULT_CURRENT_VERSION = "9.0.0"
 DEFAULT_TARGET_VERSION = "10.0.0"
@@ -113,3 +123,635 @@ def test_convert_schema_http_exception(test_client: TestClient) -> None:
             target_version=DEFAULT_TARGET_VERSION,
             input_schema=DEFAULT_RESPONSE_JSON,
         )
+
+
+def test_post_schema_queue_full(test_client: TestClient) -> None:
+    """Test that the schema is rejected with a 503 when the conversion queue is full."""
+    with patch(
+        "eq_cir_converter_service.routers.schema_router.conversion_executor.run",
+        side_effect=ConversionQueueFullError,
+    ):
+        response = test_client.post(
+            f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+            json=DEFAULT_RESPONSE_JSON,
+        )
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json() == {
+        "detail": {"status": "error", "message": exception_messages.EXCEPTION_503_CONVERSION_QUEUE_FULL},
+    }
+
+
+def test_post_schema_converts_off_the_event_loop(test_client: TestClient) -> None:
+    """Test that the schema is converted on a conversion worker thread rather than the event loop."""
+    conversion_threads = []
+
+    def record_thread(**kwargs: object) -> object:
+        conversion_threads.append(threading.current_thread().name)
+        return kwargs["input_schema"]
+
+    with patch(
+        "eq_cir_converter_service.services.schema.schema_processor.process_schema",
+        side_effect=record_thread,
+    ):
+        response = test_client.post(
+            f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+            json=DEFAULT_RESPONSE_JSON,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(conversion_threads) == 1
+    assert conversion_threads[0].startswith("conversion")
+
+
+@pytest.mark.usefixtures("conversion_cache_enabled")
+def test_post_schema_caches_off_the_event_loop(test_client: TestClient) -> None:
+    """Test that the conversion cache key is made, and the converted schema cached, on a conversion worker thread."""
+    cache_threads = []
+
+    def record_thread(function: Callable) -> Callable:
+        def wrapper(*args: object, **kwargs: object) -> object:
+            cache_threads.append(threading.current_thread().name)
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    with (
+        patch.object(conversion_cache, "make_key", side_effect=record_thread(conversion_cache.make_key)),
+        patch.object(conversion_cache, "put", side_effect=record_thread(conversion_cache.put)),
+    ):
+        response = test_client.post(
+            f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+            json=DEFAULT_RESPONSE_JSON,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(cache_threads) == 2
+    assert all(thread_name.startswith("conversion") for thread_name in cache_threads)
+    assert conversion_cache.stats().entries == 1
+
+
+def test_post_schema_large_schema_uses_process_pool(test_client: TestClient) -> None:
+    """Test that a schema above the process pool threshold is handed over as the raw request body."""
+    with (
+        patch(
+            "eq_cir_converter_service.routers.schema_router.conversion_process_pool.accepts",
+            return_value=True,
+        ),
+        patch(
+            "eq_cir_converter_service.routers.schema_router.conversion_process_pool.process_schema_json",
+            side_effect=process_schema_json,
+        ) as mock_process_schema_json,
+    ):
+        response = test_client.post(
+            f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+            content=b'{"title": "<b>Title</b>"}',
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"title": "<strong>Title</strong>"}
+    mock_process_schema_json.assert_called_once_with(
+        current_version=DEFAULT_CURRENT_VERSION,
+        target_version=DEFAULT_TARGET_VERSION,
+        schema_json=b'{"title": "<b>Title</b>"}',
+        response_format="schema",
+    )
+
+
+def test_post_schema_large_schema_is_split_by_section(test_client: TestClient) -> None:
+    """Test that a schema the process pool splits by section is handed over as the parsed schema."""
+    with (
+        patch(
+            "eq_cir_converter_service.routers.schema_router.conversion_process_pool.accepts",
+            return_value=True,
+        ),
+        patch(
+            "eq_cir_converter_service.routers.schema_router.conversion_process_pool.splits_by_section",
+            return_value=True,
+        ),
+        patch(
+            "eq_cir_converter_service.routers.schema_router.conversion_process_pool.process_schema_by_section",
+            return_value=b'{"title":"Title","sections":[]}',
+        ) as mock_process_schema_by_section,
+    ):
+        response = test_client.post(
+            f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+            json={"title": "<p>Title</p>", "sections": []},
+        )
+
+    assert response.json() == {"title": "Title", "sections": []}
+    mock_process_schema_by_section.assert_called_once_with(
+        current_version=DEFAULT_CURRENT_VERSION,
+        target_version=DEFAULT_TARGET_VERSION,
+        schema={"title": "<p>Title</p>", "sections": []},
+    )
+
+
+@pytest.mark.usefixtures("conversion_cache_enabled")
+def test_post_schema_repeat_is_served_from_cache(test_client: TestClient) -> None:
+    """Test that posting the same schema again, in any key order, is served from the conversion cache."""
+    url = f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}"
+    with patch(
+        "eq_cir_converter_service.services.schema.schema_processor.process_schema",
+        side_effect=lambda **kwargs: kwargs["input_schema"],
+    ) as mock_process_schema:
+        first_response = test_client.post(url, json={"title": "Title", "mime_type": "application/json"})
+        repeat_response = test_client.post(url, content=b'{"mime_type": "application/json", "title": "Title"}')
+        other_version_response = test_client.post(
+            f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={NO_CONVERSION_TARGET_VERSION}",
+            json={"title": "Title", "mime_type": "application/json"},
+        )
+
+    assert first_response.json() == repeat_response.json() == other_version_response.json()
+    assert mock_process_schema.call_count == 2
+    assert conversion_cache.stats()[:3] == (1, 2, 0)
+
+
+def test_post_schema_is_not_cached_when_cache_disabled(test_client: TestClient) -> None:
+    """Test that every post is converted while the conversion cache is disabled, as it is by default."""
+    url = f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}"
+    with patch(
+        "eq_cir_converter_service.services.schema.schema_processor.process_schema",
+        side_effect=lambda **kwargs: kwargs["input_schema"],
+    ) as mock_process_schema:
+        test_client.post(url, json=DEFAULT_RESPONSE_JSON)
+        test_client.post(url, json=DEFAULT_RESPONSE_JSON)
+
+    assert mock_process_schema.call_count == 2
+    assert conversion_cache.stats().entries == 0
+
+
+@pytest.mark.parametrize("endpoint", ["/schema", "/schema/raw"])
+def test_post_schema_patch_reproduces_converted_schema(test_client: TestClient, endpoint: str) -> None:
+    """Test that the JSON Patch response gives the converted schema when applied to the posted schema."""
+    with open("tests/integration/v10_conversion/input_schema.json", encoding="utf-8") as f:
+        input_schema = json.load(f)
+    with open("tests/integration/v10_conversion/output_schema.json", encoding="utf-8") as f:
+        expected_schema = json.load(f)
+
+    response = test_client.post(
+        f"{endpoint}?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}"
+        "&response_format=patch",
+        json=input_schema,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/json-patch+json"
+    assert apply_patch(input_schema, response.json()) == expected_schema
+
+
+def test_post_schema_patch_uses_process_pool(test_client: TestClient) -> None:
+    """Test that the JSON Patch for a schema above the process pool threshold is made in a worker process."""
+    with (
+        patch.object(conversion_process_pool, "accepts", return_value=True),
+        patch.object(
+            conversion_process_pool,
+            "process_schema_json",
+            side_effect=process_schema_json,
+        ) as mock_process_schema_json,
+    ):
+        response = test_client.post(
+            f"/schema/raw?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}"
+            "&response_format=patch",
+            content=b'{"title": "<b>Title</b>"}',
+        )
+
+    assert response.json() == [{"op": "replace", "path": "/title", "value": "<strong>Title</strong>"}]
+    assert mock_process_schema_json.call_args.kwargs["response_format"] == "patch"
+
+
+@pytest.mark.usefixtures("conversion_cache_enabled")
+def test_post_schema_patch_is_cached_apart_from_schema(test_client: TestClient) -> None:
+    """Test that the converted schema and the JSON Patch for the same schema are cached separately."""
+    url = f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}"
+
+    schema_response = test_client.post(url, json={"title": "<b>Title</b>"})
+    patch_response = test_client.post(f"{url}&response_format=patch", json={"title": "<b>Title</b>"})
+    repeat_patch_response = test_client.post(f"{url}&response_format=patch", json={"title": "<b>Title</b>"})
+
+    assert schema_response.json() == {"title": "<strong>Title</strong>"}
+    assert patch_response.json() == repeat_patch_response.json()
+    assert patch_response.json() == [{"op": "replace", "path": "/title", "value": "<strong>Title</strong>"}]
+    assert conversion_cache.stats()[:3] == (1, 2, 0)
+
+
+def test_post_schema_rejects_unknown_response_format(test_client: TestClient) -> None:
+    """Test that a response format other than schema or patch is rejected."""
+    response = test_client.post(
+        f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}"
+        "&response_format=diff",
+        json=DEFAULT_RESPONSE_JSON,
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_post_schema_converts_whole_schema_without_section_cache(test_client: TestClient) -> None:
+    """Test that a schema is converted whole, without the section headers, while the section cache is disabled."""
+    response = test_client.post(
+        f"/schema?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+        json={"title": "<p>Survey</p>", "sections": [{"id": "s0", "title": "<b>Section</b>"}]},
+    )
+
+    assert response.json() == {"title": "Survey", "sections": [{"id": "s0", "title": "<strong>Section</strong>"}]}
+    assert "x-sections-reused" not in response.headers
+    assert section_cache.stats().misses == 0
+
+
+@pytest.mark.usefixtures("section_cache_enabled")
+@pytest.mark.parametrize("endpoint", ["/schema", "/schema/raw"])
+def test_post_schema_reports_sections_reused_and_recomputed(test_client: TestClient, endpoint: str) -> None:
+    """Test that the response reports how many sections were reused from the section cache and converted again."""
+    url = f"{endpoint}?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}"
+    schema = {
+        "title": "<p>Survey</p>",
+        "sections": [{"id": f"s{index}", "title": "<b>Section</b>"} for index in range(3)],
+    }
+    edited_schema = {**schema, "sections": [*schema["sections"][:2], {"id": "s2", "title": "<p>Edited</p>"}]}
+
+    first_response = test_client.post(url, json=schema)
+    edited_response = test_client.post(url, json=edited_schema)
+    patch_response = test_client.post(f"{url}&response_format=patch", json=edited_schema)
+
+    assert (first_response.headers["x-sections-reused"], first_response.headers["x-sections-recomputed"]) == ("0", "3")
+    assert (edited_response.headers["x-sections-reused"], edited_response.headers["x-sections-recomputed"]) == (
+        "2",
+        "1",
+    )
+    assert edited_response.json() == {
+        "title": "Survey",
+        "sections": [
+            {"id": "s0", "title": "<strong>Section</strong>"},
+            {"id": "s1", "title": "<strong>Section</strong>"},
+            {"id": "s2", "title": "Edited"},
+        ],
+    }
+    assert "x-sections-reused" not in patch_response.headers
+
+
+@pytest.mark.parametrize(
+    "current_version, target_version, body",
+    [
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b'{"title": "<b>Title</b>"}'),
+        (DEFAULT_CURRENT_VERSION, NO_CONVERSION_TARGET_VERSION, b'{"title": "<b>Title</b>"}'),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b"{}"),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b""),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b"null"),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b'{"title": '),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b'["title"]'),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b'{"title": "\xff"}'),
+        ("1", DEFAULT_TARGET_VERSION, b'{"title": "Title"}'),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_CURRENT_VERSION, b'{"title": "Title"}'),
+    ],
+)
+def test_post_schema_raw_responds_as_post_schema(
+    test_client: TestClient,
+    current_version: str,
+    target_version: str,
+    body: bytes,
+) -> None:
+    """Test that the raw body endpoint gives the same response as POST /schema, for valid and invalid input."""
+    query = f"current_version={current_version}&target_version={target_version}"
+    headers = {"Content-Type": "application/json"}
+
+    response = test_client.post(f"/schema?{query}", content=body, headers=headers)
+    raw_response = test_client.post(f"/schema/raw?{query}", content=body, headers=headers)
+
+    assert raw_response.status_code == response.status_code
+    assert raw_response.content == response.content
+
+
+def test_post_schema_raw_parses_body_once(test_client: TestClient) -> None:
+    """Test that the raw body endpoint parses the request body itself, once, on a conversion worker thread."""
+    parse_threads = []
+
+    def record_thread(schema_json: bytes) -> object:
+        parse_threads.append(threading.current_thread().name)
+        return load_schema_json(schema_json)
+
+    with patch(
+        "eq_cir_converter_service.routers.schema_router.load_schema_json",
+        side_effect=record_thread,
+    ) as mock_load_schema_json:
+        response = test_client.post(
+            f"/schema/raw?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+            content=b'{"title": "<b>Title</b>"}',
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"title": "<strong>Title</strong>"}
+    mock_load_schema_json.assert_called_once_with(b'{"title": "<b>Title</b>"}')
+    assert parse_threads[0].startswith("conversion")
+
+
+def test_post_schema_raw_queue_full(test_client: TestClient) -> None:
+    """Test that the raw body is rejected with a 503 when the conversion queue is full before it is parsed."""
+    with patch(
+        "eq_cir_converter_service.routers.schema_router.conversion_executor.run",
+        side_effect=ConversionQueueFullError,
+    ):
+        response = test_client.post(
+            f"/schema/raw?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+            content=b'{"title": "Title"}',
+        )
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json() == {
+        "detail": {"status": "error", "message": exception_messages.EXCEPTION_503_CONVERSION_QUEUE_FULL},
+    }
+
+
+@pytest.mark.parametrize(
+    "current_version, target_version, body",
+    [
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b'{"title": "<b>Title</b>", "sections": [{"id": "s1"}]}'),
+        (DEFAULT_CURRENT_VERSION, NO_CONVERSION_TARGET_VERSION, b'{"title": "<b>Title</b>"}'),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, b"{}"),
+        ("1", DEFAULT_TARGET_VERSION, b'{"title": "Title"}'),
+        (DEFAULT_CURRENT_VERSION, DEFAULT_CURRENT_VERSION, b'{"title": "Title"}'),
+    ],
+)
+def test_post_schema_stream_responds_as_post_schema(
+    test_client: TestClient,
+    current_version: str,
+    target_version: str,
+    body: bytes,
+) -> None:
+    """Test that the streaming endpoint gives the same response as POST /schema, sending the body in chunks."""
+    query = f"current_version={current_version}&target_version={target_version}"
+
+    response = test_client.post(f"/schema?{query}", content=body, headers={"Content-Type": "application/json"})
+    stream_response = test_client.post(
+        f"/schema/stream?{query}",
+        content=iter([body[:5], body[5:20], body[20:]]),
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert stream_response.status_code == response.status_code
+    assert stream_response.content == response.content
+
+
+@pytest.mark.parametrize(
+    "body, message, position",
+    [
+        (b"", "Expecting object", 0),
+        (b'["title"]', "Expecting object", 0),
+        (b'{"title": ', "Expecting value", 10),
+        (b'{"title": "\xff"}', "Invalid UTF-8", 10),
+    ],
+)
+def test_post_schema_stream_invalid_json(test_client: TestClient, body: bytes, message: str, position: int) -> None:
+    """Test that a body that is not a JSON object is rejected before the response starts."""
+    response = test_client.post(
+        f"/schema/stream?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+        content=body,
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert response.json()["detail"] == [
+        {
+            "type": "json_invalid",
+            "loc": ["body", position],
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": message},
+        },
+    ]
+
+
+def test_post_schema_stream_exception_after_response_started(test_client: TestClient) -> None:
+    """Test that an exception raised after the response has started ends the response early."""
+    with (
+        patch(
+            "eq_cir_converter_service.services.schema.schema_processor.process_schema_part",
+            side_effect=ValueError("Mocked error"),
+        ),
+        pytest.raises(ValueError, match="Mocked error"),
+    ):
+        test_client.post(
+            f"/schema/stream?current_version={DEFAULT_CURRENT_VERSION}&target_version={DEFAULT_TARGET_VERSION}",
+            content=b'{"title": "Title"}',
+        )
+
+
+def batch_item(current_version: str, target_version: str, schema: object) -> dict:
+    """Returns an item of a batch request."""
+    return {"current_version": current_version, "target_version": target_version, "schema": schema}
+
+
+def test_post_schemas_batch(test_client: TestClient) -> None:
+    """Test that each schema in a batch gets its own result, with the versions validated once per pair."""
+    batch = [
+        batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {"title": "<b>First</b>"}),
+        batch_item("1", DEFAULT_TARGET_VERSION, {"title": "Title"}),
+        batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {}),
+        {"schema": {"title": "Title"}},
+        batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_CURRENT_VERSION, {"title": "Title"}),
+        batch_item(DEFAULT_CURRENT_VERSION, NO_CONVERSION_TARGET_VERSION, {"title": "<b>Second</b>"}),
+        batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {"title": "<b>Third</b>"}),
+        batch_item("1", DEFAULT_TARGET_VERSION, {"title": "Title"}),
+    ]
+    with patch(
+        "eq_cir_converter_service.utils.helper_utils.validate_version",
+        side_effect=validate_version,
+    ) as mock_validate_version:
+        response = test_client.post("/schemas/batch", json=batch)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "succeeded": 3,
+        "failed": 5,
+        "results": [
+            {"index": 0, "status": "success", "schema": {"title": "<strong>First</strong>"}},
+            {
+                "index": 1,
+                "status": "error",
+                "status_code": 400,
+                "message": exception_messages.exception_400_invalid_version("current"),
+            },
+            {
+                "index": 2,
+                "status": "error",
+                "status_code": 400,
+                "message": exception_messages.EXCEPTION_400_EMPTY_INPUT_JSON,
+            },
+            {
+                "index": 3,
+                "status": "error",
+                "status_code": 422,
+                "message": exception_messages.EXCEPTION_422_INVALID_BATCH_ITEM,
+            },
+            {
+                "index": 4,
+                "status": "error",
+                "status_code": 400,
+                "message": exception_messages.EXCEPTION_400_MATCHING_SCHEMA_VERSIONS,
+            },
+            {"index": 5, "status": "success", "schema": {"title": "<b>Second</b>"}},
+            {"index": 6, "status": "success", "schema": {"title": "<strong>Third</strong>"}},
+            {
+                "index": 7,
+                "status": "error",
+                "status_code": 400,
+                "message": exception_messages.exception_400_invalid_version("current"),
+            },
+        ],
+    }
+    # The four distinct pairs of versions are validated once each, and the invalid current version stops at the first
+    assert mock_validate_version.call_count == 7
+
+
+def test_post_schemas_batch_ndjson(test_client: TestClient) -> None:
+    """Test that a newline-delimited JSON batch gets newline-delimited JSON results."""
+    lines = [
+        json.dumps(batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {"title": "<b>Title</b>"})),
+        "not json",
+    ]
+    response = test_client.post(
+        "/schemas/batch",
+        content="\n".join(lines).encode(),
+        headers={"Content-Type": "application/x-ndjson; charset=utf-8"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"index": 0, "status": "success", "schema": {"title": "<strong>Title</strong>"}},
+        {
+            "index": 1,
+            "status": "error",
+            "status_code": 422,
+            "message": exception_messages.exception_422_invalid_batch_json("Expecting value: line 1 column 1 (char 0)"),
+        },
+    ]
+
+
+@pytest.mark.parametrize("body", [b"", b'{"schema": {}}', b"[1"])
+def test_post_schemas_batch_invalid_body(test_client: TestClient, body: bytes) -> None:
+    """Test that a batch that is not a JSON array is rejected as a whole."""
+    response = test_client.post("/schemas/batch", content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_post_schemas_batch_too_many_items(test_client: TestClient) -> None:
+    """Test that a batch with more items than the limit is rejected."""
+    batch = [batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, DEFAULT_RESPONSE_JSON)] * 3
+    with patch("eq_cir_converter_service.routers.schema_router.settings.CONVERSION_BATCH_MAX_ITEMS", 2):
+        response = test_client.post("/schemas/batch", json=batch)
+
+    assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+    assert response.json() == {
+        "detail": {"status": "error", "message": exception_messages.EXCEPTION_413_BATCH_TOO_LARGE},
+    }
+
+
+def test_post_schemas_batch_unexpected_exception_fails_only_its_item(test_client: TestClient) -> None:
+    """Test that an unexpected exception converting one schema does not stop the rest of the batch."""
+
+    def fail_second(**kwargs: object) -> object:
+        if kwargs["input_schema"] == {"title": "Second"}:
+            message = "Mocked error"
+            raise ValueError(message)
+        return kwargs["input_schema"]
+
+    batch = [
+        batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {"title": "First"}),
+        batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {"title": "Second"}),
+    ]
+    with patch(
+        "eq_cir_converter_service.services.schema.schema_processor.process_schema",
+        side_effect=fail_second,
+    ):
+        response = test_client.post("/schemas/batch", json=batch)
+
+    assert response.json()["results"] == [
+        {"index": 0, "status": "success", "schema": {"title": "First"}},
+        {
+            "index": 1,
+            "status": "error",
+            "status_code": 500,
+            "message": exception_messages.EXCEPTION_500_SCHEMA_PROCESSING,
+        },
+    ]
+
+
+def test_post_schemas_batch_concurrency_is_bounded(test_client: TestClient) -> None:
+    """Test that no more schemas from a batch are converted at the same time than the batch concurrency."""
+    lock = threading.Lock()
+    running = [0]
+    most_running = [0]
+
+    def record_running(**kwargs: object) -> object:
+        with lock:
+            running[0] += 1
+            most_running[0] = max(most_running[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return kwargs["input_schema"]
+
+    batch = [batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {"id": index}) for index in range(6)]
+    with (
+        patch("eq_cir_converter_service.routers.schema_router.settings.CONVERSION_BATCH_CONCURRENCY", 2),
+        patch(
+            "eq_cir_converter_service.services.schema.schema_processor.process_schema",
+            side_effect=record_running,
+        ),
+    ):
+        response = test_client.post("/schemas/batch", json=batch)
+
+    assert response.json()["succeeded"] == 6
+    assert 1 <= most_running[0] <= 2
+
+
+def test_post_schemas_batch_large_schema_uses_process_pool(test_client: TestClient) -> None:
+    """Test that a schema in a batch is serialised on a conversion worker thread and handed to the process pool."""
+    batch = [batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {"title": "<b>Title</b>"})]
+    accept_threads = []
+
+    def record_thread(size_bytes: int) -> bool:
+        accept_threads.append(threading.current_thread().name)
+        return size_bytes > 0
+
+    with (
+        patch.object(type(conversion_process_pool), "running", new_callable=PropertyMock, return_value=True),
+        patch.object(conversion_process_pool, "accepts", side_effect=record_thread) as mock_accepts,
+        patch.object(
+            conversion_process_pool,
+            "process_schema_json",
+            side_effect=process_schema_json,
+        ) as mock_process_schema_json,
+    ):
+        response = test_client.post("/schemas/batch", json=batch)
+
+    assert response.json()["results"] == [
+        {"index": 0, "status": "success", "schema": {"title": "<strong>Title</strong>"}},
+    ]
+    mock_accepts.assert_called_once_with(len(b'{"title":"<b>Title</b>"}'))
+    mock_process_schema_json.assert_called_once_with(
+        current_version=DEFAULT_CURRENT_VERSION,
+        target_version=DEFAULT_TARGET_VERSION,
+        schema_json=b'{"title":"<b>Title</b>"}',
+        response_format="schema",
+    )
+    assert len(accept_threads) == 1
+    assert accept_threads[0].startswith("conversion")
+
+
+def test_post_schemas_batch_small_schema_is_converted_in_process(test_client: TestClient) -> None:
+    """Test that a schema in a batch below the process pool threshold is converted on the worker thread."""
+    batch = [batch_item(DEFAULT_CURRENT_VERSION, DEFAULT_TARGET_VERSION, {"title": "<b>Title</b>"})]
+    with (
+        patch.object(type(conversion_process_pool), "running", new_callable=PropertyMock, return_value=True),
+        patch.object(conversion_process_pool, "accepts", return_value=False),
+        patch.object(conversion_process_pool, "process_schema_json") as mock_process_schema_json,
+    ):
+        response = test_client.post("/schemas/batch", json=batch)
+
+    assert response.json()["results"] == [
+        {"index": 0, "status": "success", "schema": {"title": "<strong>Title</strong>"}},
+    ]
+    mock_process_schema_json.assert_not_called()
@@ -1,10 +1,16 @@
 """This module contains the unit tests for the /status router."""
 
+import dataclasses
+from unittest.mock import patch
+
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from eq_cir_converter_service.config import settings
 from eq_cir_converter_service.routers.status_router import router
+from eq_cir_converter_service.services.schema.paths import PATHS
+from eq_cir_converter_service.services.schema.schema_processor import V10_COMPILED_PATHS
 
 app = FastAPI()
 app.include_router(router)
@@ -27,3 +33,83 @@ def test_status_unsupported_method(method):
     """Test that unsupported methods on /status return 405."""
     response = client.request(method, "/status")
     assert response.status_code == 405
+
+
+def test_conversion_status_endpoint():
+    """Test the GET /status/conversions endpoint reports the conversion counts and limits."""
+    response = client.get("/status/conversions")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "running": 0,
+        "queued": 0,
+        "max_workers": settings.CONVERSION_MAX_WORKERS,
+        "queue_limit": settings.CONVERSION_QUEUE_LIMIT,
+    }
+
+
+def test_conversion_cache_status_endpoint():
+    """Test the GET /status/conversion-cache endpoint reports the cache counters and size."""
+    response = client.get("/status/conversion-cache")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "invalidations": 0,
+        "entries": 0,
+        "size_bytes": 0,
+        "max_bytes": settings.CONVERSION_CACHE_MAX_BYTES,
+    }
+
+
+def test_section_cache_status_endpoint():
+    """Test the GET /status/section-cache endpoint reports the cache counters and size."""
+    response = client.get("/status/section-cache")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "entries": 0,
+        "size_bytes": 0,
+        "max_bytes": settings.CONVERSION_SECTION_CACHE_MAX_BYTES,
+    }
+
+
+def test_string_memo_status_endpoint():
+    """Test the GET /status/string-memo endpoint reports the memo counters and size."""
+    response = client.get("/status/string-memo")
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"hits", "misses", "hit_rate", "evictions", "entries", "max_entries"}
+    assert response.json()["max_entries"] == settings.CONVERSION_STRING_MEMO_SIZE
+
+
+def test_match_locations_status_endpoint():
+    """Test the GET /status/match-locations endpoint reports the cache counters and size."""
+    response = client.get("/status/match-locations")
+
+    assert response.status_code == 200
+    assert response.json()["single_pass"] is True
+    assert response.json()["max_entries"] == settings.CONVERSION_MATCH_LOCATION_CACHE_SIZE
+
+
+def test_match_locations_status_endpoint_without_matcher():
+    """Test the GET /status/match-locations endpoint when the v10 paths are not matched in a single pass."""
+    compiled_paths = dataclasses.replace(V10_COMPILED_PATHS, matcher=None, match_locations=None)
+    with patch("eq_cir_converter_service.routers.status_router.V10_COMPILED_PATHS", compiled_paths):
+        response = client.get("/status/match-locations")
+
+    assert response.json() == {"single_pass": False}
+
+
+def test_path_stats_status_endpoint():
+    """Test the GET /status/path-stats endpoint reports the totals for each v10 path."""
+    response = client.get("/status/path-stats")
+
+    assert response.status_code == 200
+    assert response.json()["enabled"] is bool(settings.CONVERSION_PATH_STATS)
+    assert len(response.json()["paths"]) == len(PATHS)
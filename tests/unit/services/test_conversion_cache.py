@@ -0,0 +1,133 @@
+"""Tests for the conversion cache."""
+
+import dataclasses
+import json
+import pathlib
+import zlib
+from unittest.mock import patch
+
+from eq_cir_converter_service.services.conversion_cache import (
+    ConversionCache,
+    ConversionCacheStats,
+    converter_fingerprint,
+)
+from eq_cir_converter_service.services.schema import schema_processor
+
+CONVERTED_JSON = json.dumps({"title": "Title", "sections": [{"id": "section"}] * 50}).encode()
+
+
+def make_key(cache: ConversionCache, schema: dict, target_version: str = "10.0.0") -> str:
+    """Returns the cache key for converting the schema from 9.0.0 to the target version."""
+    return cache.make_key(current_version="9.0.0", target_version=target_version, schema=schema)
+
+
+def test_get_returns_put_schema_and_counts_hits_and_misses():
+    """Test that a cached schema is returned decompressed and the lookups are counted."""
+    cache = ConversionCache(max_bytes=1024)
+    key = make_key(cache, {"title": "Title"})
+
+    assert cache.get(key) is None
+    cache.put(key, CONVERTED_JSON)
+
+    assert cache.get(key) == CONVERTED_JSON
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.size_bytes < len(CONVERTED_JSON)
+
+
+def test_key_is_canonical_and_covers_versions():
+    """Test that the key ignores the key order of the schema but not the versions."""
+    cache = ConversionCache(max_bytes=1024)
+
+    assert make_key(cache, {"a": 1, "b": [1, 2]}) == make_key(cache, {"b": [1, 2], "a": 1})
+    assert make_key(cache, {"a": 1}) != make_key(cache, {"a": 1}, target_version="10.0.1")
+    assert make_key(cache, {"a": [1, 2]}) != make_key(cache, {"a": [2, 1]})
+    assert make_key(cache, {"a": 1}) != cache.make_key(
+        current_version="9.0.0",
+        target_version="10.0.0",
+        schema={"a": 1},
+        response_format="patch",
+    )
+
+
+def test_put_evicts_least_recently_used_over_byte_budget():
+    """Test that the least recently used schema is evicted once the cache is over its byte budget."""
+    entry_size = len(zlib.compress(CONVERTED_JSON))
+    cache = ConversionCache(max_bytes=entry_size * 2)
+    keys = [make_key(cache, {"id": index}) for index in range(3)]
+
+    cache.put(keys[0], CONVERTED_JSON)
+    cache.put(keys[1], CONVERTED_JSON)
+    cache.get(keys[0])
+    cache.put(keys[2], CONVERTED_JSON)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == cache.get(keys[2]) == CONVERTED_JSON
+    assert cache.stats().evictions == 1
+    assert cache.stats().size_bytes == entry_size * 2
+
+
+def test_put_replaces_entry_and_skips_schema_larger_than_budget():
+    """Test that a key put twice is counted once and a schema larger than the cache is not stored."""
+    cache = ConversionCache(max_bytes=100)
+    key = make_key(cache, {"title": "Title"})
+
+    cache.put(key, b'{"title":"Title"}')
+    cache.put(key, b'{"title":"Title"}')
+    cache.put(make_key(cache, {"title": "Other"}), bytes(range(256)))
+
+    assert cache.stats().entries == 1
+    assert cache.stats().size_bytes == len(zlib.compress(b'{"title":"Title"}'))
+
+
+def test_cache_is_invalidated_when_paths_change():
+    """Test that a change to the JSONPath expressions gives new keys and drops the cached schemas."""
+    cache = ConversionCache(max_bytes=1024)
+    key = make_key(cache, {"title": "Title"})
+    cache.put(key, CONVERTED_JSON)
+
+    changed_paths = dataclasses.replace(
+        schema_processor.V10_COMPILED_PATHS,
+        paths=(*schema_processor.V10_COMPILED_PATHS.paths, "$.extra"),
+    )
+    with patch.object(schema_processor, "V10_COMPILED_PATHS", changed_paths):
+        changed_key = make_key(cache, {"title": "Title"})
+
+    assert changed_key != key
+    assert cache.get(key) is None
+    assert cache.stats().invalidations == 1
+
+
+def test_converter_fingerprint_covers_converter_source():
+    """Test that a change to the source of the converter code changes the fingerprint."""
+    paths = ("$.title",)
+    fingerprint = converter_fingerprint(paths)
+    converter_fingerprint.cache_clear()
+
+    with patch.object(pathlib.Path, "read_bytes", return_value=b"changed"):
+        changed_fingerprint = converter_fingerprint(paths)
+    converter_fingerprint.cache_clear()
+
+    assert changed_fingerprint != fingerprint
+    assert converter_fingerprint(("$.other",)) != fingerprint
+
+
+def test_clear_removes_entries_and_resets_counters():
+    """Test that clearing the cache removes the schemas and resets the counters."""
+    cache = ConversionCache(max_bytes=1024)
+    key = make_key(cache, {"title": "Title"})
+    cache.put(key, CONVERTED_JSON)
+    cache.get(key)
+
+    cache.clear()
+
+    assert cache.stats() == ConversionCacheStats(
+        hits=0,
+        misses=0,
+        evictions=0,
+        invalidations=0,
+        entries=0,
+        size_bytes=0,
+        max_bytes=1024,
+    )
+    assert not ConversionCache(max_bytes=0).enabled
@@ -0,0 +1,95 @@
+"""Tests for the conversion executor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from eq_cir_converter_service.services.conversion_executor import (
+    ConversionExecutor,
+    ConversionQueueFullError,
+    ConversionStats,
+)
+
+
+def test_run_returns_result_from_worker_thread():
+    """Test that the function runs on a conversion worker thread and its result is returned."""
+    executor = ConversionExecutor(max_workers=1, queue_limit=1)
+
+    result = asyncio.run(executor.run(lambda value: (value, threading.current_thread().name), "schema"))
+
+    assert result[0] == "schema"
+    assert result[1].startswith("conversion")
+    assert executor.stats() == ConversionStats(running=0, queued=0, max_workers=1, queue_limit=1)
+
+
+def test_run_raises_function_exception():
+    """Test that an exception raised by the function is raised to the caller."""
+    executor = ConversionExecutor(max_workers=1, queue_limit=1)
+
+    def fail() -> None:
+        message = "Conversion failed"
+        raise ValueError(message)
+
+    with pytest.raises(ValueError, match="Conversion failed"):
+        asyncio.run(executor.run(fail))
+    assert executor.stats().running == 0
+
+
+def test_stats_and_queue_limit_while_workers_are_busy():
+    """Test that conversions waiting for a busy worker are counted as queued, up to the queue limit."""
+    executor = ConversionExecutor(max_workers=1, queue_limit=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def block() -> str:
+        started.set()
+        release.wait(timeout=5)
+        return "done"
+
+    async def submit_conversions() -> tuple[list[str], list[ConversionStats]]:
+        running_task = asyncio.create_task(executor.run(block))
+        await asyncio.to_thread(started.wait, 5)
+        queued_task = asyncio.create_task(executor.run(lambda: "queued"))
+        await asyncio.sleep(0)
+        stats = [executor.stats()]
+
+        with pytest.raises(ConversionQueueFullError):
+            await executor.run(lambda: "rejected")
+
+        release.set()
+        results = [await running_task, await queued_task]
+        stats.append(executor.stats())
+        return results, stats
+
+    results, stats = asyncio.run(submit_conversions())
+
+    assert results == ["done", "queued"]
+    assert stats[0] == ConversionStats(running=1, queued=1, max_workers=1, queue_limit=1)
+    assert stats[1] == ConversionStats(running=0, queued=0, max_workers=1, queue_limit=1)
+
+
+def test_cancelled_conversion_leaves_queue():
+    """Test that a conversion cancelled before it starts is no longer counted as queued."""
+    executor = ConversionExecutor(max_workers=1, queue_limit=2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait(timeout=5)
+
+    async def cancel_queued_conversion() -> ConversionStats:
+        running_task = asyncio.create_task(executor.run(block))
+        await asyncio.to_thread(started.wait, 5)
+        queued_task = asyncio.create_task(executor.run(lambda: None))
+        await asyncio.sleep(0)
+        queued_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued_task
+        stats = executor.stats()
+        release.set()
+        await running_task
+        return stats
+
+    assert asyncio.run(cancel_queued_conversion()).queued == 0
@@ -0,0 +1,177 @@
+"""Tests for running schema conversions as jobs."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.services.conversion_executor import ConversionQueueFullError
+from eq_cir_converter_service.services.conversion_jobs import (
+    FAILED,
+    QUEUED,
+    SUCCEEDED,
+    ConversionJob,
+    ConversionJobQueue,
+    JobError,
+    JobQueueFullError,
+)
+from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.utils.helper_utils import dump_json
+
+INPUT_SCHEMA_PATH = "tests/integration/v10_conversion/input_schema.json"
+
+
+async def wait_for_job(job: ConversionJob) -> ConversionJob:
+    """Waits for the job to finish."""
+    while job.finished_at is None:
+        await asyncio.sleep(0.01)
+    return job
+
+
+async def run_job(jobs: ConversionJobQueue, schema: dict) -> ConversionJob:
+    """Runs a job to convert the schema to version 10.0.0 on the job queue and waits for it to finish."""
+    await jobs.start()
+    try:
+        job = jobs.submit(current_version="9.0.0", target_version="10.0.0", schema=schema)
+        assert job.status == QUEUED
+        return await wait_for_job(job)
+    finally:
+        await jobs.shutdown()
+
+
+def test_job_result_matches_synchronous_conversion():
+    """Test that the result of a job is the same, byte for byte, as the schema converted synchronously."""
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        schema = json.load(f)
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        expected_json = dump_json(
+            schema_processor.process_schema(
+                current_version="9.0.0",
+                target_version="10.0.0",
+                input_schema=json.load(f),
+            ),
+        )
+    jobs = ConversionJobQueue(runners=1, queue_limit=1, result_ttl_seconds=60, result_max_bytes=1024)
+
+    job = asyncio.run(run_job(jobs, schema))
+
+    assert job.status == SUCCEEDED
+    assert job.result == expected_json
+    assert jobs.get(job.job_id) is job
+    assert job.summary() == {
+        "job_id": job.job_id,
+        "status": SUCCEEDED,
+        "current_version": "9.0.0",
+        "target_version": "10.0.0",
+    }
+
+
+def test_failed_job_records_error():
+    """Test that a job that cannot be converted fails with the error POST /schema would give."""
+    expected_error = JobError(500, exception_messages.EXCEPTION_500_SCHEMA_PROCESSING)
+    jobs = ConversionJobQueue(runners=1, queue_limit=1, result_ttl_seconds=60, result_max_bytes=1024)
+    with patch(
+        "eq_cir_converter_service.services.conversion_jobs.conversion_executor.run",
+        side_effect=ValueError("Mocked error"),
+    ):
+        job = asyncio.run(run_job(jobs, {"title": "Title"}))
+
+    assert job.status == FAILED
+    assert job.result == expected_error
+    assert job.summary()["error"] == expected_error._asdict()
+
+
+def test_job_waits_while_conversion_queue_is_full():
+    """Test that a job that finds the conversion queue full is converted once there is room, rather than failing."""
+    jobs = ConversionJobQueue(runners=1, queue_limit=1, result_ttl_seconds=60, result_max_bytes=1024)
+    with (
+        patch("eq_cir_converter_service.services.conversion_jobs.QUEUE_FULL_RETRY_SECONDS", 0),
+        patch(
+            "eq_cir_converter_service.services.conversion_jobs.conversion_executor.run",
+            side_effect=[ConversionQueueFullError(), ConversionQueueFullError(), b'{"title":"Title"}'],
+        ) as mock_run,
+    ):
+        job = asyncio.run(run_job(jobs, {"title": "Title"}))
+
+    assert job.status == SUCCEEDED
+    assert job.result == b'{"title":"Title"}'
+    assert mock_run.call_count == 3
+
+
+def test_submit_before_start_is_rejected():
+    """Test that a job cannot be submitted before the job runners have been started."""
+    jobs = ConversionJobQueue(runners=1, queue_limit=1, result_ttl_seconds=60, result_max_bytes=1024)
+
+    with pytest.raises(RuntimeError, match="have not been started"):
+        jobs.submit(current_version="9.0.0", target_version="10.0.0", schema={"title": "Title"})
+
+
+def test_submit_when_queue_is_full_is_rejected():
+    """Test that a job is rejected when the queue is full, without being recorded."""
+    jobs = ConversionJobQueue(runners=0, queue_limit=1, result_ttl_seconds=60, result_max_bytes=1024)
+
+    async def submit_jobs() -> None:
+        await jobs.start()
+        await jobs.start()
+        try:
+            jobs.submit(current_version="9.0.0", target_version="10.0.0", schema={"title": "First"})
+            with pytest.raises(JobQueueFullError):
+                jobs.submit(current_version="9.0.0", target_version="10.0.0", schema={"title": "Second"})
+        finally:
+            await jobs.shutdown()
+
+    with patch.object(ConversionJobQueue, "_run_jobs"):
+        asyncio.run(submit_jobs())
+
+
+def test_finished_jobs_expire_after_retention_period():
+    """Test that a finished job is removed once it is older than the retention period, oldest first."""
+    jobs = ConversionJobQueue(runners=1, queue_limit=1, result_ttl_seconds=60, result_max_bytes=1024)
+
+    async def run_jobs() -> tuple[ConversionJob, ConversionJob]:
+        await jobs.start()
+        try:
+            first_job = await wait_for_job(
+                jobs.submit(current_version="9.0.0", target_version="10.0.0", schema={"title": "First"}),
+            )
+            await asyncio.sleep(0.05)
+            second_job = jobs.submit(current_version="9.0.0", target_version="10.0.0", schema={"title": "Second"})
+            return first_job, await wait_for_job(second_job)
+        finally:
+            await jobs.shutdown()
+
+    first_job, second_job = asyncio.run(run_jobs())
+    assert jobs.get(first_job.job_id) is first_job
+
+    with patch(
+        "eq_cir_converter_service.services.conversion_jobs.time.monotonic",
+        return_value=first_job.finished_at + 60.01,  # type: ignore[operator]
+    ):
+        assert jobs.get(first_job.job_id) is None
+        assert jobs.get(second_job.job_id) is second_job
+
+
+def test_finished_jobs_are_removed_over_result_byte_budget():
+    """Test that the oldest finished jobs are removed once the results are over the byte budget, keeping the newest."""
+    jobs = ConversionJobQueue(runners=1, queue_limit=1, result_ttl_seconds=60, result_max_bytes=40)
+
+    async def run_jobs() -> list[ConversionJob]:
+        await jobs.start()
+        try:
+            return [
+                await wait_for_job(
+                    jobs.submit(current_version="9.0.0", target_version="10.0.0", schema={"title": title}),
+                )
+                for title in ("First title", "Second title", "A third title that is over the budget on its own")
+            ]
+        finally:
+            await jobs.shutdown()
+
+    first_job, second_job, third_job = asyncio.run(run_jobs())
+
+    assert first_job.result == b'{"title":"First title"}'
+    assert jobs.get(first_job.job_id) is None
+    assert jobs.get(second_job.job_id) is None
+    assert jobs.get(third_job.job_id) is third_job
@@ -0,0 +1,180 @@
+"""Tests for the conversion process pool."""
+
+import copy
+import json
+from unittest.mock import patch
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from eq_cir_converter_service.services.conversion_process_pool import (
+    ConversionProcessPool,
+    initialise_worker,
+    process_schema_json,
+    process_sections_json,
+    split_by_size,
+)
+from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.utils.helper_utils import dump_json
+from tests.json_patch import apply_patch
+
+INPUT_SCHEMA_PATH = "tests/integration/v10_conversion/input_schema.json"
+OUTPUT_SCHEMA_PATH = "tests/integration/v10_conversion/output_schema.json"
+
+
+def test_process_schema_json_serialises_like_a_json_response():
+    """Test that the converted schema is serialised to the same bytes as a FastAPI JSON response."""
+    with open(INPUT_SCHEMA_PATH, "rb") as f:
+        input_json = f.read()
+    with open(OUTPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        expected_output = json.load(f)
+
+    output_json = process_schema_json(current_version="9.0.0", target_version="10.0.0", schema_json=input_json)
+
+    assert output_json == JSONResponse(expected_output).body
+
+
+def test_process_schema_json_returns_a_patch():
+    """Test that the JSON Patch for the schema is returned as JSON bytes when asked for."""
+    with open(INPUT_SCHEMA_PATH, "rb") as f:
+        input_json = f.read()
+    with open(OUTPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        expected_output = json.load(f)
+
+    patch_json = process_schema_json(
+        current_version="9.0.0",
+        target_version="10.0.0",
+        schema_json=input_json,
+        response_format="patch",
+    )
+
+    assert apply_patch(json.loads(input_json), json.loads(patch_json)) == expected_output
+
+
+def test_initialise_worker_sets_up_logging():
+    """Test that a worker process sets up logging when it starts."""
+    with patch("eq_cir_converter_service.services.conversion_process_pool.setup_logging") as mock_setup_logging:
+        initialise_worker()
+
+    mock_setup_logging.assert_called_once()
+
+
+def test_pool_of_size_zero_is_not_started():
+    """Test that with no worker processes every schema is converted in-process."""
+    pool = ConversionProcessPool(pool_size=0, threshold_bytes=0)
+
+    pool.start()
+
+    assert not pool.running
+    assert not pool.accepts(1024)
+    with pytest.raises(RuntimeError, match="has not been started"):
+        pool.process_schema_json(current_version="9.0.0", target_version="10.0.0", schema_json=b"{}")
+    pool.shutdown()
+
+
+def test_pool_converts_schemas_above_threshold_in_worker_process():
+    """Test that a started pool accepts schemas from the threshold and converts them in a worker process."""
+    pool = ConversionProcessPool(pool_size=1, threshold_bytes=100)
+    with open(INPUT_SCHEMA_PATH, "rb") as f:
+        input_json = f.read()
+    with open(OUTPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        expected_output = json.load(f)
+
+    pool.start()
+    try:
+        pool.start()
+
+        assert pool.running
+        assert not pool.accepts(99)
+        assert pool.accepts(100)
+        output_json = pool.process_schema_json(current_version="9.0.0", target_version="10.0.0", schema_json=input_json)
+    finally:
+        pool.shutdown()
+
+    assert json.loads(output_json) == expected_output
+    assert not pool.accepts(100)
+
+
+def make_questionnaire(section_count: int) -> dict:
+    """Returns the integration fixture schema with its section repeated, each with its own id and title."""
+    with open(INPUT_SCHEMA_PATH, encoding="utf-8") as f:
+        schema = json.load(f)
+    section = schema["sections"][0]
+    schema["sections"] = [
+        {**copy.deepcopy(section), "id": f"section-{index}", "title": f"<p>Section <b>{index}</b></p>"}
+        for index in range(section_count)
+    ]
+    return schema
+
+
+@pytest.mark.parametrize(
+    "sizes, chunk_count, expected_sizes",
+    [
+        ([10, 10, 10, 10], 2, [[10, 10], [10, 10]]),
+        ([30, 10, 10, 10], 2, [[30], [10, 10, 10]]),
+        ([10, 10, 10], 4, [[10], [10], [10]]),
+        ([10, 10, 10, 10, 10], 1, [[10, 10, 10, 10, 10]]),
+        ([], 2, []),
+    ],
+)
+def test_split_by_size(sizes, chunk_count, expected_sizes):
+    """Test that the items are split into runs of consecutive items of about the same total size."""
+    items = [bytes(size) for size in sizes]
+
+    chunks = split_by_size(items, chunk_count)
+
+    assert [[len(item) for item in chunk] for chunk in chunks] == expected_sizes
+    assert [item for chunk in chunks for item in chunk] == items
+
+
+def test_process_sections_json_returns_the_converted_sections():
+    """Test that a run of sections is converted and returned as a JSON array."""
+    sections_json = process_sections_json(
+        current_version="9.0.0",
+        target_version="10.0.0",
+        part_json=b'{"sections":[{"title":"<p>First</p>"},{"title":"<b>Second</b>"}]}',
+    )
+
+    assert sections_json == b'[{"title":"First"},{"title":"<strong>Second</strong>"}]'
+
+
+@pytest.mark.parametrize(
+    "parallel_min_sections, target_version, schema, expected",
+    [
+        (2, "10.0.0", {"sections": [{}, {}]}, True),
+        (0, "10.0.0", {"sections": [{}, {}]}, False),
+        (3, "10.0.0", {"sections": [{}, {}]}, False),
+        (2, "10.0.0", {"sections": {}}, False),
+        (2, "2.0.0", {"sections": [{}, {}]}, False),
+    ],
+    ids=["enabled", "disabled", "too few sections", "sections not a list", "no conversion"],
+)
+def test_splits_by_section(parallel_min_sections, target_version, schema, expected):
+    """Test that a schema is split by section only with enough sections and a conversion that converts them apart."""
+    pool = ConversionProcessPool(pool_size=2, threshold_bytes=0, parallel_min_sections=parallel_min_sections)
+
+    assert pool.splits_by_section(current_version="9.0.0", target_version=target_version, schema=schema) is expected
+
+
+def test_pool_converts_sections_in_parallel_with_the_same_output():
+    """Test that a schema split by section across worker processes gives the same JSON as converting it in one go."""
+    schema = make_questionnaire(5)
+    expected_json = dump_json(
+        schema_processor.process_schema(
+            current_version="9.0.0",
+            target_version="10.0.0",
+            input_schema=copy.deepcopy(schema),
+        ),
+    )
+    pool = ConversionProcessPool(pool_size=2, threshold_bytes=0, parallel_min_sections=2)
+
+    with pytest.raises(RuntimeError, match="has not been started"):
+        pool.process_schema_by_section(current_version="9.0.0", target_version="10.0.0", schema=schema)
+
+    pool.start()
+    try:
+        output_json = pool.process_schema_by_section(current_version="9.0.0", target_version="10.0.0", schema=schema)
+    finally:
+        pool.shutdown()
+
+    assert output_json == expected_json
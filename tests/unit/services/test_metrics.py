@@ -0,0 +1,114 @@
+"""Tests for the service metrics."""
+
+import pytest
+
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.services import metrics
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(3, "3"), (2.0, "2"), (0.25, "0.25"), (float("inf"), "+Inf")],
+)
+def test_format_value(value, expected):
+    """Test that sample values and bucket bounds are formatted as Prometheus expects."""
+    assert metrics.format_value(value) == expected
+
+
+def test_format_labels_escapes_values():
+    """Test that backslashes, double quotes and line feeds in label values are escaped."""
+    assert metrics.format_labels(("a", "b"), ('say "hi"\n', "C:\\")) == '{a="say \\"hi\\"\\n",b="C:\\\\"}'
+    assert metrics.format_labels((), ()) == ""
+
+
+def test_counter_renders_each_label_set():
+    """Test that a counter renders its help, type and a sample for each set of label values."""
+    counter = metrics.Counter("test_total", "A test counter.", ("kind",))
+    counter.inc("a")
+    counter.inc("a")
+    counter.inc("b", amount=3)
+
+    assert counter.render() == [
+        "# HELP test_total A test counter.",
+        "# TYPE test_total counter",
+        'test_total{kind="a"} 2',
+        'test_total{kind="b"} 3',
+    ]
+
+    counter.clear()
+    assert counter.render()[2:] == []
+
+
+def test_gauge_renders_its_value():
+    """Test that a gauge renders the value it is set to, or the value of its function."""
+    gauge = metrics.Gauge("test_gauge", "A test gauge.")
+    gauge.inc(3)
+    gauge.dec()
+
+    assert gauge.render()[1:] == ["# TYPE test_gauge gauge", "test_gauge 2"]
+
+    gauge.clear()
+    assert gauge.render()[2:] == ["test_gauge 0"]
+    assert metrics.Gauge("test_function", "A test gauge.", lambda: 7).render()[2:] == ["test_function 7"]
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that a histogram renders cumulative bucket counts, including +Inf, and the sum and count."""
+    histogram = metrics.Histogram("test_seconds", "A test histogram.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "/schema")
+
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{route="/schema",le="0.1"} 2',
+        'test_seconds_bucket{route="/schema",le="1"} 3',
+        'test_seconds_bucket{route="/schema",le="+Inf"} 4',
+        'test_seconds_sum{route="/schema"} 2.65',
+        'test_seconds_count{route="/schema"} 4',
+    ]
+
+    histogram.clear()
+    assert histogram.render()[2:] == []
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        (exception_messages.EXCEPTION_400_EMPTY_INPUT_JSON, exception_messages.EXCEPTION_400_EMPTY_INPUT_JSON),
+        (
+            exception_messages.exception_400_invalid_version("target"),
+            exception_messages.exception_400_invalid_version("{version_type}"),
+        ),
+        (
+            exception_messages.exception_422_invalid_batch_json("Expecting value: line 1 column 1 (char 0)"),
+            exception_messages.exception_422_invalid_batch_json("{error}"),
+        ),
+        ("Not Found", "other"),
+    ],
+)
+def test_error_message_label(message, expected):
+    """Test that errors are labelled with their exception message, with the variable parts of a message removed."""
+    assert metrics.error_message_label(message) == expected
+
+
+@pytest.mark.parametrize("target_version, expected", [("10.0.0", "10.0.0"), ("11.0.0", "other"), (None, "")])
+def test_target_version_label(target_version, expected):
+    """Test that only the target versions the service converts to are used as label values."""
+    assert metrics.target_version_label(target_version) == expected
+
+
+def test_record_error_and_timed_phase_are_rendered():
+    """Test that errors and conversion phases are rendered with the other metrics."""
+    metrics.record_error(400, exception_messages.EXCEPTION_400_EMPTY_INPUT_JSON)
+    with metrics.timed_phase("convert", "10.0.0"):
+        pass
+
+    rendered = metrics.render().decode()
+
+    message = exception_messages.EXCEPTION_400_EMPTY_INPUT_JSON
+    assert f'cir_converter_errors_total{{status_code="400",message="{message}"}} 1' in rendered.splitlines()
+    assert (
+        'cir_converter_conversion_phase_duration_seconds_count{phase="convert",target_version="10.0.0"} 1'
+        in rendered.splitlines()
+    )
+    assert "cir_converter_conversions_queued 0" in rendered.splitlines()
+    assert rendered.endswith("\n")
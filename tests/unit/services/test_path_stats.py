@@ -0,0 +1,56 @@
+"""Tests for the path statistics service."""
+
+from eq_cir_converter_service.converters.compiled_paths import compile_paths
+from eq_cir_converter_service.converters.path_timings import PathTimings
+from eq_cir_converter_service.services.path_stats import PathStats
+
+COMPILED_PATHS = compile_paths(("$.title", "$..description[*]"))
+
+
+def path_timings(process_seconds: list[float]) -> PathTimings:
+    """Returns the timings of a conversion with a match of each path."""
+    timings = PathTimings(len(process_seconds))
+    timings.matches = [1] * len(process_seconds)
+    timings.process_seconds = process_seconds
+    timings.walk_seconds = 0.001
+    return timings
+
+
+def test_report_without_conversions():
+    """Test that the report has every path with zero totals before any conversion is recorded."""
+    report = PathStats(enabled=False).report(COMPILED_PATHS)
+
+    assert report["enabled"] is False
+    assert report["conversions"] == 0
+    assert report["single_pass"] is True
+    assert report["walk_ms"] == 0
+    assert [path["path"] for path in report["paths"]] == ["$.title", "$..description[*]"]
+    assert all(path["matches"] == 0 and path["compile_ms"] >= 0 for path in report["paths"])
+
+
+def test_report_totals_the_conversions_slowest_path_first():
+    """Test that the report sums the recorded conversions and orders the paths by their time."""
+    stats = PathStats(enabled=True)
+    stats.record(path_timings([0.001, 0.002]))
+    stats.record(path_timings([0.001, 0.003]))
+
+    report = stats.report(COMPILED_PATHS)
+
+    assert report["conversions"] == 2
+    assert report["walk_ms"] == 2
+    assert [(path["path"], path["matches"], path["process_ms"]) for path in report["paths"]] == [
+        ("$..description[*]", 2, 5),
+        ("$.title", 2, 2),
+    ]
+
+
+def test_clear_removes_the_recorded_conversions():
+    """Test that clearing the statistics removes the recorded conversions."""
+    stats = PathStats(enabled=True)
+    stats.record(path_timings([0.001, 0.002]))
+
+    stats.clear()
+
+    report = stats.report(COMPILED_PATHS)
+    assert report["conversions"] == 0
+    assert all(path["matches"] == 0 for path in report["paths"])
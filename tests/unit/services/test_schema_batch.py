@@ -0,0 +1,79 @@
+"""Tests for reading a batch of schemas and writing the results."""
+
+import json
+
+import pytest
+from fastapi.exceptions import RequestValidationError
+
+from eq_cir_converter_service.exception import exception_messages
+from eq_cir_converter_service.services.schema.schema_batch import (
+    BatchItem,
+    BatchItemError,
+    BatchItemResult,
+    dump_results,
+    load_batch,
+)
+
+ITEM = {"current_version": "9.0.0", "target_version": "10.0.0", "schema": {"title": "Title"}}
+
+
+def invalid_item_error(position: int) -> BatchItemError:
+    """Returns the error for an item without the versions and schema to convert."""
+    return BatchItemError(position, 422, exception_messages.EXCEPTION_422_INVALID_BATCH_ITEM)
+
+
+def test_load_batch_array():
+    """Test that each item of a JSON array is read, with an error for each invalid item."""
+    batch = [ITEM, {**ITEM, "schema": []}, "item", {"target_version": "10.0.0", "schema": {}}, {**ITEM, "schema": {}}]
+
+    assert load_batch(json.dumps(batch).encode(), ndjson=False) == [
+        BatchItem(0, "9.0.0", "10.0.0", {"title": "Title"}),
+        invalid_item_error(1),
+        invalid_item_error(2),
+        invalid_item_error(3),
+        BatchItem(4, "9.0.0", "10.0.0", {}),
+    ]
+
+
+def test_load_batch_ndjson():
+    """Test that each non-blank line of newline-delimited JSON is read, with an error for each invalid line."""
+    batch_json = b"\n".join([json.dumps(ITEM).encode(), b"", b"{", b'"\xff"', b"[]", b"  "])
+
+    assert load_batch(batch_json, ndjson=True) == [
+        BatchItem(0, "9.0.0", "10.0.0", {"title": "Title"}),
+        BatchItemError(
+            1,
+            422,
+            exception_messages.exception_422_invalid_batch_json(
+                "Expecting property name enclosed in double quotes: line 1 column 2 (char 1)",
+            ),
+        ),
+        BatchItemError(2, 422, exception_messages.exception_422_invalid_batch_json("invalid UTF-8")),
+        invalid_item_error(3),
+    ]
+
+
+@pytest.mark.parametrize("batch_json", [b"", b"[", b"{}", b"null"])
+def test_load_batch_rejects_body_that_is_not_an_array(batch_json):
+    """Test that a batch that is not a JSON array is rejected as a whole."""
+    with pytest.raises(RequestValidationError):
+        load_batch(batch_json, ndjson=False)
+
+
+def test_dump_results():
+    """Test that the results are written in order, with the converted schemas joined in as they are."""
+    results = [BatchItemResult(0, b'{"title":"T\xc3\xa9"}'), BatchItemError(1, 400, 'Bad "version"')]
+
+    assert json.loads(dump_results(results, ndjson=False)) == {
+        "succeeded": 1,
+        "failed": 1,
+        "results": [
+            {"index": 0, "status": "success", "schema": {"title": "Té"}},
+            {"index": 1, "status": "error", "status_code": 400, "message": 'Bad "version"'},
+        ],
+    }
+    assert [json.loads(line) for line in dump_results(results, ndjson=True).splitlines()] == [
+        {"index": 0, "status": "success", "schema": {"title": "Té"}},
+        {"index": 1, "status": "error", "status_code": 400, "message": 'Bad "version"'},
+    ]
+    assert dump_results([], ndjson=False) == b'{"succeeded":0,"failed":0,"results":[]}'
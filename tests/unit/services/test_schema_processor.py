@@ -1,6 +1,20 @@
 """Tests for the schema processor service."""
 
+import contextvars
+import copy
+import json
+from unittest.mock import patch
+
+import pytest
+
+from eq_cir_converter_service.converters.registry import ConversionStep, ConverterRegistry, compile_plan
+from eq_cir_converter_service.converters.v10 import process_match
+from eq_cir_converter_service.services.path_stats import PathStats
 from eq_cir_converter_service.services.schema import schema_processor
+from eq_cir_converter_service.services.schema.paths import PATHS
+from eq_cir_converter_service.services.section_cache import count_sections, section_cache
+from eq_cir_converter_service.utils.helper_utils import dump_json
+from tests.json_patch import apply_patch
 
 
 def test_convert_schema_to_v10():
@@ -33,3 +47,208 @@ def test_convert_schema_no_conversion():
         },
     )
     assert result == {"sections": [{"title": "<p>Your test results</p>"}]}
+
+
+def test_convert_schema_to_v10_uses_compiled_paths():
+    """Test that the v10 conversion plan applies the paths compiled at startup, in a single stage."""
+    plan = schema_processor.converter_registry.plan("1.0.0", "10.0.0")
+
+    assert plan.step_names == ("v10",)
+    assert len(plan.stages) == 1
+    assert plan.stages[0].compiled_paths is schema_processor.V10_COMPILED_PATHS
+    assert schema_processor.V10_COMPILED_PATHS.paths == tuple(PATHS)
+
+
+def test_process_schema_uses_cached_plan():
+    """Test that the conversion plan between two versions is compiled once and reused."""
+    registry = ConverterRegistry(max_plans=8)
+    registry.register(ConversionStep("v10", "*", "10.0.0", paths=("$.title",), process=process_match))
+
+    with (
+        patch.object(schema_processor, "converter_registry", registry),
+        patch("eq_cir_converter_service.converters.registry.compile_plan", wraps=compile_plan) as mock_compile,
+    ):
+        for title in ("<p>First</p>", "<p>Second</p>"):
+            result = schema_processor.process_schema(
+                current_version="9.0.0",
+                target_version="10.0.0",
+                input_schema={"title": title},
+            )
+
+    assert result == {"title": "Second"}
+    mock_compile.assert_called_once()
+
+
+def test_process_schema_patch():
+    """Test that the patch for a schema gives the converted schema when applied to it, leaving the schema unchanged."""
+    input_schema = {
+        "title": "<b>Survey</b>",
+        "legal_basis": "Notice",
+        "sections": [{"title": "<p>Your test results</p>", "groups": []}],
+    }
+    expected_schema = schema_processor.process_schema(
+        current_version="1.0.0",
+        target_version="10.0.0",
+        input_schema=copy.deepcopy(input_schema),
+    )
+
+    patch_operations = schema_processor.process_schema_patch(
+        current_version="1.0.0",
+        target_version="10.0.0",
+        input_schema=input_schema,
+    )
+
+    assert patch_operations == [
+        {"op": "replace", "path": "/title", "value": "<strong>Survey</strong>"},
+        {"op": "replace", "path": "/sections/0/title", "value": "Your test results"},
+    ]
+    assert apply_patch(copy.deepcopy(input_schema), patch_operations) == expected_schema
+    assert input_schema["title"] == "<b>Survey</b>"
+
+
+def test_process_schema_patch_no_conversion():
+    """Test that the patch is empty when no conversion is needed."""
+    assert not schema_processor.process_schema_patch(
+        current_version="1.0.0",
+        target_version="2.0.0",
+        input_schema={"title": "<p>Survey</p>"},
+    )
+
+
+def test_process_schema_part():
+    """Test converting part of a schema to version 10.0.0, and leaving it as is for other versions."""
+    schema_part = {"sections": [{"title": "<p>Your test results</p>"}]}
+
+    assert schema_processor.process_schema_part(
+        current_version="1.0.0",
+        target_version="2.0.0",
+        schema_part=schema_part,
+    ) == {"sections": [{"title": "<p>Your test results</p>"}]}
+    assert schema_processor.process_schema_part(
+        current_version="1.0.0",
+        target_version="10.0.0",
+        schema_part=schema_part,
+    ) == {"sections": [{"title": "Your test results"}]}
+
+
+def test_process_schema_json():
+    """Test that the processed schema, or its patch, is returned serialised as JSON bytes."""
+    input_schema = {"title": "<p>Survey</p>"}
+
+    assert (
+        schema_processor.process_schema_json(
+            current_version="1.0.0",
+            target_version="10.0.0",
+            input_schema=copy.deepcopy(input_schema),
+        )
+        == b'{"title":"Survey"}'
+    )
+    assert json.loads(
+        schema_processor.process_schema_json(
+            current_version="1.0.0",
+            target_version="10.0.0",
+            input_schema=input_schema,
+            response_format="patch",
+        ),
+    ) == [{"op": "replace", "path": "/title", "value": "Survey"}]
+
+
+def test_v10_sections_convert_separately():
+    """Test that the v10 paths only match within a section, so each section can be converted on its own."""
+    assert schema_processor.V10_SECTIONS_CONVERT_SEPARATELY
+
+
+def test_convert_schema_to_v10_records_path_stats():
+    """Test that converting a schema records the time spent on each path when path statistics are enabled."""
+    stats = PathStats(enabled=True)
+
+    with patch.object(schema_processor, "path_stats", stats):
+        plan = schema_processor.converter_registry.plan("9.0.0", "10.0.0")
+        result = schema_processor.convert_with_plan(plan, {"title": "<p>Survey</p>"})
+
+    assert result == {"title": "Survey"}
+    report = stats.report(schema_processor.V10_COMPILED_PATHS)
+    assert report["conversions"] == 1
+    assert {path["path"]: path["matches"] for path in report["paths"]}["$.title"] == 1
+
+
+def make_questionnaire(section_count: int) -> dict:
+    """Returns the integration fixture schema with its section repeated, each with its own id and title."""
+    with open("tests/integration/v10_conversion/input_schema.json", encoding="utf-8") as f:
+        schema = json.load(f)
+    section = schema["sections"][0]
+    schema["sections"] = [
+        {**copy.deepcopy(section), "id": f"section-{index}", "title": f"<p>Section {index}</p>"}
+        for index in range(section_count)
+    ]
+    return schema
+
+
+def convert_whole(schema: dict) -> dict:
+    """Returns the schema converted to version 10.0.0 in one go, without the section cache."""
+    with patch.object(section_cache, "max_bytes", 0):
+        return schema_processor.process_schema(
+            current_version="9.0.0",
+            target_version="10.0.0",
+            input_schema=copy.deepcopy(schema),
+        )
+
+
+@pytest.mark.usefixtures("section_cache_enabled")
+def test_process_schema_reconverts_changed_sections_only():
+    """Test that only the edited section is converted again, with the same output as converting the whole schema."""
+    schema = make_questionnaire(4)
+    edited_schema = copy.deepcopy(schema)
+    edited_schema["sections"][2]["title"] = "<p>Edited <b>section</b></p>"
+    edited_schema["title"] = "<p>Edited survey</p>"
+
+    context = contextvars.copy_context()
+    results = []
+    for input_schema in (schema, edited_schema):
+        section_counts = context.run(count_sections)
+        output_schema = context.run(
+            schema_processor.process_schema,
+            current_version="9.0.0",
+            target_version="10.0.0",
+            input_schema=copy.deepcopy(input_schema),
+        )
+        results.append((output_schema, section_counts.reused, section_counts.recomputed))
+
+    assert results[0][1:] == (0, 4)
+    assert results[1][1:] == (3, 1)
+    for (output_schema, _, _), input_schema in zip(results, (schema, edited_schema), strict=True):
+        assert dump_json(output_schema) == dump_json(convert_whole(input_schema))
+    assert results[1][0]["title"] == "Edited survey"
+    assert results[1][0]["sections"][2]["title"] == "Edited <strong>section</strong>"
+
+
+@pytest.mark.usefixtures("section_cache_enabled")
+def test_process_schema_reuses_cached_parts_without_request_counts():
+    """Test that the parts of a schema are reused outside a request, where the sections are not counted."""
+    schema = make_questionnaire(2)
+    for _ in range(2):
+        output_schema = schema_processor.process_schema(
+            current_version="9.0.0",
+            target_version="10.0.0",
+            input_schema=copy.deepcopy(schema),
+        )
+
+    assert output_schema == convert_whole(schema)
+    assert section_cache.stats()[:2] == (3, 3)
+
+
+@pytest.mark.usefixtures("section_cache_enabled")
+def test_process_schema_converts_whole_schema_when_sections_depend_on_each_other():
+    """Test that a plan with a path matching the sections list as a whole converts the schema in one go."""
+    registry = ConverterRegistry(max_plans=8)
+    registry.register(ConversionStep("v10", "*", "10.0.0", paths=("$.sections[*]",), process=process_match))
+
+    with patch.object(schema_processor, "converter_registry", registry):
+        output_schema = schema_processor.process_schema(
+            current_version="9.0.0",
+            target_version="10.0.0",
+            input_schema={"sections": ["<p>First</p><p>Second</p>"]},
+        )
+
+    assert output_schema == {"sections": ["First", "Second"]}
+    assert section_cache.stats().misses == 0
@@ -0,0 +1,110 @@
+"""Tests for streaming the converted schema."""
+
+import asyncio
+import json
+import threading
+from collections.abc import AsyncIterator
+from unittest.mock import patch
+
+import pytest
+
+from eq_cir_converter_service.services.schema import schema_processor, schema_streamer
+from eq_cir_converter_service.utils.helper_utils import dump_json
+from tests.benchmarks.schemas import scaled_schema
+
+
+async def in_chunks(document: bytes, chunk_size: int) -> AsyncIterator[bytes]:
+    """Yields the document in chunks of the given size, like a request body."""
+    for start in range(0, len(document), chunk_size):
+        yield document[start : start + chunk_size]
+
+
+def stream(document: bytes, *, target_version: str = "10.0.0", chunk_size: int = 100) -> bytes:
+    """Streams the converted document and returns all of it."""
+
+    async def collect() -> bytes:
+        events = schema_streamer.read_schema_events(in_chunks(document, chunk_size))
+        first_event = await anext(events)
+        return b"".join(
+            [
+                chunk
+                async for chunk in schema_streamer.stream_converted_schema(
+                    current_version="9.0.0",
+                    target_version=target_version,
+                    first_event=first_event,
+                    events=events,
+                )
+            ],
+        )
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        scaled_schema(3),
+        {"title": "<b>Title</b>", "sections": []},
+        {"sections": [{"id": "s1", "title": "<p>First</p>"}], "mime_type": "application/json", "empty": {}},
+    ],
+)
+def test_streamed_schema_matches_converted_schema(schema):
+    """Test that the streamed schema is the same, byte for byte, as the schema converted as a whole."""
+    expected = dump_json(
+        schema_processor.process_schema(current_version="9.0.0", target_version="10.0.0", input_schema=schema),
+    )
+
+    assert stream(json.dumps(schema, indent=2).encode()) == expected
+
+
+def test_streamed_schema_converts_each_section_separately():
+    """Test that each section is converted on its own, and each other member on its own."""
+    schema = scaled_schema(3)
+    with patch(
+        "eq_cir_converter_service.services.schema.schema_processor.process_schema_part",
+        side_effect=schema_processor.process_schema_part,
+    ) as mock_process_schema_part:
+        stream(json.dumps(schema).encode())
+
+    schema_parts = [call.kwargs["schema_part"] for call in mock_process_schema_part.call_args_list]
+    section_ids = [section["id"] for part in schema_parts for section in part.get("sections", [])]
+    assert section_ids == [section["id"] for section in schema["sections"]]
+    assert all(len(part) == 1 and len(part.get("sections", [None])) == 1 for part in schema_parts)
+
+
+def test_streamed_schema_is_serialised_off_the_event_loop():
+    """Test that each converted member and section is serialised on a conversion worker thread."""
+    threads = []
+
+    def record_thread(value: object) -> bytes:
+        if not isinstance(value, str):
+            threads.append(threading.current_thread().name)
+        return dump_json(value)
+
+    with patch("eq_cir_converter_service.services.schema.schema_streamer.dump_json", side_effect=record_thread):
+        stream(json.dumps({"metadata": [{"name": "ru_ref"}], "sections": [{"title": "<p>Section</p>"}]}).encode())
+
+    assert len(threads) == 2
+    assert all(name.startswith("conversion") for name in threads)
+
+
+def test_streamed_schema_is_not_converted_for_other_versions():
+    """Test that the schema is streamed back unchanged when the target version has no conversion."""
+    schema = {"title": "<b>Title</b>", "sections": [{"title": "<p>Section</p>"}]}
+
+    assert stream(json.dumps(schema).encode(), target_version="9.0.5") == dump_json(schema)
+
+
+def test_streamed_schema_exception_is_logged_and_raised():
+    """Test that an error after the response has started is logged and ends the stream."""
+    with (
+        patch(
+            "eq_cir_converter_service.services.schema.schema_processor.process_schema_part",
+            side_effect=ValueError("Mocked error"),
+        ),
+        patch("eq_cir_converter_service.services.schema.schema_streamer.logger") as mock_logger,
+        pytest.raises(ValueError, match="Mocked error"),
+    ):
+        stream(b'{"title": "Title"}')
+
+    mock_logger.exception.assert_called_once_with("An exception occurred while streaming the converted schema")
@@ -0,0 +1,92 @@
+"""Tests for the section cache."""
+
+import asyncio
+import contextvars
+
+from eq_cir_converter_service.services.section_cache import (
+    SectionCache,
+    SectionCacheStats,
+    count_sections,
+    request_section_counts,
+)
+
+CONVERTED_JSON = b'{"sections":[{"id":"section","title":"Title"}]}'
+
+
+def make_key(part_json: bytes, target_version: str = "10.0.0") -> bytes:
+    """Returns the cache key for converting the part from 9.0.0 to the target version."""
+    return SectionCache.make_key(current_version="9.0.0", target_version=target_version, part_json=part_json)
+
+
+def test_get_returns_put_part_and_counts_hits_and_misses():
+    """Test that a cached part is returned and the lookups are counted."""
+    cache = SectionCache(max_bytes=1024)
+    key = make_key(b'{"sections":[{"id":"section"}]}')
+
+    assert cache.get(key) is None
+    cache.put(key, CONVERTED_JSON)
+
+    assert cache.get(key) == CONVERTED_JSON
+    assert cache.stats() == SectionCacheStats(
+        hits=1,
+        misses=1,
+        evictions=0,
+        entries=1,
+        size_bytes=len(CONVERTED_JSON),
+        max_bytes=1024,
+    )
+
+
+def test_key_covers_versions_and_key_order():
+    """Test that the key depends on the versions and on the key order of the part, which the converted part keeps."""
+    assert make_key(b'{"a":1}') == make_key(b'{"a":1}')
+    assert make_key(b'{"a":1}') != make_key(b'{"a":1}', target_version="10.0.1")
+    assert make_key(b'{"a":1,"b":2}') != make_key(b'{"b":2,"a":1}')
+
+
+def test_put_evicts_least_recently_used_over_byte_budget():
+    """Test that the least recently used part is evicted once the cache is over its byte budget."""
+    cache = SectionCache(max_bytes=len(CONVERTED_JSON) * 2)
+    keys = [make_key(str(index).encode()) for index in range(3)]
+
+    cache.put(keys[0], CONVERTED_JSON)
+    cache.put(keys[1], CONVERTED_JSON)
+    cache.get(keys[0])
+    cache.put(keys[2], CONVERTED_JSON)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == cache.get(keys[2]) == CONVERTED_JSON
+    assert cache.stats().evictions == 1
+    assert cache.stats().size_bytes == len(CONVERTED_JSON) * 2
+
+
+def test_put_replaces_entry_and_skips_part_larger_than_budget():
+    """Test that a key put twice is counted once, a part larger than the cache is not stored, and clear empties it."""
+    cache = SectionCache(max_bytes=100)
+    key = make_key(b'{"title":"Title"}')
+
+    cache.put(key, b'{"title":"Title"}')
+    cache.put(key, b'{"title":"Title"}')
+    cache.put(make_key(b'{"title":"Other"}'), bytes(200))
+
+    assert cache.stats().entries == 1
+    assert cache.stats().size_bytes == len(b'{"title":"Title"}')
+
+    cache.clear()
+    assert cache.stats() == SectionCacheStats(0, 0, 0, 0, 0, 100)
+    assert not SectionCache(max_bytes=0).enabled
+
+
+def test_count_sections_is_seen_by_worker_threads():
+    """Test that the counts started for a request are the ones updated by a conversion on a worker thread."""
+
+    async def count_on_worker_thread():
+        section_counts = count_sections()
+        worker_counts = await asyncio.to_thread(request_section_counts.get)
+        return section_counts, worker_counts
+
+    section_counts, worker_counts = contextvars.copy_context().run(asyncio.run, count_on_worker_thread())
+
+    assert worker_counts is section_counts
+    assert (section_counts.converted, section_counts.reused, section_counts.recomputed) == (False, 0, 0)
+    assert request_section_counts.get() is None
@@ -0,0 +1,53 @@
+"""Tests for the timing of the phases of a request for the Server-Timing header."""
+
+import re
+
+from eq_cir_converter_service.services import server_timing
+from eq_cir_converter_service.services.server_timing import ServerTiming, request_server_timing
+
+
+def test_server_timing_header_value():
+    """Test that the header has each phase, in the order first recorded, with repeated phases summed, and the total."""
+    timing = ServerTiming()
+    timing.add("validate", 0.001)
+    timing.add("convert", 0.0025)
+    timing.add("validate", 0.0005)
+
+    assert re.fullmatch(r"validate;dur=1\.500, convert;dur=2\.500, total;dur=\d+\.\d{3}", timing.header_value())
+
+
+def test_lap_records_the_time_since_the_mark():
+    """Test that a lap records the time since the mark and moves the mark."""
+    timing = ServerTiming()
+    timing.mark -= 0.5
+
+    timing.lap("parse")
+
+    assert timing.durations["parse"] >= 0.5
+    assert timing.mark >= timing.start
+
+
+def test_phases_are_ignored_when_not_timing_the_request():
+    """Test that phases of a request whose phases are not being timed are not recorded anywhere."""
+    server_timing.add("convert", 1.0)
+    server_timing.lap("parse")
+    with server_timing.timed("validate"):
+        pass
+
+    assert request_server_timing.get() is None
+
+
+def test_phases_are_added_to_the_request_timing():
+    """Test that phases are added to the timing of the current request."""
+    timing = ServerTiming()
+    token = request_server_timing.set(timing)
+    try:
+        server_timing.add("convert", 1.0)
+        server_timing.lap("parse")
+        with server_timing.timed("validate"):
+            pass
+    finally:
+        request_server_timing.reset(token)
+
+    assert list(timing.durations) == ["convert", "parse", "validate"]
+    assert timing.durations["convert"] == 1.0
@@ -0,0 +1,47 @@
+"""Tests for the FastAPI application entry point."""
+
+import importlib
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+import eq_cir_converter_service.main as app
+from eq_cir_converter_service.middleware.server_timing_middleware import ServerTimingMiddleware
+
+
+def test_lifespan_starts_and_stops_process_pool():
+    """Test that the conversion worker processes are started with the application and stopped with it."""
+    with (
+        patch.object(app.conversion_process_pool, "start") as mock_start,
+        patch.object(app.conversion_process_pool, "shutdown") as mock_shutdown,
+    ):
+        with TestClient(app.app):
+            mock_start.assert_called_once()
+            mock_shutdown.assert_not_called()
+
+        mock_shutdown.assert_called_once()
+
+
+def test_lifespan_starts_and_stops_job_runners():
+    """Test that the conversion job runners are started with the application and stopped with it."""
+    with (
+        patch.object(app.conversion_jobs, "start", new_callable=AsyncMock) as mock_start,
+        patch.object(app.conversion_jobs, "shutdown", new_callable=AsyncMock) as mock_shutdown,
+    ):
+        with TestClient(app.app):
+            mock_start.assert_awaited_once()
+            mock_shutdown.assert_not_awaited()
+
+        mock_shutdown.assert_awaited_once()
+
+
+def test_server_timing_middleware_is_only_added_when_enabled():
+    """Test that the Server-Timing middleware is added to the application only when it is enabled."""
+    assert ServerTimingMiddleware not in [middleware.cls for middleware in app.app.user_middleware]
+
+    try:
+        with patch.object(app.settings, "SERVER_TIMING_ENABLED", 1):
+            importlib.reload(app)
+        assert ServerTimingMiddleware in [middleware.cls for middleware in app.app.user_middleware]
+    finally:
+        importlib.reload(app)
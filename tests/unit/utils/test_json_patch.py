@@ -0,0 +1,104 @@
+"""Tests for the JSON Patch operations between two JSON documents."""
+
+import copy
+
+import pytest
+
+from eq_cir_converter_service.utils.json_patch import make_patch
+from tests.json_patch import apply_patch
+
+
+@pytest.mark.parametrize(
+    "source, target, expected_operations",
+    [
+        ({"a": 1}, {"a": 1}, []),
+        ({"a": 1}, {"a": 2}, [{"op": "replace", "path": "/a", "value": 2}]),
+        ({"a": 1}, {"a": True}, [{"op": "replace", "path": "/a", "value": True}]),
+        ({"a": 1, "b": 2}, {"b": 2, "c": 3}, [{"op": "remove", "path": "/a"}, {"op": "add", "path": "/c", "value": 3}]),
+        ({"a/b": {"c~d": 1}}, {"a/b": {"c~d": 2}}, [{"op": "replace", "path": "/a~1b/c~0d", "value": 2}]),
+        ({"a": [1, 2]}, {"a": {"b": 1}}, [{"op": "replace", "path": "/a", "value": {"b": 1}}]),
+        ([1, 2, 3], [1, 5, 3], [{"op": "replace", "path": "/1", "value": 5}]),
+        ("a", "b", [{"op": "replace", "path": "", "value": "b"}]),
+    ],
+)
+def test_make_patch(source, target, expected_operations):
+    """Test the operations between two documents, and that applying them to the source gives the target."""
+    operations = make_patch(source, target)
+
+    assert operations == expected_operations
+    assert apply_patch(copy.deepcopy(source), operations) == target
+
+
+@pytest.mark.parametrize(
+    "source, target, expected_operations",
+    [
+        # An item split into several items
+        (
+            ["a", "<p>b</p><p>c</p>", "d"],
+            ["a", "b", "c", "d"],
+            [{"op": "replace", "path": "/1", "value": "b"}, {"op": "add", "path": "/2", "value": "c"}],
+        ),
+        # Two items split into several items each, with the indexes moved along by the first
+        (
+            ["a", "bc", "d", "ef"],
+            ["a", "b", "c", "d", "e", "f"],
+            [
+                {"op": "replace", "path": "/1", "value": "b"},
+                {"op": "add", "path": "/2", "value": "c"},
+                {"op": "replace", "path": "/4", "value": "e"},
+                {"op": "add", "path": "/5", "value": "f"},
+            ],
+        ),
+        # Items removed
+        (
+            ["a", "b", "c", "d"],
+            ["a", "d"],
+            [{"op": "remove", "path": "/1"}, {"op": "remove", "path": "/1"}],
+        ),
+        # Items added to an empty list
+        ([], [1, 2], [{"op": "add", "path": "/0", "value": 1}, {"op": "add", "path": "/1", "value": 2}]),
+    ],
+)
+def test_make_patch_splices_lists(source, target, expected_operations):
+    """Test that the unchanged items of lists of different lengths are aligned, so only changed items are patched."""
+    operations = make_patch(source, target)
+
+    assert operations == expected_operations
+    assert apply_patch(copy.deepcopy(source), operations) == target
+
+
+def test_make_patch_skips_shared_values():
+    """Test that a dictionary or list shared by both documents is not walked."""
+
+    class Unwalkable(dict):
+        """A dictionary that fails the test if it is compared or iterated."""
+
+        def __iter__(self):
+            raise AssertionError
+
+        def __eq__(self, other):
+            raise AssertionError
+
+        __hash__ = dict.__hash__
+
+    shared = Unwalkable(a=1)
+    source = {"shared": shared, "items": [shared, {"b": 1}], "title": "Title"}
+    target = {"shared": shared, "items": [shared, {"b": 2}, shared], "title": "Title"}
+
+    assert make_patch(source, target) == [
+        {"op": "replace", "path": "/items/1/b", "value": 2},
+        {"op": "add", "path": "/items/2", "value": shared},
+    ]
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"op": "move", "from": "/a", "path": "/b"},
+        {"op": "remove", "path": ""},
+    ],
+)
+def test_apply_patch_rejects_unsupported_operations(operation):
+    """Test that an operation not made by make_patch is rejected."""
+    with pytest.raises(ValueError, match="Unsupported JSON Patch operation"):
+        apply_patch({"a": 1}, [operation])
@@ -0,0 +1,96 @@
+"""Tests for the incremental JSON object reader."""
+
+import json
+
+import pytest
+
+from eq_cir_converter_service.utils.json_stream import (
+    ArrayEnd,
+    ArrayItem,
+    ArrayStart,
+    JSONObjectReader,
+    JSONStreamError,
+    ObjectMember,
+)
+
+DOCUMENT = {
+    "title": 'A "quoted" title with \\ and ] } brackets',
+    "number": -12.5e3,
+    "flags": [True, False, None],
+    "sections": [{"id": "s1", "groups": [{"blocks": []}]}, {"id": "s2", "title": "é☃"}, 3],
+    "empty": {},
+}
+
+
+def read_in_chunks(document: bytes, chunk_size: int, split_keys: frozenset[str]) -> list:
+    """Feeds the document to a reader in chunks of the given size and returns the events."""
+    reader = JSONObjectReader(split_keys)
+    events = []
+    for start in range(0, len(document), chunk_size):
+        events.extend(reader.feed(document[start : start + chunk_size]))
+    reader.close()
+    return events
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 100_000])
+def test_reader_returns_members_and_items_whatever_the_chunk_size(chunk_size):
+    """Test that the same members and items are read however the document is split into chunks."""
+    document = json.dumps(DOCUMENT, indent=2, ensure_ascii=False).encode()
+
+    events = read_in_chunks(document, chunk_size, frozenset({"sections", "flags-not-present"}))
+
+    assert events == [
+        ObjectMember("title", DOCUMENT["title"]),
+        ObjectMember("number", DOCUMENT["number"]),
+        ObjectMember("flags", DOCUMENT["flags"]),
+        ArrayStart("sections"),
+        *(ArrayItem("sections", section) for section in DOCUMENT["sections"]),  # type: ignore[attr-defined]
+        ArrayEnd("sections"),
+        ObjectMember("empty", {}),
+    ]
+
+
+def test_reader_reads_empty_split_array_and_empty_object():
+    """Test that an empty split array and an empty object are read."""
+    assert read_in_chunks(b' {"sections" : [ ] } ', 1, frozenset({"sections"})) == [
+        ArrayStart("sections"),
+        ArrayEnd("sections"),
+    ]
+    assert not read_in_chunks(b"{}", 1, frozenset())
+
+
+def test_reader_drops_bytes_already_read():
+    """Test that a long document is read correctly after the bytes already read are dropped from the buffer."""
+    items = [{"id": index, "text": "x" * 1000} for index in range(200)]
+    document = json.dumps({"sections": items, "after": "end"}).encode()
+
+    events = read_in_chunks(document, 10_000, frozenset({"sections"}))
+
+    assert [event.value for event in events if isinstance(event, ArrayItem)] == items
+    assert events[-1] == ObjectMember("after", "end")
+
+
+@pytest.mark.parametrize(
+    "document, message, position",
+    [
+        (b"", "Expecting object", 0),
+        (b"[1]", "Expecting object", 0),
+        (b'{"a": 1', "Expecting value", 7),
+        (b'{"a" 1}', "Expecting colon", 5),
+        (b"{a: 1}", "Expecting first key", 1),
+        (b'{"a": 1, }', "Expecting key", 9),
+        (b'{"a": tru}', "Expecting value", 6),
+        (b'{"a": 1}x', "Extra data", 8),
+        (b'{"a": 1, "a": 2}', "Duplicate key", 9),
+        (b'{"sections": [1 2]}', "Expecting item end", 16),
+        (b'{"sections": [1, ]}', "Expecting value", 17),
+        (b'{"a": "\xff"}', "Invalid UTF-8", 6),
+    ],
+)
+def test_reader_rejects_invalid_documents(document, message, position):
+    """Test that invalid JSON, or JSON that is not an object, is rejected with its position."""
+    with pytest.raises(JSONStreamError) as excinfo:
+        read_in_chunks(document, 1, frozenset({"sections"}))
+
+    assert (excinfo.value.message, excinfo.value.position) == (message, position)
+    assert str(excinfo.value) == f"{message}: byte {position}"
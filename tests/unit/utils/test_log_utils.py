@@ -0,0 +1,45 @@
+"""Tests for the logging utilities."""
+
+import json
+
+import structlog
+
+from eq_cir_converter_service.utils.log_utils import SchemaSummary
+
+SCHEMA = {
+    "title": "Title",
+    "sections": [
+        {"id": "section-1", "groups": [{"blocks": [{"id": "block-1"}, {"id": "block-2"}]}, {"id": "no-blocks"}]},
+        {"id": "section-2", "groups": [{"blocks": [{"id": "block-3"}]}]},
+        "not-a-section",
+    ],
+}
+
+
+def test_schema_summary_counts_sections_and_blocks():
+    """Test that the summary has the size, section and block counts and a short hash of the schema."""
+    summary = SchemaSummary(SCHEMA).__structlog__()
+
+    assert summary["bytes"] == len(json.dumps(SCHEMA, separators=(",", ":")))
+    assert summary["sections"] == 3
+    assert summary["blocks"] == 3
+    assert len(summary["sha256"]) == 12
+
+
+def test_schema_summary_without_sections():
+    """Test that a schema without a list of sections is summarised with no sections or blocks."""
+    summary = SchemaSummary({"sections": "none"}).__structlog__()
+
+    assert (summary["sections"], summary["blocks"]) == (0, 0)
+
+
+def test_schema_summary_renders_summary_not_schema():
+    """Test that the JSON and console renderers log the summary in place of the schema."""
+    event = {"event": "Schema", "schema": SchemaSummary(SCHEMA)}
+
+    json_rendered = json.loads(structlog.processors.JSONRenderer()(None, "debug", dict(event)))
+    console_rendered = structlog.dev.ConsoleRenderer(colors=False)(None, "debug", dict(event))
+
+    assert json_rendered["schema"] == SchemaSummary(SCHEMA).__structlog__()
+    assert "sections=3 blocks=3" in console_rendered
+    assert "block-1" not in console_rendered